@@ -0,0 +1,8 @@
+import time
+
+# when importing taskipy started, for `task --profile-self` to tell how long importing it took
+IMPORT_STARTED_AT = time.perf_counter()
+
+from taskipy.api import TaskResult, run_task  # pylint: disable=C0413
+
+__all__ = ['TaskResult', 'run_task']
@@ -0,0 +1,237 @@
+import base64
+import hmac
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Tuple
+
+from taskipy.connection import Connection
+from taskipy.exceptions import AgentError
+
+PROTOCOL_VERSION = 1
+# a secret shared by an agent and its coordinators. an agent started without one generates its own, and writes it
+# to a file that only the user who started it can read, where coordinators on the same machine find it
+AGENT_TOKEN_ENV_VAR = 'TASKIPY_AGENT_TOKEN'
+READ_SIZE = 65536
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """splits a "host:port" address, where an ipv6 host is put in brackets"""
+    host, _, port = address.strip().rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f'"{address}" is not a host:port address')
+    return host.strip('[]'), int(port)
+
+
+def is_loopback(host: str) -> bool:
+    import ipaddress  # pylint: disable=C0415
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+def get_token_file(port: int) -> Path:
+    """the file that an agent listening on the port keeps its generated token in"""
+    return Path.home() / '.taskipy' / 'agents' / f'{port}.token'
+
+
+def read_token_file(port: int) -> Optional[str]:
+    try:
+        return get_token_file(port).read_text(encoding='utf-8').strip() or None
+    except OSError:
+        return None
+
+
+def find_checkout_root(path: Path) -> Path:
+    """the root of the git checkout the path is in, or the path itself if it isn't in one"""
+    for candidate in [path] + list(path.parents):
+        if (candidate / '.git').exists():
+            return candidate
+    return path
+
+
+class Agent:
+    """runs the commands that coordinators, `task --workers` runs, send it, in the checkout it was started in.
+
+    every command is sent over a connection of its own, runs with the environment the agent was started with, plus
+    the variables the coordinator set for it, and its output and exit code are streamed back over the connection.
+    """
+
+    def __init__(self, root: Path, address: Tuple[str, int], capacity: int, token: Optional[str], require_token: bool = True):  # pylint: disable=R0913,R0917
+        self.__root = root.resolve()
+        self.__address = address
+        self.__capacity = capacity
+        self.__token = token
+        self.__require_token = require_token
+        self.__slots = threading.BoundedSemaphore(capacity)
+
+    def serve(self) -> int:
+        if not self.__require_token and not is_loopback(self.__address[0]):
+            raise AgentError('an agent that listens beyond the loopback interface runs any command it is sent, so it always requires a token')
+
+        # imported lazily, since every run of a task imports this module for its protocol, and only agents serve
+        import socketserver  # pylint: disable=C0415
+
+        agent = self
+        # an ipv6 host needs a socket of its own family
+        family = socket.AF_INET6 if ':' in self.__address[0] else socket.AF_INET
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+            address_family = family
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                connection = Connection(self.request)
+                try:
+                    agent.handle(connection)
+                finally:
+                    connection.close()
+
+        try:
+            server = Server(self.__address, Handler)
+        except OSError as e:
+            raise AgentError(f'could not listen on {self.__address[0]}:{self.__address[1]}: {e}')
+
+        host, port = server.server_address[:2]
+        token_file: Optional[Path] = None
+        try:
+            if self.__require_token and self.__token is None:
+                token_file = self.__write_generated_token(port)
+        except OSError as e:
+            server.server_close()
+            raise AgentError(f'could not write its token to {get_token_file(port)}: {e}')
+
+        print(f'taskipy agent listening on {host}:{port}, running up to {self.__capacity} commands at once in {self.__root}', file=sys.stderr, flush=True)
+        if token_file is not None:
+            print(f'its token is in {token_file}, where coordinators run by the same user on this machine find it', file=sys.stderr, flush=True)
+            # stopped like an interrupt, so that the token file is removed
+            signal.signal(signal.SIGTERM, self.__stop)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if token_file is not None and token_file.exists():
+                token_file.unlink()
+
+        return 0
+
+    def __stop(self, _signum: int, _frame: Any):
+        raise KeyboardInterrupt()
+
+    def __write_generated_token(self, port: int) -> Path:
+        import secrets  # pylint: disable=C0415
+
+        self.__token = secrets.token_hex(32)
+        token_file = get_token_file(port)
+        token_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if token_file.exists():
+            # a file left behind by an agent that did not exit cleanly, whose mode may not be ours to trust
+            token_file.unlink()
+
+        fd = os.open(str(token_file), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.__token)
+        return token_file
+
+    def handle(self, connection: Connection):
+        hello = connection.receive()
+        if hello is None or hello.get('type') != 'hello':
+            return
+
+        if hello.get('version') != PROTOCOL_VERSION:
+            connection.send({'type': 'error', 'message': f'the agent speaks version {PROTOCOL_VERSION} of the protocol, not {hello.get("version")}'})
+            return
+        if self.__token is not None and not hmac.compare_digest(str(hello.get('token') or ''), self.__token):
+            connection.send({'type': 'error', 'message': f'the agent requires the token it was started with, from {AGENT_TOKEN_ENV_VAR} or its token file'})
+            return
+
+        connection.send({'type': 'welcome', 'capacity': self.__capacity, 'root': str(self.__root)})
+        request = connection.receive()
+        if request is None:
+            return
+
+        if request.get('type') == 'probe':
+            project_dir = self.__resolve(request.get('path'))
+            connection.send({'type': 'probed', 'checked_out': project_dir is not None and (project_dir / 'pyproject.toml').is_file()})
+        elif request.get('type') == 'run':
+            self.__run(connection, request)
+
+    def __run(self, connection: Connection, request: Dict[str, Any]):
+        project_dir = self.__resolve(request.get('path'))
+        cwd = self.__resolve(request.get('cwd'))
+        if project_dir is None or not (project_dir / 'pyproject.toml').is_file() or cwd is None or not cwd.is_dir():
+            connection.send({'type': 'exit', 'code': None, 'error': f'"{request.get("path")}" is not checked out on this agent'})
+            return
+
+        with self.__slots:
+            process = subprocess.Popen(
+                request['command'],
+                shell=True,
+                cwd=str(cwd),
+                env=dict(os.environ, **request.get('env', {})),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                # a group of its own, so that a signal from the coordinator reaches every process the command started
+                start_new_session=os.name == 'posix',
+            )
+            threading.Thread(target=self.__forward_signals, args=(connection, process), daemon=True).start()
+
+            output: IO[bytes] = process.stdout  # type: ignore
+            try:
+                while True:
+                    data = os.read(output.fileno(), READ_SIZE)
+                    if not data:
+                        break
+                    connection.send({'type': 'output', 'data': base64.b64encode(data).decode()})
+                exit_code = process.wait()
+                connection.send({'type': 'exit', 'code': exit_code})
+            except OSError:
+                # the coordinator is gone, and nobody is left to wait for the command
+                self.__send_signal(process, signal.SIGTERM)
+                exit_code = process.wait()
+            finally:
+                output.close()
+
+        print(f'ran "{request["command"]}" in {cwd}, exit code {exit_code}', file=sys.stderr, flush=True)
+
+    def __forward_signals(self, connection: Connection, process: subprocess.Popen):
+        while True:
+            message = connection.receive()
+            if message is None:
+                if process.poll() is None:
+                    self.__send_signal(process, signal.SIGTERM)
+                return
+            if message.get('type') == 'signal':
+                self.__send_signal(process, message['signal'])
+
+    def __send_signal(self, process: subprocess.Popen, signum: int):
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signum)
+            else:
+                process.send_signal(signum)
+        except OSError:
+            pass
+
+    def __resolve(self, relative_path: Optional[str]) -> Optional[Path]:
+        """the path within the agent's checkout, or None if it leads out of it"""
+        if not isinstance(relative_path, str):
+            return None
+
+        path = (self.__root / relative_path).resolve()
+        if path != self.__root and self.__root not in path.parents:
+            return None
+        return path
@@ -0,0 +1,96 @@
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+
+
+class TaskResult:
+    def __init__(
+        self,
+        exit_code: int,
+        duration: float,
+        stdout: Optional[str] = None,
+        stderr: Optional[str] = None,
+    ):
+        self.__exit_code = exit_code
+        self.__duration = duration
+        self.__stdout = stdout
+        self.__stderr = stderr
+
+    @property
+    def exit_code(self) -> int:
+        return self.__exit_code
+
+    @property
+    def duration(self) -> float:
+        """wall clock duration of the task in seconds"""
+        return self.__duration
+
+    @property
+    def stdout(self) -> Optional[str]:
+        """the task's stdout, or None if output was not captured"""
+        return self.__stdout
+
+    @property
+    def stderr(self) -> Optional[str]:
+        """the task's stderr, or None if output was not captured"""
+        return self.__stderr
+
+    @property
+    def succeeded(self) -> bool:
+        return self.__exit_code == 0
+
+    def __repr__(self):
+        return f'TaskResult(exit_code={self.__exit_code}, duration={self.__duration:.3f})'
+
+
+async def run_task(
+    name: str,
+    args: Optional[List[str]] = None,
+    cwd: Union[str, Path, None] = None,
+    capture_output: bool = False,
+) -> TaskResult:
+    """Run a task without blocking the event loop.
+
+    Every call runs the taskipy CLI in its own child process, so any number
+    of calls can run concurrently in the same event loop without sharing
+    state such as the working directory or signal handlers.
+
+    Args:
+        name: The name of the task to run.
+        args: Arguments to pass to the task.
+        cwd: The working directory to run the task in. If not
+            provided, defaults to the current working directory.
+        capture_output: Whether to capture the task's stdout and stderr
+            instead of letting them through to this process' own streams.
+
+    Returns:
+        The task's exit code, duration and, if requested, its output.
+    """
+    # imported lazily so that importing taskipy does not pay for asyncio
+    import asyncio  # pylint: disable=C0415
+
+    pipe = asyncio.subprocess.PIPE if capture_output else None
+    started_at = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'taskipy', name, *(args or []),
+        cwd=str(cwd) if cwd is not None else None,
+        stdout=pipe,
+        stderr=pipe,
+    )
+
+    try:
+        stdout, stderr = await process.communicate()
+        exit_code = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.terminate()
+            await process.wait()
+        raise
+
+    return TaskResult(
+        exit_code=exit_code,
+        duration=time.perf_counter() - started_at,
+        stdout=stdout.decode(errors='replace') if stdout is not None else None,
+        stderr=stderr.decode(errors='replace') if stderr is not None else None,
+    )
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+CACHE_DIR_NAME = '.taskipy_cache'
+
+
+def get_cache_dir(base_dir: Path) -> Path:
+    """returns taskipy's cache dir under the given dir, creating it if needed"""
+    cache_dir = base_dir / CACHE_DIR_NAME
+
+    if not cache_dir.is_dir():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # keep the cache out of version control, the same way pytest and mypy do
+        (cache_dir / '.gitignore').write_text('# created by taskipy automatically\n*\n')
+
+    return cache_dir
@@ -0,0 +1,312 @@
+import importlib
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+from taskipy.cache import CACHE_DIR_NAME, get_cache_dir
+from taskipy.connection import Connection
+from taskipy.exceptions import CallServerError
+from taskipy.process_priority import apply_process_priority
+from taskipy.profile_hook import PROFILE_DIR_ENV_VAR, start_profiling
+from taskipy.running_processes import INTERRUPTED_EXIT_CODE, running_processes
+
+CALL_SERVERS_DIR_NAME = 'call_servers'
+# the longest path that a unix socket can be bound to on every platform that has them
+MAX_SOCKET_PATH_LENGTH = 100
+# the most file descriptors a call is sent, its stdout and stderr and those of the jobserver being all it needs
+MAX_PASSED_FDS = 8
+START_TIMEOUT_SECONDS = 10
+
+
+def run_call(target: str, argv: List[str]) -> int:
+    """imports and calls a "package.module:function" target the way console scripts do, and returns its exit code.
+
+    the function is called without arguments, with `sys.argv` set to the target followed by the args. its return
+    value, or the code of the `SystemExit` it raises, is turned into an exit code the same way `sys.exit` does it.
+    """
+    module_name, _, attribute_path = target.partition(':')
+    sys.argv = argv
+
+    try:
+        function: Any = importlib.import_module(module_name)
+        for attribute in attribute_path.split('.'):
+            function = getattr(function, attribute)
+
+        result = function()
+    except SystemExit as e:
+        result = e.code
+    except KeyboardInterrupt:
+        return INTERRUPTED_EXIT_CODE
+    except BaseException:  # pylint: disable=W0703
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    return _exit_code_of(result)
+
+
+def _exit_code_of(result: object) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, int):
+        return int(result)
+
+    print(result, file=sys.stderr, flush=True)
+    return 1
+
+
+def get_socket_path(project_dir: Path, preload: List[str]) -> Path:
+    """the socket of the project's call server, of which there is one per interpreter and list of preloaded modules"""
+    import hashlib  # pylint: disable=C0415
+
+    key = '\0'.join([sys.executable, os.environ.get('PYTHONPATH', '')] + preload)
+    return project_dir / CACHE_DIR_NAME / CALL_SERVERS_DIR_NAME / f'{hashlib.sha256(key.encode()).hexdigest()[:16]}.sock'
+
+
+def run_forked_call(call_args: Dict[str, Any], fds: List[int]) -> int:
+    """sets up a process forked from the call server like a task's shell would be, and runs the call in it"""
+    import fcntl  # pylint: disable=C0415
+
+    # moved out of the way first, so that a received fd never lands on a target fd that is yet to be filled
+    lowest_free_fd = max(call_args['fds'] + [2]) + 1
+    received_fds = [(fcntl.fcntl(fd, fcntl.F_DUPFD, lowest_free_fd), target_fd) for fd, target_fd in zip(fds, call_args['fds'])]
+    for fd in fds:
+        os.close(fd)
+    for fd, target_fd in received_fds:
+        os.dup2(fd, target_fd)
+        os.close(fd)
+
+    os.environ.clear()
+    os.environ.update(call_args['environment'])
+    os.chdir(call_args['cwd'])
+    sys.path.insert(0, call_args['cwd'])
+
+    if call_args['priority']:
+        apply_process_priority(call_args['task_name'], call_args['priority'], os.getpid())
+
+    # the call server started before the task's environment was known, so it never ran the profiling hook
+    if os.environ.get(PROFILE_DIR_ENV_VAR):
+        start_profiling(os.environ[PROFILE_DIR_ENV_VAR])
+
+    return run_call(call_args['target'], call_args['argv'])
+
+
+def send_fds(sock: socket.socket, fds: List[int]):
+    import array  # pylint: disable=C0415
+
+    sock.sendmsg([bytes([len(fds)])], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])  # pylint: disable=E1101
+
+
+def receive_fds(sock: socket.socket) -> List[int]:
+    """the file descriptors that the other side sent with `send_fds`, duplicated into this process"""
+    import array  # pylint: disable=C0415
+
+    fds = array.array('i')
+    message, ancillary_data, _, _ = sock.recvmsg(1, socket.CMSG_LEN(MAX_PASSED_FDS * fds.itemsize))  # pylint: disable=E1101
+    for level, kind, data in ancillary_data:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:  # pylint: disable=E1101
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+
+    if not message or len(fds) != message[0]:
+        for fd in fds:
+            os.close(fd)
+        raise OSError('the file descriptors of the call did not arrive')
+    return list(fds)
+
+
+class CallProcess:
+    """a call that runs in a process forked from the call server, with the parts of the Popen interface taskipy uses"""
+
+    def __init__(self, pid: int, connection: Connection, stdout: Optional[IO[bytes]], stderr: Optional[IO[bytes]]):
+        self.__pid = pid
+        self.__connection = connection
+        self.__stdout = stdout
+        self.__stderr = stderr
+        # None until the process exits, and typed loosely like Popen's
+        self.returncode: Any = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.__pid
+
+    @property
+    def stdout(self) -> Optional[IO[bytes]]:
+        """the read end of the process's output, if it was started with `stdout=subprocess.PIPE`"""
+        return self.__stdout
+
+    @property
+    def stderr(self) -> Optional[IO[bytes]]:
+        """the read end of the process's errors, if it was started with `stderr=subprocess.PIPE`"""
+        return self.__stderr
+
+    def wait(self) -> Optional[int]:
+        # the call runs in the call server's session, which an interrupt of the terminal doesn't reach, so it is
+        # passed on, and the call is waited for until it stops
+        while self.returncode is None:
+            try:
+                message = self.__connection.receive()
+            except KeyboardInterrupt:
+                running_processes.mark_interrupted()
+                self.send_signal(signal.SIGINT)
+                continue
+
+            if message is None:
+                print(f'lost the connection to the call server running process {self.__pid}', file=sys.stderr, flush=True)
+            self.returncode = message['exit_code'] if message is not None else 1
+            self.__connection.close()
+
+        return self.returncode
+
+    def send_signal(self, signum: int):
+        if self.returncode is None:
+            try:
+                os.kill(self.__pid, signum)
+            except OSError:
+                pass
+
+
+class CallServer:
+    """starts calls in processes forked from the project's call server, a daemon that imports the `preload` modules once.
+
+    the call server starts along with the first call, and keeps running after taskipy exits, so that the calls of later
+    runs are forked from it as well. it exits once it had nothing to run for a while, or a module it imported changed.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def is_supported(project_dir: Path, preload: List[str]) -> bool:
+        if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork'):
+            return False
+        return len(str(get_socket_path(project_dir, preload))) <= MAX_SOCKET_PATH_LENGTH
+
+    def start(  # pylint: disable=R0913,R0914,R0917
+        self,
+        task_name: str,
+        target: str,
+        argv: List[str],
+        environment: Dict[str, str],
+        cwd: str,
+        priority: Dict[str, Any],
+        stdout: Union[IO[bytes], int, None],
+        stderr: Union[IO[bytes], int, None],
+        pass_fds: Tuple[int, ...],
+        project_dir: Path,
+        preload: List[str],
+    ) -> CallProcess:
+        # the read and write ends of the pipes for `subprocess.PIPE`, by the fd of the call they are for
+        pipes: Dict[int, Tuple[int, int]] = {}
+        fds: List[Tuple[int, int]] = [(fd, fd) for fd in pass_fds]
+        for target_fd, output in [(1, stdout), (2, stderr)]:
+            if output == subprocess.PIPE:
+                pipes[target_fd] = os.pipe()
+                fds.append((pipes[target_fd][1], target_fd))
+            elif output == subprocess.STDOUT:
+                fds.append((fds[-1][0], target_fd))
+            elif output is not None and not isinstance(output, int):
+                fds.append((output.fileno(), target_fd))
+            else:
+                fds.append((target_fd, target_fd))
+
+        call_args = {
+            'task_name': task_name,
+            'target': target,
+            'argv': argv,
+            'environment': environment,
+            'cwd': cwd,
+            'priority': priority,
+            'fds': [target_fd for _, target_fd in fds],
+        }
+        try:
+            # a call server whose modules changed exits rather than running the call, and a new one takes its place
+            for _ in range(2):
+                connection = self.__connect(project_dir, preload)
+                pid = self.__send_call(connection, call_args, [fd for fd, _ in fds])
+                if pid is not None:
+                    read_ends = [os.fdopen(pipes[target_fd][0], 'rb') if target_fd in pipes else None for target_fd in [1, 2]]
+                    return CallProcess(pid, connection, *read_ends)
+        finally:
+            for _, write_end in pipes.values():
+                # the call server has its own copy of the write end by now
+                os.close(write_end)
+
+        raise CallServerError('it exited without running the call')
+
+    def __send_call(self, connection: Connection, call_args: Dict[str, Any], fds: List[int]) -> Optional[int]:
+        """the pid of the process that the call server forked for the call, or None if it closed the connection instead"""
+        try:
+            send_fds(connection.sock, fds)
+            connection.send(call_args)
+            reply = connection.receive()
+        except OSError:
+            reply = None
+
+        if reply is None or 'pid' not in reply:
+            connection.close()
+            return None
+        return reply['pid']
+
+    def __connect(self, project_dir: Path, preload: List[str]) -> Connection:
+        socket_path = get_socket_path(project_dir, preload)
+        with self.__lock:
+            connection = self.__try_connect(socket_path)
+            if connection is not None:
+                return connection
+
+            get_cache_dir(project_dir)
+            socket_path.parent.mkdir(mode=0o700, exist_ok=True)
+            with open(socket_path.with_suffix('.log'), 'ab') as log:
+                server = subprocess.Popen(
+                    [sys.executable, '-m', 'taskipy.call_daemon', str(socket_path), str(project_dir)] + preload,
+                    cwd=str(project_dir),
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=log,
+                    # a session of its own, so that it outlives this run, and the interrupts of its terminal
+                    start_new_session=True,
+                )
+
+            deadline = time.monotonic() + START_TIMEOUT_SECONDS
+            while time.monotonic() < deadline:
+                connection = self.__try_connect(socket_path)
+                if connection is not None:
+                    return connection
+                # another run's call server may have started in the meantime, which this one then leaves to it
+                if server.poll() is not None and server.returncode != 0:
+                    break
+                time.sleep(0.01)
+
+        raise CallServerError(f'it did not listen on {socket_path}, see {socket_path.with_suffix(".log")}')
+
+    def __try_connect(self, socket_path: Path) -> Optional[Connection]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=E1101
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            sock.close()
+            return None
+        return Connection(sock)
+
+
+call_server = CallServer()
+
+
+def main():
+    """runs a call in this process, for platforms without a call server: `python -m taskipy.call target [args]`"""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    sys.path.insert(0, os.getcwd())
+    sys.exit(run_call(sys.argv[1], sys.argv[1:]))
+
+
+if __name__ == '__main__':
+    main()
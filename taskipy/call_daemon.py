@@ -0,0 +1,243 @@
+"""the call server of a project, a daemon that imports the project's `preload` modules once, and then forks a process
+for every call that taskipy sends it over a unix socket under the project's `.taskipy_cache`.
+
+taskipy starts it along with the first call, with `python -m taskipy.call_daemon <socket> <project dir> [modules]`.
+"""
+import importlib
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from taskipy.call import receive_fds, run_forked_call
+from taskipy.connection import Connection
+
+# a call server that had nothing to run for this long exits, so that it doesn't outlive the work on the project by much
+IDLE_TIMEOUT_SECONDS = 15 * 60
+# how often the call server checks whether it is idle, and whether its socket is still there
+POLL_INTERVAL_SECONDS = 1.0
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+class CallDaemon:  # pylint: disable=R0902
+    def __init__(self, socket_path: str, project_dir: str, preload: List[str]):
+        self.__socket_path = socket_path
+        self.__project_dir = project_dir
+        self.__preload = preload
+        self.__listener: Optional[socket.socket] = None
+        self.__socket_inode: Optional[int] = None
+        self.__module_mtimes: Dict[str, float] = {}
+        # the connection of every call that is still running, by the pid of its process
+        self.__calls: Dict[int, Connection] = {}
+        self.__wakeup_fds = os.pipe()
+
+    def serve(self) -> int:
+        self.__listener = self.__listen()
+        if self.__listener is None:
+            # the call server of another run got to listen on the socket first
+            return 0
+
+        sys.path.insert(0, self.__project_dir)
+        for module_name in self.__preload:
+            try:
+                importlib.import_module(module_name)
+            except Exception:  # pylint: disable=W0703
+                # the calls import the module themselves, and fail with its error if they need it
+                traceback.print_exc()
+        self.__module_mtimes = self.__get_module_mtimes()
+
+        for fd in self.__wakeup_fds:
+            os.set_blocking(fd, False)
+        # an exiting call only wakes up the loop, which then reaps its process
+        signal.set_wakeup_fd(self.__wakeup_fds[1])
+        signal.signal(signal.SIGCHLD, lambda *_: None)
+
+        idle_since = time.monotonic()
+        while self.__listener is not None or self.__calls:
+            watched: List[Any] = [self.__wakeup_fds[0]]
+            watched += [connection.sock for connection in self.__calls.values()]
+            if self.__listener is not None:
+                watched.append(self.__listener)
+
+            readable, _, _ = select.select(watched, [], [], POLL_INTERVAL_SECONDS)
+            for ready in readable:
+                if ready is self.__listener:
+                    self.__accept()
+                elif ready == self.__wakeup_fds[0]:
+                    os.read(self.__wakeup_fds[0], 512)
+                else:
+                    self.__check_on_caller(ready)
+            self.__reap()
+
+            if self.__calls or readable:
+                idle_since = time.monotonic()
+            if not self.__has_socket() or time.monotonic() - idle_since > IDLE_TIMEOUT_SECONDS:
+                self.__stop_listening()
+
+        return 0
+
+    def __accept(self):
+        assert self.__listener is not None
+        sock, _ = self.__listener.accept()
+        sock.settimeout(REQUEST_TIMEOUT_SECONDS)
+        connection = Connection(sock)
+        try:
+            fds = receive_fds(sock)
+        except OSError:
+            connection.close()
+            return
+
+        call_args = connection.receive()
+        if call_args is None or self.__modules_changed():
+            if call_args is not None:
+                # the call would run with outdated modules, so a new call server takes over, which taskipy starts
+                self.__stop_listening()
+            for fd in fds:
+                os.close(fd)
+            connection.close()
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            self.__run_call_in_child(connection, call_args, fds)
+
+        for fd in fds:
+            os.close(fd)
+        sock.settimeout(None)
+        self.__calls[pid] = connection
+        try:
+            connection.send({'pid': pid})
+        except OSError:
+            self.__kill(pid)
+
+    def __run_call_in_child(self, connection: Connection, call_args: Dict[str, Any], fds: List[int]):
+        exit_code = 1
+        try:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            for fd in self.__wakeup_fds:
+                os.close(fd)
+            if self.__listener is not None:
+                self.__listener.close()
+            for other_connection in [connection] + list(self.__calls.values()):
+                other_connection.close()
+
+            exit_code = run_forked_call(call_args, fds)
+        except BaseException:  # pylint: disable=W0703
+            traceback.print_exc()
+        finally:
+            # the call server's own loop must never run on in the child
+            os._exit(exit_code)  # pylint: disable=W0212
+
+    def __check_on_caller(self, sock: socket.socket):
+        """stops the call of a taskipy run that is gone, since nobody is left to wait for it"""
+        pid = next(pid for pid, connection in self.__calls.items() if connection.sock is sock)
+        try:
+            data = sock.recv(1)
+        except OSError:
+            data = b''
+
+        if not data:
+            self.__kill(pid)
+            self.__calls.pop(pid).close()
+
+    def __reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            connection = self.__calls.pop(pid, None)
+            if connection is not None:
+                exit_code = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+                try:
+                    connection.send({'exit_code': exit_code})
+                except OSError:
+                    pass
+                connection.close()
+
+    def __kill(self, pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def __listen(self) -> Optional[socket.socket]:
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=E1101
+        try:
+            listener.bind(self.__socket_path)
+        except OSError:
+            if self.__is_served():
+                listener.close()
+                return None
+            # left behind by a call server that did not exit cleanly
+            os.unlink(self.__socket_path)
+            listener.bind(self.__socket_path)
+
+        os.chmod(self.__socket_path, 0o600)
+        listener.listen(socket.SOMAXCONN)
+        self.__socket_inode = os.stat(self.__socket_path).st_ino
+        return listener
+
+    def __is_served(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # pylint: disable=E1101
+        try:
+            probe.connect(self.__socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def __has_socket(self) -> bool:
+        """whether the socket is still the one this call server listens on, rather than removed along with the project"""
+        try:
+            return os.stat(self.__socket_path).st_ino == self.__socket_inode
+        except OSError:
+            return False
+
+    def __stop_listening(self):
+        if self.__listener is None:
+            return
+
+        if self.__has_socket():
+            os.unlink(self.__socket_path)
+        self.__listener.close()
+        self.__listener = None
+
+    def __get_module_mtimes(self) -> Dict[str, float]:
+        mtimes: Dict[str, float] = {}
+        for module in list(sys.modules.values()):
+            path = getattr(module, '__file__', None)
+            if path and path not in mtimes:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    pass
+        return mtimes
+
+    def __modules_changed(self) -> bool:
+        for path, mtime in self.__module_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+def main():
+    socket_path, project_dir, *preload = sys.argv[1:]
+    sys.exit(CallDaemon(socket_path, project_dir, preload).serve())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
+import os
 import sys
 from pathlib import Path
 from typing import List, Union
 
 from taskipy.exceptions import TaskipyError, InvalidUsageError
+from taskipy.jobserver import get_jobserver, start_jobserver
 from taskipy.task_runner import TaskRunner
+from taskipy.workers import DEFAULT_AGENT_PORT
 
 
 def main():
@@ -29,22 +32,119 @@ def run(args: List[str], cwd: Union[str, Path, None] = None) -> int:
         description='runs a task specified in your pyproject.toml under [tool.taskipy.tasks]',
     )
     parser.add_argument('-l', '--list', help='show list of available tasks', action='store_true')
+    parser.add_argument(
+        '--stats',
+        help='show statistics of past runs of all tasks, or of the given task',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--plan',
+        help='print the steps that running the task would take as json, without running it',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--fail-on-regression',
+        help='exit with a non zero code if a task ran much slower than its recent runs',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--profile',
+        help='profile every python process the task starts, and print the functions that took the longest',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--profile-self',
+        help="profile taskipy while it runs the task, and print how much of the time went to taskipy's own work",
+        action='store_true',
+    )
+    parser.add_argument(
+        '-w', '--workspace',
+        help='run the task in every package under the current directory that defines it',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--since',
+        help='like --workspace, but only run the task in packages changed since the given git ref, and in packages that depend on them',
+        metavar='REF',
+    )
+    parser.add_argument(
+        '--agent',
+        help=(
+            'run the commands that coordinators started with --workers send to the given address '
+            f'(defaults to 127.0.0.1:{DEFAULT_AGENT_PORT}), at most --jobs of them at once'
+        ),
+        nargs='?',
+        const=f'127.0.0.1:{DEFAULT_AGENT_PORT}',
+        metavar='HOST:PORT',
+    )
+    parser.add_argument(
+        '--no-agent-token',
+        help='with --agent on a loopback address, run the commands of every local user, without requiring a token',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--workers',
+        help='run the commands of the task on the agents listening on the given comma separated addresses',
+        metavar='HOST:PORT,...',
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        help=(
+            'maximum number of tasks to run concurrently (defaults to the number of cpus). '
+            'the limit is shared with nested task runs and with jobserver aware tools such as make -j'
+        ),
+        type=int,
+    )
     parser.add_argument('name', help='name of the task', nargs='?')
     parser.add_argument('args', nargs=argparse.REMAINDER, help='arguments to pass to the task')
     parsed_args = parser.parse_args(args=args)
 
+    if parsed_args.profile_self:
+        from taskipy.self_profile import SelfProfile  # pylint: disable=C0415
+
+        profile = SelfProfile(Path(cwd) if cwd is not None else Path.cwd())
+        return profile.run(lambda: _run_parsed_args(parser, parsed_args, cwd))
+
+    return _run_parsed_args(parser, parsed_args, cwd)
+
+
+def _run_parsed_args(parser: argparse.ArgumentParser, parsed_args: argparse.Namespace, cwd: Union[str, Path, None]) -> int:
     try:
         cwd = Path(cwd).resolve() if cwd is not None else Path.cwd()
+
+        if parsed_args.agent is not None:
+            return _serve_agent(parser, parsed_args, cwd)
+
+        _start_jobserver_and_workers(parser, parsed_args, cwd)
+
+        if parsed_args.workspace or parsed_args.since is not None:
+            if parsed_args.name is None:
+                raise InvalidUsageError(parser)
+
+            from taskipy.workspace import Workspace  # pylint: disable=C0415
+
+            workspace = Workspace(cwd, parsed_args.jobs)
+            return workspace.run(
+                parsed_args.name,
+                parsed_args.args,
+                since=parsed_args.since,
+                fail_on_regression=parsed_args.fail_on_regression,
+            )
+
         runner = TaskRunner(cwd)
 
         if parsed_args.list:
             runner.list()
-            return 0
-
-        if parsed_args.name is None:
+        elif parsed_args.stats:
+            runner.stats(parsed_args.name)
+        elif parsed_args.name is None:
             raise InvalidUsageError(parser)
+        elif parsed_args.plan:
+            runner.plan(parsed_args.name, parsed_args.args)
+        else:
+            return runner.run(parsed_args.name, parsed_args.args, parsed_args.fail_on_regression, parsed_args.profile)
 
-        return runner.run(parsed_args.name, parsed_args.args)
+        return 0
     except TaskipyError as e:
         print(e)
         return e.exit_code
@@ -53,5 +153,40 @@ def run(args: List[str], cwd: Union[str, Path, None] = None) -> int:
         return 1
 
 
+def _start_jobserver_and_workers(parser: argparse.ArgumentParser, parsed_args: argparse.Namespace, cwd: Path):
+    if parsed_args.jobs is not None:
+        if parsed_args.jobs < 1:
+            raise InvalidUsageError(parser)
+        if get_jobserver() is None:
+            # a run nested under another jobserver shares its limit instead of starting its own
+            start_jobserver(parsed_args.jobs)
+
+    if parsed_args.workers is not None:
+        from taskipy.agent import find_checkout_root  # pylint: disable=C0415
+        from taskipy.workers import start_workers  # pylint: disable=C0415
+
+        start_workers([address for address in parsed_args.workers.split(',') if address], find_checkout_root(cwd))
+
+
+def _serve_agent(parser: argparse.ArgumentParser, parsed_args: argparse.Namespace, cwd: Path) -> int:
+    from taskipy.agent import AGENT_TOKEN_ENV_VAR, Agent, find_checkout_root, parse_address  # pylint: disable=C0415
+
+    if parsed_args.jobs is not None and parsed_args.jobs < 1:
+        raise InvalidUsageError(parser)
+    try:
+        address = parse_address(parsed_args.agent)
+    except ValueError:
+        raise InvalidUsageError(parser)
+
+    agent = Agent(
+        find_checkout_root(cwd),
+        address,
+        parsed_args.jobs or os.cpu_count() or 1,
+        os.environ.get(AGENT_TOKEN_ENV_VAR),
+        require_token=not parsed_args.no_agent_token,
+    )
+    return agent.serve()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,34 @@
+import json
+import socket
+import threading
+from typing import Any, Dict, Optional
+
+
+class Connection:
+    """a connection over which messages are exchanged as lines of json, between a coordinator and an agent, or taskipy and its call server"""
+
+    def __init__(self, sock: socket.socket):
+        self.__socket = sock
+        self.__reader = sock.makefile('rb')
+        self.__send_lock = threading.Lock()
+
+    @property
+    def sock(self) -> socket.socket:
+        return self.__socket
+
+    def send(self, message: Dict[str, Any]):
+        data = json.dumps(message, separators=(',', ':')).encode() + b'\n'
+        with self.__send_lock:
+            self.__socket.sendall(data)
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """the next message, or None once the other side closed the connection"""
+        try:
+            line = self.__reader.readline()
+            return json.loads(line.decode()) if line else None
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        self.__reader.close()
+        self.__socket.close()
@@ -0,0 +1,97 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from taskipy.exceptions import MissingEnvFileError
+
+DOTENV_LINE_REGEX = re.compile(r'^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_.]*)\s*=\s*(.*)$')
+DOUBLE_QUOTE_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', '"': '"', '\\': '\\'}
+
+
+class DotEnvCache:
+    """parses dotenv files, and keeps their values for as long as the files are not modified"""
+
+    def __init__(self):
+        self.__entries: Dict[Path, Tuple[int, Dict[str, str]]] = {}
+        self.__lock = threading.Lock()
+
+    def load(self, file_path: Path) -> Dict[str, str]:
+        try:
+            mtime = file_path.stat().st_mtime_ns
+        except OSError:
+            raise MissingEnvFileError(str(file_path))
+
+        with self.__lock:
+            cached = self.__entries.get(file_path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            values = parse_dotenv(file.read())
+
+        with self.__lock:
+            self.__entries[file_path] = (mtime, values)
+
+        return values
+
+
+def parse_env_table(value: object) -> Optional[Dict[str, str]]:
+    """converts an `env` table from pyproject.toml to environment variables, or returns None if it is invalid"""
+    if not isinstance(value, dict):
+        return None
+
+    if not all(isinstance(item, (str, int, float)) and not isinstance(item, bool) for item in value.values()):
+        return None
+
+    return {name: str(item) for name, item in value.items()}
+
+
+def parse_env_files(value: object) -> Optional[List[str]]:
+    """converts an `env_file` value from pyproject.toml to a list of paths, or returns None if it is invalid"""
+    if isinstance(value, str):
+        return [value]
+
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+
+    return None
+
+
+def parse_dotenv(contents: str) -> Dict[str, str]:
+    values = {}
+
+    for line in contents.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+
+        match = DOTENV_LINE_REGEX.match(line)
+        if match:
+            name, raw_value = match.groups()
+            values[name] = _parse_dotenv_value(raw_value.strip())
+
+    return values
+
+
+def _parse_dotenv_value(raw_value: str) -> str:
+    if raw_value[:1] == "'":
+        end = raw_value.find("'", 1)
+        return raw_value[1:end] if end != -1 else raw_value[1:]
+
+    if raw_value[:1] == '"':
+        value = ''
+        index = 1
+        while index < len(raw_value) and raw_value[index] != '"':
+            if raw_value[index] == '\\' and index + 1 < len(raw_value):
+                escaped = raw_value[index + 1]
+                value += DOUBLE_QUOTE_ESCAPES.get(escaped, '\\' + escaped)
+                index += 2
+            else:
+                value += raw_value[index]
+                index += 1
+        return value
+
+    return re.split(r'\s+#', raw_value, maxsplit=1)[0].strip()
+
+
+dotenv_cache = DotEnvCache()
@@ -1,5 +1,5 @@
 from argparse import ArgumentParser
-from typing import Optional
+from typing import List, Optional
 
 class TaskipyError(Exception):
     exit_code = 1
@@ -13,11 +13,40 @@ class InvalidRunnerTypeError(TaskipyError):
         )
 
 
+class InvalidSettingError(TaskipyError):
+    def __init__(self, setting: str, reason: str):
+        super().__init__()
+        self.setting = setting
+        self.reason = reason
+
+    def __str__(self):
+        return f'invalid value: {self.reason}. please check [tool.taskipy.settings.{self.setting}]'
+
+
+class PerformanceRegressionError(TaskipyError):
+    def __init__(self, task_names: List[str]):
+        super().__init__()
+        self.task_names = task_names
+
+    def __str__(self):
+        names = ', '.join(f'"{name}"' for name in self.task_names)
+        return f'failing because of performance regressions in {names}'
+
+
 class MissingPyProjectFileError(TaskipyError):
     def __str__(self):
         return 'no pyproject.toml file found in this directory or parent directories'
 
 
+class MissingEnvFileError(TaskipyError):
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+
+    def __str__(self):
+        return f'env file {self.file_path} does not exist'
+
+
 class MalformedPyProjectError(TaskipyError):
     def __init__(self, reason: Optional[str] = None):
         super().__init__()
@@ -111,3 +140,40 @@ class InvalidVariableError(TaskipyError):
 
     def __str__(self):
         return f'variable {self.variable} is invalid. reason: {self.reason}'
+
+
+class ChangedFilesError(TaskipyError):
+    def __init__(self, ref: str, reason: str) -> None:
+        super().__init__()
+        self.ref = ref
+        self.reason = reason
+
+    def __str__(self):
+        return f'could not find the files changed since "{self.ref}". reason: {self.reason}'
+
+
+class AgentError(TaskipyError):
+    def __init__(self, reason: str) -> None:
+        super().__init__()
+        self.reason = reason
+
+    def __str__(self):
+        return f'could not start the agent. reason: {self.reason}'
+
+
+class CallServerError(TaskipyError):
+    def __init__(self, reason: str) -> None:
+        super().__init__()
+        self.reason = reason
+
+    def __str__(self):
+        return f'could not start the call server. reason: {self.reason}'
+
+
+class WorkersUnavailableError(TaskipyError):
+    def __init__(self, reason: str) -> None:
+        super().__init__()
+        self.reason = reason
+
+    def __str__(self):
+        return f'no worker can run the task. reason: {self.reason}'
@@ -0,0 +1,238 @@
+import atexit
+import hashlib
+import queue
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from taskipy.cache import CACHE_DIR_NAME, get_cache_dir
+
+HISTORY_FILE_NAME = 'history.sqlite3'
+EXPECTED_DURATION_WINDOW = 20
+FLUSH_TIMEOUT_SECONDS = 2
+BATCH_WINDOW_SECONDS = 0.05
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    command_hash TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    exit_code INTEGER NOT NULL,
+    peak_rss INTEGER,
+    git_head TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_task ON runs (task, id);
+'''
+INSERT_RUN = (
+    'INSERT INTO runs (task, command_hash, started_at, duration, exit_code, peak_rss, git_head) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+class HistoryWriter:
+    """writes recorded runs to their history databases in batches, on a background thread, so task execution never waits for the disk"""
+
+    def __init__(self):
+        # None wakes the writer up, to write the runs it has without waiting for more to batch with them
+        self.__queue: 'queue.Queue[Optional[Tuple[Path, Tuple[Any, ...]]]]' = queue.Queue()
+        self.__pending = 0
+        self.__condition = threading.Condition()
+        self.__thread: Optional[threading.Thread] = None
+
+    def enqueue(self, db_path: Path, row: Tuple[Any, ...]):
+        with self.__condition:
+            self.__pending += 1
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__write_forever, name='taskipy-history', daemon=True)
+                self.__thread.start()
+                atexit.register(self.flush)
+
+        self.__queue.put((db_path, row))
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT_SECONDS):
+        """waits, up to the given timeout, for every enqueued run to be written"""
+        with self.__condition:
+            if self.__pending == 0:
+                return
+
+        self.__queue.put(None)
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__pending == 0, timeout=timeout)
+
+    def __write_forever(self):
+        while True:
+            batch = []
+            item = self.__queue.get()
+            try:
+                while item is not None:
+                    batch.append(item)
+                    item = self.__queue.get(timeout=BATCH_WINDOW_SECONDS)
+            except queue.Empty:
+                pass
+
+            rows_by_db: Dict[Path, List[Tuple[Any, ...]]] = {}
+            for db_path, row in batch:
+                rows_by_db.setdefault(db_path, []).append(row)
+
+            for db_path, rows in rows_by_db.items():
+                self.__write(db_path, rows)
+
+            with self.__condition:
+                self.__pending -= len(batch)
+                self.__condition.notify_all()
+
+    def __write(self, db_path: Path, rows: List[Tuple[Any, ...]]):
+        import sqlite3  # pylint: disable=C0415
+
+        try:
+            get_cache_dir(db_path.parent.parent)
+            connection = sqlite3.connect(str(db_path), timeout=5)
+            try:
+                connection.executescript(SCHEMA)
+                with connection:
+                    connection.executemany(INSERT_RUN, rows)
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError):
+            # the history is a nice to have, failing to write it must never fail a task
+            pass
+
+
+history_writer = HistoryWriter()
+
+
+class RunHistory:
+    """the history of every task run in a project, kept in a sqlite database in the project's cache dir"""
+
+    def __init__(self, project_dir: Path):
+        self.__project_dir = project_dir
+        self.__db_path = project_dir / CACHE_DIR_NAME / HISTORY_FILE_NAME
+
+    def record(  # pylint: disable=R0913,R0917
+        self,
+        task_name: str,
+        command: str,
+        started_at: float,
+        duration: float,
+        exit_code: int,
+        peak_rss: Optional[int],
+    ):
+        command_hash = hashlib.sha256(command.encode()).hexdigest()[:16]
+        git_head = read_git_head(str(self.__project_dir))
+        history_writer.enqueue(
+            self.__db_path,
+            (task_name, command_hash, started_at, duration, exit_code, peak_rss, git_head),
+        )
+
+    def expected_duration(self, task_name: str) -> Optional[float]:
+        """the median duration of the task's recent successful runs, or None if it never ran successfully"""
+        durations = self.durations(task_name, limit=EXPECTED_DURATION_WINDOW)
+        return percentile(durations, 50) if durations else None
+
+    def durations(self, task_name: str, limit: int) -> List[float]:
+        """durations of the task's most recent successful runs, newest first"""
+        rows = self.__query(
+            'SELECT duration FROM runs WHERE task = ? AND exit_code = 0 ORDER BY id DESC LIMIT ?',
+            (task_name, limit),
+        )
+        return [row[0] for row in rows]
+
+    def task_names(self) -> List[str]:
+        return [row[0] for row in self.__query('SELECT DISTINCT task FROM runs ORDER BY task', ())]
+
+    def runs(self, task_name: str, limit: int = 100) -> List[Tuple[Any, ...]]:
+        """the task's most recent runs, newest first.
+
+        every run is a (task, command_hash, started_at, duration, exit_code, peak_rss, git_head) tuple.
+        """
+        return self.__query(
+            'SELECT task, command_hash, started_at, duration, exit_code, peak_rss, git_head FROM runs '
+            'WHERE task = ? ORDER BY id DESC LIMIT ?',
+            (task_name, limit),
+        )
+
+    def totals(self, buckets: List[float]) -> List[Tuple[Any, ...]]:
+        """per task: (task, runs, failed runs, total duration, count of runs within each bucket), ordered by task"""
+        bucket_columns = ''.join(', SUM(duration <= ?)' for _ in buckets)
+        return self.__query(
+            f'SELECT task, COUNT(*), SUM(exit_code != 0), SUM(duration){bucket_columns} FROM runs GROUP BY task ORDER BY task',
+            tuple(buckets),
+        )
+
+    def last_runs(self) -> List[Tuple[Any, ...]]:
+        """the last run of every task, as a (task, started_at, duration, exit_code) tuple"""
+        return self.__query(
+            'SELECT task, started_at, duration, exit_code FROM runs WHERE id IN (SELECT MAX(id) FROM runs GROUP BY task)',
+            (),
+        )
+
+    def __query(self, sql: str, parameters: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        import sqlite3  # pylint: disable=C0415
+
+        if not self.__db_path.exists():
+            return []
+
+        try:
+            connection = sqlite3.connect(str(self.__db_path), timeout=5)
+            try:
+                return connection.execute(sql, parameters).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return []
+
+
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = (len(ordered) - 1) * percent / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+@lru_cache(maxsize=None)
+def read_git_head(directory: str) -> Optional[str]:
+    """the commit checked out in the git repository that contains the directory, read straight from the .git dir"""
+    git_dir = _find_git_dir(Path(directory))
+    if git_dir is None:
+        return None
+
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+        if not head.startswith('ref: '):
+            return head
+
+        ref = head[len('ref: '):]
+        common_dir = git_dir
+        if (git_dir / 'commondir').is_file():
+            common_dir = (git_dir / (git_dir / 'commondir').read_text().strip()).resolve()
+
+        for refs_dir in (git_dir, common_dir):
+            if (refs_dir / ref).is_file():
+                return (refs_dir / ref).read_text().strip()
+
+        packed_refs = common_dir / 'packed-refs'
+        if packed_refs.is_file():
+            for line in packed_refs.read_text().splitlines():
+                if line.endswith(f' {ref}'):
+                    return line.split(' ', 1)[0]
+    except OSError:
+        pass
+
+    return None
+
+
+def _find_git_dir(directory: Path) -> Optional[Path]:
+    for candidate in [directory] + list(directory.parents):
+        dot_git = candidate / '.git'
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # worktrees and submodules point to their git dir from a .git file
+            content = dot_git.read_text().strip()
+            if content.startswith('gitdir: '):
+                return (candidate / content[len('gitdir: '):]).resolve()
+    return None
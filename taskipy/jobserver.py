@@ -0,0 +1,132 @@
+import os
+import re
+import select
+import threading
+from typing import Dict, Optional, Tuple
+
+from taskipy.running_processes import running_processes
+
+MAKEFLAGS_ENV_VAR = 'MAKEFLAGS'
+JOBSERVER_AUTH_REGEX = re.compile(r'--jobserver-(?:auth|fds)=(?:fifo:(\S+)|(\d+),(\d+))')
+JOBS_FLAG_REGEX = re.compile(r'(?:^|\s)-j(\d*)(?=\s|$)')
+TOKEN = b'+'
+# how long a job waits for a token in the pipe before it checks again whether the implicit token was released, or
+# taskipy was interrupted
+TOKEN_WAIT_INTERVAL_SECONDS = 0.05
+
+
+class JobServer:
+    """a GNU make compatible jobserver: a pipe that holds one token for every job that may run besides the first.
+
+    every process in the tree gets one implicit token for free, and has to read a token from the pipe for every
+    other job it runs at the same time, writing it back once the job is done. since the pipe is shared through
+    MAKEFLAGS, nested taskipy runs, as well as make, cargo and other jobserver aware tools, all draw from it.
+    """
+
+    def __init__(self, read_fd: int, write_fd: int, makeflags: str):
+        self.__read_fd = read_fd
+        self.__write_fd = write_fd
+        self.__makeflags = makeflags
+        self.__implicit_token_available = True
+        self.__lock = threading.Lock()
+
+    @property
+    def pass_fds(self) -> Tuple[int, int]:
+        """file descriptors that child processes have to inherit in order to use the jobserver"""
+        return self.__read_fd, self.__write_fd
+
+    @property
+    def environment(self) -> Dict[str, str]:
+        return {MAKEFLAGS_ENV_VAR: self.__makeflags}
+
+    @property
+    def jobs(self) -> Optional[int]:
+        """the limit of jobs the jobserver was started with, if its MAKEFLAGS tell"""
+        match = JOBS_FLAG_REGEX.search(self.__makeflags)
+        return int(match.group(1)) if match is not None and match.group(1) else None
+
+    def acquire(self) -> Optional[bytes]:
+        """blocks until a job may start, and returns the token to release once it is done.
+
+        raises KeyboardInterrupt if taskipy is interrupted while the job waits.
+        """
+        while True:
+            with self.__lock:
+                if self.__implicit_token_available:
+                    self.__implicit_token_available = False
+                    return None
+
+            if running_processes.interrupted:
+                raise KeyboardInterrupt()
+
+            # never blocks in a read for long, since the implicit token may be released while no token is in the pipe
+            try:
+                readable, _, _ = select.select([self.__read_fd], [], [], TOKEN_WAIT_INTERVAL_SECONDS)
+                token = os.read(self.__read_fd, 1) if readable else b''
+            except InterruptedError:
+                continue
+
+            if token:
+                return token
+
+    def release(self, token: Optional[bytes]):
+        if token is None:
+            with self.__lock:
+                self.__implicit_token_available = True
+        else:
+            os.write(self.__write_fd, token)
+
+    @staticmethod
+    def create(jobs: int) -> 'JobServer':
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, TOKEN * (jobs - 1))
+
+        inherited_makeflags = JOBS_FLAG_REGEX.sub('', JOBSERVER_AUTH_REGEX.sub('', os.environ.get(MAKEFLAGS_ENV_VAR, '')))
+        makeflags = f'-j{jobs} --jobserver-auth={read_fd},{write_fd} {inherited_makeflags.strip()}'.strip()
+
+        return JobServer(read_fd, write_fd, makeflags)
+
+    @staticmethod
+    def from_environment() -> Optional['JobServer']:
+        makeflags = os.environ.get(MAKEFLAGS_ENV_VAR, '')
+        match = JOBSERVER_AUTH_REGEX.search(makeflags)
+        if match is None:
+            return None
+
+        fifo_path, read_fd, write_fd = match.groups()
+        try:
+            if fifo_path is not None:
+                fd = os.open(fifo_path, os.O_RDWR)
+                return JobServer(fd, fd, makeflags)
+
+            # make only passes the pipe to commands it considers recursive, so it may be missing
+            os.fstat(int(read_fd))
+            os.fstat(int(write_fd))
+            return JobServer(int(read_fd), int(write_fd), makeflags)
+        except OSError:
+            return None
+
+
+_jobserver: Optional[JobServer] = None
+_jobserver_initialized = False
+_jobserver_lock = threading.Lock()
+
+
+def start_jobserver(jobs: int) -> Optional[JobServer]:
+    """creates a jobserver that limits the whole tree of processes to the given number of jobs"""
+    global _jobserver, _jobserver_initialized  # pylint: disable=W0603
+    with _jobserver_lock:
+        # jobserver pipes can only be inherited by child processes on posix systems
+        _jobserver = JobServer.create(jobs) if os.name == 'posix' else None
+        _jobserver_initialized = True
+        return _jobserver
+
+
+def get_jobserver() -> Optional[JobServer]:
+    """returns the jobserver of this process, joining the one inherited from the environment if there is one"""
+    global _jobserver, _jobserver_initialized  # pylint: disable=W0603
+    with _jobserver_lock:
+        if not _jobserver_initialized:
+            _jobserver = JobServer.from_environment() if os.name == 'posix' else None
+            _jobserver_initialized = True
+        return _jobserver
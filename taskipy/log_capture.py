@@ -0,0 +1,136 @@
+import gzip
+import itertools
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, List, Optional
+
+from taskipy.cache import get_cache_dir
+
+LOGS_DIR_NAME = 'logs'
+MAX_LOGS_PER_TASK = 20
+READ_SIZE = 64 * 1024
+# a lower level than gzip's default, since the log is compressed while the task is writing it
+COMPRESS_LEVEL = 6
+
+
+class OutputTail:
+    """the last `max_bytes` bytes written to it, in at most twice that much memory"""
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__buffer = bytearray()
+        self.__truncated = False
+
+    @property
+    def truncated(self) -> bool:
+        return self.__truncated
+
+    def write(self, data: bytes):
+        self.__buffer += data
+        if len(self.__buffer) > 2 * self.__max_bytes:
+            del self.__buffer[:-self.__max_bytes]
+            self.__truncated = True
+
+    def getvalue(self) -> bytes:
+        tail = bytes(self.__buffer[-self.__max_bytes:])
+        if self.__truncated or len(self.__buffer) > self.__max_bytes:
+            # drop the partial line the tail starts in the middle of
+            _, _, tail = tail.partition(b'\n')
+        return tail
+
+
+class LogCapture:
+    """tees the output and errors of a task's process to their own streams and to a gzipped log file, while keeping
+    the tail of both in memory"""
+
+    def __init__(self, log_path: Path, tail_bytes: int, output: IO[bytes], errors: IO[bytes]):
+        self.__log_path = log_path
+        self.__tail = OutputTail(tail_bytes)
+        self.__output = output
+        self.__errors = errors
+        self.__log_file: Optional[gzip.GzipFile] = None
+        # the output and the errors are copied by threads of their own, which take turns writing to the log and the tail
+        self.__lock = threading.Lock()
+        self.__threads: List[threading.Thread] = []
+
+    @property
+    def log_path(self) -> Path:
+        return self.__log_path
+
+    @property
+    def tail(self) -> bytes:
+        return self.__tail.getvalue()
+
+    def start(self, process: Any):
+        """starts copying the output and errors of a process that was started with `stdout=subprocess.PIPE` and
+        `stderr=subprocess.PIPE`. a process whose errors are part of its output, like a worker's, has no `stderr`"""
+        streams = [(stream, sink) for stream, sink in [(process.stdout, self.__output), (getattr(process, 'stderr', None), self.__errors)] if stream is not None]
+        if not streams:
+            return
+
+        self.__log_file = gzip.open(str(self.__log_path), 'wb', compresslevel=COMPRESS_LEVEL)
+        for stream, sink in streams:
+            thread = threading.Thread(target=self.__copy, args=(stream, sink), name='taskipy-log', daemon=True)
+            thread.start()
+            self.__threads.append(thread)
+
+    def wait(self):
+        """waits until the process closed its output and errors, and the log file was completely written"""
+        for thread in self.__threads:
+            thread.join()
+        if self.__log_file is not None:
+            self.__log_file.close()
+            self.__log_file = None
+
+    def __copy(self, stream: IO[bytes], sink: IO[bytes]):
+        assert self.__log_file is not None
+        with stream:
+            while True:
+                data = os.read(stream.fileno(), READ_SIZE)
+                if not data:
+                    break
+
+                sink.write(data)
+                sink.flush()
+                with self.__lock:
+                    self.__log_file.write(data)
+                    self.__tail.write(data)
+
+
+class FailureTail:
+    def __init__(self, run_name: str, exit_code: int, tail: bytes, log_path: Path):
+        self.__run_name = run_name
+        self.__exit_code = exit_code
+        self.__tail = tail
+        self.__log_path = log_path
+
+    @property
+    def tail(self) -> bytes:
+        return self.__tail
+
+    def __str__(self):
+        return f'"{self.__run_name}" failed with exit code {self.__exit_code}, full log at {self.__log_path}'
+
+
+def create_log_path(project_dir: Path, task_name: str) -> Path:
+    """a new log file path for a run of the task, removing the oldest logs of the task beyond MAX_LOGS_PER_TASK"""
+    task_logs_dir = get_cache_dir(project_dir) / LOGS_DIR_NAME / re.sub(r'[^A-Za-z0-9._-]+', '_', task_name)
+    task_logs_dir.mkdir(parents=True, exist_ok=True)
+
+    old_logs = sorted(task_logs_dir.glob('*.log.gz'))
+    for old_log in old_logs[:max(0, len(old_logs) - MAX_LOGS_PER_TASK + 1)]:
+        try:
+            old_log.unlink()
+        except OSError:
+            pass
+
+    now = time.time()
+    timestamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+    # shards of a task run in the same process at the same time, so the pid alone doesn't make the name unique
+    return task_logs_dir / f'{timestamp}-{int(now * 1000) % 1000:03d}-{os.getpid()}-{next(_log_counter)}.log.gz'
+
+
+_log_counter = itertools.count()
@@ -0,0 +1,18 @@
+import itertools
+from typing import Dict, List
+
+
+def expand_matrix(matrix: Dict[str, List[str]], exclude: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """every combination of the matrix values, in the order they were declared, except the excluded ones"""
+    names = list(matrix)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(matrix[name] for name in names))]
+
+    return [
+        combination for combination in combinations
+        if not any(all(combination[name] == value for name, value in rule.items()) for rule in exclude)
+    ]
+
+
+def format_combination(task_name: str, combination: Dict[str, str]) -> str:
+    values = ', '.join(f'{name}={value}' for name, value in combination.items())
+    return f'{task_name}[{values}]'
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from taskipy.history import RunHistory, history_writer
+
+DURATION_BUCKETS = [0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600]
+
+
+class MetricsFile:
+    """exports the run history of a project as a file that node_exporter's textfile collector can read"""
+
+    def __init__(self, path: Path, project: str, history: RunHistory):
+        self.__path = path
+        self.__project = project
+        self.__history = history
+
+    def write(self):
+        """writes the metrics of all the tasks of the project, atomically replacing the file.
+
+        a file that can't be written is warned about, since exporting metrics must never fail the run it measures.
+        """
+        # the runs of this very invocation may still be on their way to the history
+        history_writer.flush()
+
+        try:
+            self.__replace_file(self.__render())
+        except OSError as e:
+            print(f'warning: could not export metrics to {self.__path}: {e}', file=sys.stderr)
+
+    def __replace_file(self, contents: str):
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+
+        # renamed into place, so that a scrape never reads a half written file
+        fd, temp_path = tempfile.mkstemp(dir=str(self.__path.parent), prefix=f'.{self.__path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write(contents)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, str(self.__path))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def __render(self) -> str:
+        lines = [
+            '# HELP taskipy_task_duration_seconds How long task runs took.',
+            '# TYPE taskipy_task_duration_seconds histogram',
+        ]
+        runs: List[str] = []
+        failures: List[str] = []
+
+        for task, count, failed, total_duration, *bucket_counts in self.__history.totals(DURATION_BUCKETS):
+            labels = {'project': self.__project, 'task': task}
+
+            for bucket, bucket_count in zip(DURATION_BUCKETS, bucket_counts):
+                lines.append(self.__sample('taskipy_task_duration_seconds_bucket', dict(labels, le=f'{bucket:g}'), bucket_count))
+            lines.append(self.__sample('taskipy_task_duration_seconds_bucket', dict(labels, le='+Inf'), count))
+            lines.append(self.__sample('taskipy_task_duration_seconds_sum', labels, total_duration))
+            lines.append(self.__sample('taskipy_task_duration_seconds_count', labels, count))
+
+            runs.append(self.__sample('taskipy_task_runs_total', labels, count))
+            failures.append(self.__sample('taskipy_task_failures_total', labels, failed))
+
+        lines += ['# HELP taskipy_task_runs_total Runs of the task.', '# TYPE taskipy_task_runs_total counter'] + runs
+        lines += ['# HELP taskipy_task_failures_total Runs of the task that failed.', '# TYPE taskipy_task_failures_total counter'] + failures
+
+        return '\n'.join(lines + self.__render_last_runs()) + '\n'
+
+    def __render_last_runs(self) -> List[str]:
+        last_exit_codes: List[str] = []
+        last_durations: List[str] = []
+        last_timestamps: List[str] = []
+        for task, started_at, duration, exit_code in sorted(self.__history.last_runs()):
+            labels = {'project': self.__project, 'task': task}
+            last_exit_codes.append(self.__sample('taskipy_task_last_exit_code', labels, exit_code))
+            last_durations.append(self.__sample('taskipy_task_last_duration_seconds', labels, duration))
+            last_timestamps.append(self.__sample('taskipy_task_last_run_timestamp_seconds', labels, started_at + duration))
+
+        lines = ['# HELP taskipy_task_last_exit_code Exit code of the last run of the task.', '# TYPE taskipy_task_last_exit_code gauge'] + last_exit_codes
+        lines += ['# HELP taskipy_task_last_duration_seconds How long the last run of the task took.', '# TYPE taskipy_task_last_duration_seconds gauge'] + last_durations
+        lines += ['# HELP taskipy_task_last_run_timestamp_seconds When the last run of the task finished.', '# TYPE taskipy_task_last_run_timestamp_seconds gauge'] + last_timestamps
+
+        return lines
+
+    def __sample(self, name: str, labels: Dict[str, str], value: float) -> str:
+        formatted_labels = ','.join(f'{label}="{self.__escape(label_value)}"' for label, label_value in labels.items())
+        return f'{name}{{{formatted_labels}}} {value!r}'
+
+    def __escape(self, label_value: str) -> str:
+        return label_value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from taskipy.progress import progress_display
+from taskipy.running_processes import INTERRUPTED_EXIT_CODE, running_processes
+
+
+class Job:
+    def __init__(self, name: str, run: Callable[[], int], expected_duration: float = 0):
+        self.__name = name
+        self.__run = run
+        self.__expected_duration = expected_duration
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def expected_duration(self) -> float:
+        return self.__expected_duration
+
+    def run(self) -> int:
+        return self.__run()
+
+
+class ParallelExecutor:
+    """runs jobs concurrently on a bounded number of worker threads.
+
+    jobs that are expected to take the longest start first, so that a slow job
+    does not start last and stretch the total duration of the run.
+    """
+
+    def __init__(self, max_jobs: Optional[int] = None):
+        self.__max_jobs = max(1, max_jobs or os.cpu_count() or 1)
+
+    @property
+    def max_jobs(self) -> int:
+        return self.__max_jobs
+
+    def run(self, jobs: List[Job], progress_title: Optional[str] = None) -> List[int]:
+        """runs the given jobs and returns their exit codes, in the order of the jobs.
+
+        with a `progress_title`, the progress of the jobs is shown at the bottom of the terminal while they run. it
+        should only be given for jobs whose output taskipy prints itself, through the progress display.
+        """
+        exit_codes: List[int] = [INTERRUPTED_EXIT_CODE] * len(jobs)
+        if not jobs:
+            return exit_codes
+
+        running_processes.forward_sigterm()
+        show_progress = progress_title is not None and progress_display.start(progress_title, len(jobs))
+        try:
+            self.__run_jobs(jobs, exit_codes, show_progress)
+        finally:
+            if show_progress:
+                progress_display.stop()
+
+        return exit_codes
+
+    def __run_jobs(self, jobs: List[Job], exit_codes: List[int], show_progress: bool):
+        with ThreadPoolExecutor(max_workers=min(self.__max_jobs, len(jobs))) as executor:
+            longest_first = sorted(range(len(jobs)), key=lambda index: -jobs[index].expected_duration)
+            futures: Dict[Future, int] = {
+                executor.submit(self.__run_job, jobs[index], show_progress): index for index in longest_first
+            }
+            pending = set(futures)
+
+            while pending:
+                try:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    # the interrupt reached the tasks as well, so let the running ones
+                    # finish on their own terms, and do not start the ones left
+                    running_processes.mark_interrupted()
+                    for future in pending:
+                        future.cancel()
+                    continue
+
+                for future in done:
+                    if not future.cancelled():
+                        exit_codes[futures[future]] = future.result()
+
+    def __run_job(self, job: Job, show_progress: bool) -> int:
+        if not show_progress:
+            return job.run()
+
+        progress_display.job_started(job)
+        exit_code = INTERRUPTED_EXIT_CODE
+        try:
+            exit_code = job.run()
+            return exit_code
+        finally:
+            progress_display.job_finished(job, exit_code)
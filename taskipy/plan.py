@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+from taskipy.task import Task
+
+
+class Step:
+    """a single command to run, along with the task whose settings it runs with"""
+
+    def __init__(self, task: Task, command: str):
+        self.__task = task
+        self.__command = command
+
+    @property
+    def task(self) -> Task:
+        return self.__task
+
+    @property
+    def command(self) -> str:
+        """the formatted command, before the runner and the command line args are added to it"""
+        return self.__command
+
+
+class Stage:
+    """steps that run one after the other, or all at the same time if the stage is parallel"""
+
+    def __init__(
+        self,
+        steps: List[Step],
+        parallel: bool = False,
+        max_parallel: Optional[int] = None,
+        takes_args: bool = False,
+    ):
+        self.__steps = steps
+        self.__parallel = parallel
+        self.__max_parallel = max_parallel
+        self.__takes_args = takes_args
+
+    @property
+    def steps(self) -> List[Step]:
+        return self.__steps
+
+    @property
+    def parallel(self) -> bool:
+        return self.__parallel
+
+    @property
+    def max_parallel(self) -> Optional[int]:
+        return self.__max_parallel
+
+    @property
+    def takes_args(self) -> bool:
+        """whether the command line args passed to the task are added to the commands of this stage"""
+        return self.__takes_args
+
+
+class Plan:
+    """everything that running a task does, in the order it does it: its pre hook, the task itself and its post hook"""
+
+    def __init__(self, task_name: str, stages: List[Stage], cwd: Optional[str] = None):
+        self.__task_name = task_name
+        self.__stages = stages
+        self.__cwd = cwd
+
+    @property
+    def task_name(self) -> str:
+        return self.__task_name
+
+    @property
+    def stages(self) -> List[Stage]:
+        return self.__stages
+
+    @property
+    def cwd(self) -> Optional[str]:
+        """the working directory the task runs in, relative to the project's dir, or None to run where taskipy was called"""
+        return self.__cwd
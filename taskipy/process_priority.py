@@ -0,0 +1,77 @@
+import os
+import sys
+from typing import Any, Dict, List
+
+from taskipy.task import Task
+
+IONICE_CLASS_CONSTANTS = {
+    # linux io scheduling classes first, falling back to the windows io priorities
+    'idle': ('IOPRIO_CLASS_IDLE', 'IOPRIO_VERYLOW'),
+    'best-effort': ('IOPRIO_CLASS_BE', 'IOPRIO_NORMAL'),
+    'realtime': ('IOPRIO_CLASS_RT', 'IOPRIO_HIGH'),
+}
+
+
+def get_process_priority(task: Task) -> Dict[str, Any]:
+    """the task's nice, ionice and cpu_affinity settings, without the ones it does not use"""
+    settings = {'nice': task.nice, 'ionice': task.ionice, 'cpu_affinity': task.cpu_affinity}
+    return {name: value for name, value in settings.items() if value is not None}
+
+
+def priority_launcher_args(task: Task, shell_command: str) -> List[str]:
+    """arguments for running a shell command with the task's process priority.
+
+    the launcher applies the priority to itself, and only then replaces itself with the shell,
+    so that the command, and everything it starts, runs with the priority from its very first
+    instruction. posix only, since windows has no exec.
+    """
+    import json  # pylint: disable=C0415
+
+    return [
+        sys.executable, '-m', 'taskipy.process_priority',
+        task.name, json.dumps(get_process_priority(task)), shell_command,
+    ]
+
+
+def apply_process_priority(task_name: str, settings: Dict[str, Any], pid: int):
+    # imported here, since only the tasks that set a priority need psutil, and it is slow to import
+    import psutil  # type: ignore  # pylint: disable=C0415
+
+    try:
+        process = psutil.Process(pid)
+
+        if 'nice' in settings:
+            process.nice(settings['nice'])
+
+        if 'ionice' in settings:
+            constant_name = next(
+                (name for name in IONICE_CLASS_CONSTANTS[settings['ionice']] if hasattr(psutil, name)),
+                None,
+            )
+            if constant_name is None:
+                _warn_priority_not_applied(task_name, 'not supported on this platform')
+            else:
+                process.ionice(getattr(psutil, constant_name))
+
+        if 'cpu_affinity' in settings:
+            process.cpu_affinity(settings['cpu_affinity'])
+    except psutil.NoSuchProcess:
+        pass
+    except (psutil.AccessDenied, AttributeError, ValueError) as e:
+        _warn_priority_not_applied(task_name, 'permission denied' if isinstance(e, psutil.AccessDenied) else 'not supported on this platform')
+
+
+def _warn_priority_not_applied(task_name: str, reason: str):
+    print(f'task "{task_name}": could not apply process priority ({reason}), ignoring it', file=sys.stderr, flush=True)
+
+
+def main():
+    import json  # pylint: disable=C0415
+
+    task_name, settings, shell_command = sys.argv[1:4]
+    apply_process_priority(task_name, json.loads(settings), os.getpid())
+    os.execv('/bin/sh', ['/bin/sh', '-c', shell_command])
+
+
+if __name__ == '__main__':
+    main()
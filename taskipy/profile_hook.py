@@ -0,0 +1,98 @@
+"""profiles a python process from its start until it exits, and saves the profile in the directory of a profiled run.
+
+`task --profile` copies this module into the run's directory as `sitecustomize.py`, and puts it first on the
+PYTHONPATH of the task, so that every python process the task starts imports it before anything else. it runs in
+interpreters that may not have taskipy installed, so it must only use the standard library.
+"""
+import atexit
+import os
+import signal
+import sys
+from typing import Any, Dict
+
+PROFILE_DIR_ENV_VAR = 'TASKIPY_PROFILE_DIR'
+
+
+def start_profiling(profile_dir: str):
+    """profiles this process, and the processes forked from it, each into a `<pid>.pstats` file of the directory"""
+    import cProfile  # pylint: disable=C0415
+
+    state: Dict[str, Any] = {'profiler': cProfile.Profile(), 'pid': os.getpid(), 'dumped': False, 'saving': False, 'pending_signal': None}
+
+    def terminate(signum: int):
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+    def dump():
+        if state['dumped'] or state['pid'] != os.getpid():
+            return
+
+        state.update(dumped=True, saving=True)
+        state['profiler'].disable()
+        # renamed into place, so that a process killed while saving its profile leaves no partial one behind
+        profile_path = os.path.join(profile_dir, f'{os.getpid()}.pstats')
+        try:
+            state['profiler'].dump_stats(f'{profile_path}.tmp')
+            os.replace(f'{profile_path}.tmp', profile_path)
+        except OSError:
+            pass
+        finally:
+            state['saving'] = False
+
+        if state['pending_signal'] is not None:
+            terminate(state['pending_signal'])
+
+    def dump_and_terminate(signum: int, _frame: Any):
+        if state['saving']:
+            # the process was already exiting, and ends as soon as its profile is saved
+            state['pending_signal'] = signum
+            return
+
+        dump()
+        terminate(signum)
+
+    def restart_in_child():
+        # the child inherits the parent's profile so far, which the parent saves itself
+        state['profiler'].disable()
+        state.update(profiler=cProfile.Profile(), pid=os.getpid(), dumped=False, saving=False, pending_signal=None)
+        state['profiler'].enable()
+
+        # forked workers, such as the ones of a multiprocessing pool, are often stopped with SIGTERM
+        if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, dump_and_terminate)
+
+    original_exit = os._exit  # pylint: disable=W0212
+
+    def exit_after_dumping(code: int):
+        dump()
+        original_exit(code)
+
+    atexit.register(dump)
+    # forked processes, such as the workers of multiprocessing, leave with os._exit and skip the atexit handlers
+    os._exit = exit_after_dumping  # type: ignore
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=restart_in_child)
+
+    state['profiler'].enable()
+
+
+def _import_shadowed_sitecustomize():
+    """imports the sitecustomize module this one took the place of, if there is one"""
+    hook_dir = os.path.dirname(os.path.abspath(__file__))
+    this_module = sys.modules.pop('sitecustomize')
+    original_path = list(sys.path)
+    sys.path[:] = [entry for entry in sys.path if os.path.abspath(entry or os.curdir) != hook_dir]
+
+    try:
+        import sitecustomize  # type: ignore # pylint: disable=C0415,W0611,E0401
+    except ImportError:
+        pass
+    finally:
+        sys.path[:] = original_path
+        sys.modules['sitecustomize'] = this_module
+
+
+if __name__ == 'sitecustomize':
+    if os.environ.get(PROFILE_DIR_ENV_VAR):
+        start_profiling(os.environ[PROFILE_DIR_ENV_VAR])
+    _import_shadowed_sitecustomize()
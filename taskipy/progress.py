@@ -0,0 +1,151 @@
+import os
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import colorama  # type: ignore
+
+if TYPE_CHECKING:
+    from taskipy.parallel import Job
+
+REFRESH_INTERVAL = 0.25
+MAX_RUNNING_LINES = 10
+
+
+class ProgressDisplay:  # pylint: disable=R0902
+    """a status view at the bottom of the terminal, of the jobs of a concurrent run that are running, and of how many are done.
+
+    it is only shown when stderr is a terminal. it is redrawn at a fixed rate, and only when its text changed, and it
+    is cleared while taskipy prints anything else, so it never mixes with the output of the tasks.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__title: Optional[str] = None
+        self.__total = 0
+        self.__done = 0
+        self.__failed = 0
+        self.__running: Dict['Job', float] = {}
+        self.__drawn_lines: List[str] = []
+        self.__stopped = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__colorama_initialized = False
+
+    def start(self, title: str, total: int) -> bool:
+        """starts showing the progress of a run of `total` jobs, and returns whether it does.
+
+        it doesn't if stderr isn't a terminal, or if the progress of another run is already shown.
+        """
+        if not sys.stderr.isatty() or os.environ.get('TERM') == 'dumb':
+            return False
+
+        with self.__lock:
+            if self.__title is not None:
+                return False
+
+            if not self.__colorama_initialized:
+                colorama.init()
+                self.__colorama_initialized = True
+
+            self.__title = title
+            self.__total = total
+            self.__done = self.__failed = 0
+            self.__running = {}
+            self.__stopped.clear()
+
+        self.__thread = threading.Thread(target=self.__refresh, daemon=True)
+        self.__thread.start()
+        return True
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+        with self.__lock:
+            self.__erase()
+            self.__title = None
+
+    def job_started(self, job: 'Job'):
+        with self.__lock:
+            self.__running[job] = time.perf_counter()
+
+    def job_finished(self, job: 'Job', exit_code: int):
+        with self.__lock:
+            self.__running.pop(job, None)
+            self.__done += 1
+            if exit_code != 0:
+                self.__failed += 1
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """clears the status view while the block prints something, it is drawn again on the next refresh"""
+        with self.__lock:
+            self.__erase()
+            yield
+
+    def print(self, message: str):
+        """prints a message to stderr, above the status view if it is shown"""
+        with self.paused():
+            print(message, file=sys.stderr, flush=True)
+
+    def __refresh(self):
+        while not self.__stopped.wait(REFRESH_INTERVAL):
+            with self.__lock:
+                lines = self.__render()
+                if lines != self.__drawn_lines:
+                    self.__erase()
+                    sys.stderr.write('\n'.join(lines))
+                    sys.stderr.flush()
+                    self.__drawn_lines = lines
+
+    def __erase(self):
+        if not self.__drawn_lines:
+            return
+
+        # the cursor is left at the end of the last line of the view, so it goes back to the start of the first one
+        up = colorama.Cursor.UP(len(self.__drawn_lines) - 1) if len(self.__drawn_lines) > 1 else ''
+        sys.stderr.write(f'\r{up}{colorama.ansi.clear_screen(0)}')
+        sys.stderr.flush()
+        self.__drawn_lines = []
+
+    def __render(self) -> List[str]:
+        columns, rows = shutil.get_terminal_size()
+        now = time.perf_counter()
+        running: List[Tuple['Job', float]] = sorted(self.__running.items(), key=lambda item: item[1])
+        shown = running[:max(0, min(MAX_RUNNING_LINES, rows - 2))]
+
+        lines = [self.__render_job(job, now - started_at, columns) for job, started_at in shown]
+        if len(running) > len(shown):
+            lines.append(f'  ... and {len(running) - len(shown)} more')
+
+        waiting = self.__total - self.__done - len(running)
+        status = f'{self.__title}: {len(running)} running, {waiting} waiting, {self.__done} done'
+        if self.__failed:
+            status += f', {colorama.Fore.RED}{self.__failed} failed{colorama.Style.RESET_ALL}'
+        lines.append(status)
+
+        return lines
+
+    def __render_job(self, job: 'Job', elapsed: float, columns: int) -> str:
+        times = _format_seconds(elapsed)
+        if job.expected_duration:
+            times += f' / ~{_format_seconds(job.expected_duration)}'
+        color = colorama.Fore.YELLOW if job.expected_duration and elapsed > job.expected_duration else ''
+
+        # a line that wraps would take more than one row, and leave part of it behind once the view is erased
+        name = job.name[:max(0, columns - len(times) - 4)]
+        return f'  {colorama.Fore.CYAN}{name}{colorama.Style.RESET_ALL} {color}{times}{colorama.Style.RESET_ALL}'
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 60:
+        return f'{int(seconds)}s'
+    return f'{int(seconds // 60)}m{int(seconds % 60):02d}s'
+
+
+progress_display = ProgressDisplay()
@@ -1,12 +1,17 @@
+import os
+import re
 import tomli
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, MutableMapping, Optional, Union
+from typing import Any, Dict, List, MutableMapping, Optional, Union
 
+from taskipy.env import parse_env_files, parse_env_table
 from taskipy.task import Task
 from taskipy.variable import Variable
 from taskipy.exceptions import (
     InvalidRunnerTypeError,
+    InvalidSettingError,
     InvalidVariableError,
     MalformedPyProjectError,
     MissingPyProjectFileError,
@@ -14,13 +19,23 @@ from taskipy.exceptions import (
 )
 
 
+PYPROJECT_PATH_ENV_VAR = 'TASKIPY_PYPROJECT'
+DEFAULT_REGRESSION_THRESHOLD = 30
+DEFAULT_LOG_TAIL_KB = 32
+
+
 class PyProject:
     def __init__(self, base_dir: Path):
         self.__pyproject_path = PyProject.__find_pyproject_path(base_dir)
         self.__items = PyProject.__load_toml_file(self.__pyproject_path)
+        self.__tasks: Optional[Dict[str, Task]] = None
 
     @property
     def tasks(self) -> Dict[str, Task]:
+        # built once, since a run looks up the task, its hooks and its working dir in it
+        if self.__tasks is not None:
+            return self.__tasks
+
         try:
             toml_tasks = self.__items['tool']['taskipy']['tasks'].items()
         except KeyError:
@@ -30,8 +45,13 @@ class PyProject:
         for name, toml_contents in toml_tasks:
             tasks[name] = Task(name, toml_contents)
 
+        self.__tasks = tasks
         return tasks
 
+    @property
+    def path(self) -> Path:
+        return self.__pyproject_path
+
     @property
     def dirpath(self) -> Path:
         return self.__pyproject_path.parent
@@ -85,6 +105,142 @@ class PyProject:
         except KeyError:
             return None
 
+    @property
+    def cache_runner_env(self) -> bool:
+        """whether to resolve the environment the runner sets up once, instead of running the runner for every command"""
+        value = self.settings.get('cache_runner_env', False)
+        if not isinstance(value, bool):
+            raise InvalidSettingError('cache_runner_env', 'cache_runner_env is not a bool')
+        return value
+
+    @property
+    def progress(self) -> bool:
+        """whether to show the progress of concurrent runs at the bottom of the terminal"""
+        value = self.settings.get('progress', True)
+        if not isinstance(value, bool):
+            raise InvalidSettingError('progress', 'progress is not a bool')
+        return value
+
+    @property
+    def env(self) -> Dict[str, str]:
+        value = self.settings.get('env', {})
+        env = parse_env_table(value)
+        if env is None:
+            raise InvalidSettingError('env', 'env is not a table of strings')
+        return env
+
+    @property
+    def env_files(self) -> List[str]:
+        value = self.settings.get('env_file')
+        if value is None:
+            return []
+
+        env_files = parse_env_files(value)
+        if env_files is None:
+            raise InvalidSettingError('env_file', 'env_file is not a path or a list of paths')
+        return env_files
+
+    @property
+    def regression_threshold(self) -> Optional[float]:
+        """how many percent slower than its baseline a run must be to warn about it, or None if regressions aren't checked"""
+        value = self.settings.get('regression_threshold', DEFAULT_REGRESSION_THRESHOLD)
+        if value is False:
+            return None
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise InvalidSettingError('regression_threshold', 'regression_threshold is not a positive number or false')
+        return float(value)
+
+    @property
+    def log(self) -> bool:
+        value = self.settings.get('log', False)
+        if not isinstance(value, bool):
+            raise InvalidSettingError('log', 'log is not a bool')
+        return value
+
+    @property
+    def log_tail_bytes(self) -> int:
+        value = self.settings.get('log_tail_kb', DEFAULT_LOG_TAIL_KB)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise InvalidSettingError('log_tail_kb', 'log_tail_kb is not a positive int')
+        return value * 1024
+
+    @property
+    def preload(self) -> List[str]:
+        """modules that the call server running the project's `call` tasks imports once, when it starts"""
+        value = self.settings.get('preload', [])
+        if not isinstance(value, list) or not all(isinstance(module, str) for module in value):
+            raise InvalidSettingError('preload', 'preload is not a list of module names')
+        return value
+
+    @property
+    def metrics_file(self) -> Optional[Path]:
+        """where to export task metrics for node_exporter's textfile collector, if anywhere"""
+        value = self.settings.get('metrics_file')
+        if value is None:
+            return None
+
+        if not isinstance(value, str) or not value:
+            raise InvalidSettingError('metrics_file', 'metrics_file is not a path')
+        return self.dirpath / value
+
+    @property
+    def trace_file(self) -> Optional[Path]:
+        """the file to append the spans of every run to, as OTLP/JSON lines, if any"""
+        value = self.settings.get('trace_file')
+        if value is None:
+            return None
+
+        if not isinstance(value, str) or not value:
+            raise InvalidSettingError('trace_file', 'trace_file is not a path')
+        return self.dirpath / value
+
+    @property
+    def trace_endpoint(self) -> Optional[str]:
+        """the OTLP/HTTP endpoint to post the spans of every run to, if any"""
+        value = self.settings.get('trace_endpoint')
+        if value is None:
+            return None
+
+        if not isinstance(value, str) or not value.startswith(('http://', 'https://')):
+            raise InvalidSettingError('trace_endpoint', 'trace_endpoint is not an http(s) url')
+        return value
+
+    @property
+    def package_name(self) -> Optional[str]:
+        """the normalized name of the package, as declared under [project] or [tool.poetry]"""
+        name = self.__items.get('project', {}).get('name')
+        if name is None:
+            name = self.__items.get('tool', {}).get('poetry', {}).get('name')
+
+        return PyProject.__normalize_package_name(name) if isinstance(name, str) else None
+
+    @property
+    def dependency_names(self) -> List[str]:
+        """the normalized names of all the packages that this package depends on, including optional and dev ones"""
+        project = self.__items.get('project', {})
+        requirements = list(project.get('dependencies', []))
+        for optional_requirements in project.get('optional-dependencies', {}).values():
+            requirements.extend(optional_requirements)
+
+        names = []
+        for requirement in requirements:
+            match = re.match(r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)', requirement)
+            if match:
+                names.append(match.group(1))
+
+        poetry = self.__items.get('tool', {}).get('poetry', {})
+        names.extend(poetry.get('dependencies', {}))
+        names.extend(poetry.get('dev-dependencies', {}))
+        for group in poetry.get('group', {}).values():
+            names.extend(group.get('dependencies', {}))
+
+        return sorted({PyProject.__normalize_package_name(name) for name in names})
+
+    @staticmethod
+    def __normalize_package_name(name: str) -> str:
+        return re.sub(r'[-_.]+', '-', name).lower()
+
     @staticmethod
     def __load_toml_file(file_path: Union[str, Path]) -> MutableMapping[str, Any]:
         try:
@@ -100,14 +256,33 @@ class PyProject:
 
     @staticmethod
     def __find_pyproject_path(base_dir: Path) -> Path:
-        def candidate_dirs(base: Path):
-            yield base
-            for parent in base.parents:
-                yield parent
+        # nested taskipy runs get the pyproject.toml path of the run that spawned them,
+        # and only need to make sure that no other pyproject.toml is closer to them
+        inherited_path = os.environ.get(PYPROJECT_PATH_ENV_VAR)
+        if inherited_path:
+            inherited_dir = Path(inherited_path).parent
+            if base_dir == inherited_dir or inherited_dir in base_dir.parents:
+                for candidate_dir in PyProject.__candidate_dirs(base_dir):
+                    if candidate_dir == inherited_dir:
+                        return Path(inherited_path)
+                    if PyProject.__contains_pyproject(str(candidate_dir)):
+                        return candidate_dir / 'pyproject.toml'
 
-        for candidate_dir in candidate_dirs(base_dir):
-            pyproject = candidate_dir / 'pyproject.toml'
-            if pyproject.exists():
-                return pyproject
+        for candidate_dir in PyProject.__candidate_dirs(base_dir):
+            if PyProject.__contains_pyproject(str(candidate_dir)):
+                return candidate_dir / 'pyproject.toml'
 
         raise MissingPyProjectFileError()
+
+    @staticmethod
+    def __candidate_dirs(base_dir: Path):
+        yield base_dir
+        for parent in base_dir.parents:
+            yield parent
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __contains_pyproject(directory: str) -> bool:
+        # memoized for the lifetime of the process, since workspace runs look up the same
+        # directories many times. a single stat is cheaper than listing a big directory
+        return os.path.isfile(os.path.join(directory, 'pyproject.toml'))
@@ -0,0 +1,46 @@
+from typing import Optional
+
+from taskipy.history import EXPECTED_DURATION_WINDOW, RunHistory, percentile
+
+MIN_BASELINE_RUNS = 5
+# fast tasks jitter by large percentages, so a slowdown has to be noticeable in absolute terms as well
+MIN_SLOWDOWN_SECONDS = 0.5
+
+
+class Regression:
+    def __init__(self, task_name: str, duration: float, baseline: float, baseline_runs: int):
+        self.__task_name = task_name
+        self.__duration = duration
+        self.__baseline = baseline
+        self.__baseline_runs = baseline_runs
+
+    @property
+    def task_name(self) -> str:
+        return self.__task_name
+
+    @property
+    def slowdown(self) -> float:
+        """how much slower the run was than the baseline, as a fraction of it"""
+        return self.__duration / self.__baseline - 1
+
+    def __str__(self):
+        return (
+            f'task "{self.__task_name}" took {self.__duration:.2f}s, {self.slowdown:.0%} slower than '
+            f'its median of {self.__baseline:.2f}s over the last {self.__baseline_runs} successful runs'
+        )
+
+
+def detect_regression(history: RunHistory, task_name: str, duration: float, threshold: float) -> Optional[Regression]:
+    """compares a successful run with the median of the task's recent successful runs.
+
+    must be called before the run is recorded, so that it is not part of its own baseline.
+    """
+    durations = history.durations(task_name, limit=EXPECTED_DURATION_WINDOW)
+    if len(durations) < MIN_BASELINE_RUNS:
+        return None
+
+    baseline = percentile(durations, 50)
+    if duration - baseline < MIN_SLOWDOWN_SECONDS or duration <= baseline * (1 + threshold / 100):
+        return None
+
+    return Regression(task_name, duration, baseline, len(durations))
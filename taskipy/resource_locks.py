@@ -0,0 +1,134 @@
+import os
+import platform
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from taskipy.cache import get_cache_dir
+from taskipy.progress import progress_display
+from taskipy.running_processes import running_processes
+from taskipy.task import Task
+
+if platform.system() == 'Windows':
+    import msvcrt  # pylint: disable=E0401
+else:
+    import fcntl
+
+LOCKS_DIR_NAME = 'locks'
+# the locks that the taskipy runs a process was started by hold, which a nested run must not wait for
+HELD_LOCKS_ENV_VAR = 'TASKIPY_HELD_LOCKS'
+MIN_POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.25
+
+
+class ResourceLocks:
+    """the named locks and concurrency groups of a project's tasks.
+
+    every lock, and every slot of a concurrency group, is a file under the project's cache dir, locked for as long as
+    a task's command runs. the operating system releases the lock of a file when the process that locked it dies, so a
+    crashed run never leaves a lock behind. locks are polled rather than waited for, so that an interrupted run
+    stops waiting.
+    """
+
+    def __init__(self, project_dir: Path):
+        self.__project_dir = project_dir
+        self.__held_by_parents: Set[str] = set(filter(None, os.environ.get(HELD_LOCKS_ENV_VAR, '').split(',')))
+
+    def environment(self, task: Task) -> Dict[str, str]:
+        """the variables that tell nested runs of the task's command which locks it already holds"""
+        held = self.__held_by_parents | set(self.__lock_keys(task))
+        return {HELD_LOCKS_ENV_VAR: ','.join(sorted(held))} if held else {}
+
+    @contextmanager
+    def hold(self, task: Task) -> Iterator[bool]:
+        """holds the task's locks, and a slot of its concurrency group, within the block.
+
+        yields whether they were acquired, which they are not if the run was interrupted while waiting for them.
+        """
+        # locks are always taken in the same order, so that two tasks never each hold a lock the other is waiting for
+        lock_keys = [key for key in self.__lock_keys(task) if key not in self.__held_by_parents]
+        if not lock_keys:
+            yield True
+            return
+
+        locks_dir = get_cache_dir(self.__project_dir) / LOCKS_DIR_NAME
+        locks_dir.mkdir(exist_ok=True)
+        held_fds: List[int] = []
+        try:
+            for key in lock_keys:
+                fd = self.__acquire(task, key, self.__lock_paths(task, key, locks_dir))
+                if fd is None:
+                    break
+                held_fds.append(fd)
+            yield len(held_fds) == len(lock_keys)
+        finally:
+            for fd in reversed(held_fds):
+                _unlock(fd)
+
+    def __lock_keys(self, task: Task) -> List[str]:
+        keys = [f'lock:{name}' for name in task.locks]
+        if task.concurrency_group is not None:
+            keys.append(f'group:{task.concurrency_group}')
+        return keys
+
+    def __lock_paths(self, task: Task, key: str, locks_dir: Path) -> List[Path]:
+        kind, name = key.split(':', 1)
+        if kind == 'lock':
+            return [locks_dir / f'{name}.lock']
+        return [locks_dir / f'{name}.group.{slot}.lock' for slot in range(task.concurrency_group_max)]
+
+    def __acquire(self, task: Task, key: str, paths: List[Path]) -> Optional[int]:
+        """locks the first of the files that is free, waiting for one to be, and returns its file descriptor"""
+        poll_interval = MIN_POLL_INTERVAL
+        announced = False
+        try:
+            while not running_processes.interrupted:
+                for path in paths:
+                    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+                    if _try_lock(fd):
+                        return fd
+                    os.close(fd)
+
+                if not announced:
+                    kind, name = key.split(':', 1)
+                    description = f'lock "{name}"' if kind == 'lock' else f'a free slot of concurrency group "{name}"'
+                    progress_display.print(f'task "{task.name}" is waiting for {description}')
+                    announced = True
+
+                time.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            running_processes.mark_interrupted()
+
+        return None
+
+
+if platform.system() == 'Windows':
+    def _try_lock(fd: int) -> bool:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)  # type: ignore
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)  # type: ignore
+        finally:
+            os.close(fd)
+else:
+    def _try_lock(fd: int) -> bool:
+        try:
+            # flock rather than lockf, since the locks of lockf don't keep the threads of a process from each other
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
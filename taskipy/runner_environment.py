@@ -0,0 +1,151 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from taskipy.cache import CACHE_DIR_NAME, get_cache_dir
+
+if platform.system() == 'Windows':
+    import mslex as shlex  # type: ignore # pylint: disable=E0401
+else:
+    import shlex  # type: ignore[no-redef]
+
+RUNNER_ENVIRONMENT_FILE_NAME = 'runner_environment.json'
+# the files whose changes may change what the runner sets up, such as the packages of the virtualenv it activates
+LOCK_FILE_NAMES = ['pyproject.toml', 'poetry.lock', 'pdm.lock', 'uv.lock', 'Pipfile.lock']
+# variables that the shell or python set for themselves, which the runner has nothing to do with
+IGNORED_VARIABLES = {'_', 'SHLVL', 'PWD', 'OLDPWD'}
+# the variables of taskipy's own environment that decide what the runner's environment differs in, such as whether
+# taskipy already runs inside the virtualenv that the runner activates
+CALLER_VARIABLES = ['PATH', 'VIRTUAL_ENV']
+PRINT_ENVIRONMENT_SCRIPT = 'import json, os; print(json.dumps(dict(os.environ)))'
+
+
+class RunnerEnvironment:
+    """what a runner such as `poetry run` adds to the environment of the commands it runs.
+
+    the runner runs once to find out, and what it added is cached in the project's cache dir, for as long as
+    the project's lock files, the runner's virtualenv and the virtualenv taskipy itself runs in don't change.
+    """
+
+    def __init__(self, project_dir: Path, runner: str):
+        self.__project_dir = project_dir
+        self.__runner = runner
+
+    def resolve(self) -> Optional[Dict[str, Any]]:
+        """the variables the runner sets and the entries it prepends to PATH, or None if the runner couldn't be run"""
+        fingerprint = self.__fingerprint()
+        cached = self.__load()
+        if cached is not None and cached['fingerprint'] == fingerprint and self.__venv_mtime(cached['variables']) == cached['venv_mtime']:
+            return cached
+
+        resolved = self.__run_runner()
+        if resolved is None:
+            return None
+
+        resolved.update(fingerprint=fingerprint, venv_mtime=self.__venv_mtime(resolved['variables']))
+        self.__store(resolved)
+        return resolved
+
+    def __run_runner(self) -> Optional[Dict[str, Any]]:
+        command = f'{self.__runner} python -c {shlex.quote(PRINT_ENVIRONMENT_SCRIPT)}'
+        try:
+            result = subprocess.run(
+                command,
+                shell=True,
+                cwd=str(self.__project_dir),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+            # the runner may print things of its own before the environment
+            runner_environment = json.loads(result.stdout.decode().strip().splitlines()[-1])
+        except (OSError, subprocess.CalledProcessError, ValueError, IndexError):
+            return None
+
+        return {
+            'path_prefix': self.__get_path_prefix(os.environ.get('PATH', ''), runner_environment.get('PATH', '')),
+            'variables': {
+                name: value
+                for name, value in runner_environment.items()
+                if name != 'PATH' and name not in IGNORED_VARIABLES and (name == 'VIRTUAL_ENV' or os.environ.get(name) != value)
+            },
+        }
+
+    def __get_path_prefix(self, path: str, runner_path: str) -> List[str]:
+        entries = path.split(os.pathsep) if path else []
+        runner_entries = runner_path.split(os.pathsep) if runner_path else []
+
+        if entries and runner_entries[-len(entries):] == entries:
+            return runner_entries[:-len(entries)]
+        # the runner replaced PATH altogether, so none of the entries it kept can be told apart from the ones it added
+        return [entry for entry in runner_entries if entry not in entries]
+
+    def __fingerprint(self) -> Dict[str, Any]:
+        mtimes: Dict[str, Optional[int]] = {}
+        for file_name in LOCK_FILE_NAMES:
+            try:
+                mtimes[file_name] = (self.__project_dir / file_name).stat().st_mtime_ns
+            except OSError:
+                mtimes[file_name] = None
+
+        return {
+            'runner': self.__runner,
+            'mtimes': mtimes,
+            'environment': {name: os.environ.get(name) for name in CALLER_VARIABLES},
+        }
+
+    def __venv_mtime(self, variables: Dict[str, str]) -> Optional[int]:
+        """when the runner's virtualenv last changed, which installing or removing packages in it does"""
+        venv = variables.get('VIRTUAL_ENV')
+        if venv is None:
+            return None
+
+        try:
+            return max(
+                (Path(venv) / name).stat().st_mtime_ns
+                for name in ['pyvenv.cfg', 'bin' if os.name == 'posix' else 'Scripts']
+            )
+        except OSError:
+            # a virtualenv that is gone never matches what was cached
+            return -1
+
+    def __load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.__project_dir / CACHE_DIR_NAME / RUNNER_ENVIRONMENT_FILE_NAME, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+            return cached if isinstance(cached, dict) and 'fingerprint' in cached else None
+        except (OSError, ValueError):
+            return None
+
+    def __store(self, resolved: Dict[str, Any]):
+        try:
+            cache_dir = get_cache_dir(self.__project_dir)
+            fd, temp_path = tempfile.mkstemp(dir=str(cache_dir), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(resolved, file)
+                os.replace(temp_path, str(cache_dir / RUNNER_ENVIRONMENT_FILE_NAME))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+
+
+def apply_runner_environment(environment: Dict[str, str], runner_environment: Dict[str, Any]) -> Dict[str, str]:
+    """the environment a command would have had if the runner had run it"""
+    path_entries = environment['PATH'].split(os.pathsep) if environment.get('PATH') else []
+    prefix: List[str] = runner_environment['path_prefix']
+    if path_entries[:len(prefix)] == prefix:
+        # a nested run, whose environment already is the runner's
+        prefix = []
+
+    return dict(
+        environment,
+        **runner_environment['variables'],
+        PATH=os.pathsep.join(prefix + path_entries),
+    )
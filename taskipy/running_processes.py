@@ -0,0 +1,99 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+from types import FrameType
+from typing import Any, Dict, Optional
+
+# the exit code of a command that never ran, or was stopped, because taskipy was interrupted
+INTERRUPTED_EXIT_CODE = 130
+
+
+class RunningProcesses:
+    """keeps track of the task processes that are currently running, so signals sent to taskipy reach all of them"""
+
+    def __init__(self):
+        # every process, along with whether it is a shell that runs the task's command
+        self.__processes: Dict[Any, bool] = {}
+        self.__lock = threading.Lock()
+        self.__interrupted = False
+
+    @property
+    def interrupted(self) -> bool:
+        return self.__interrupted
+
+    def mark_interrupted(self):
+        self.__interrupted = True
+
+    def add(self, process: Any, is_shell: bool = True):
+        """tracks a process, a Popen or anything else with a `pid` and a `send_signal` method"""
+        with self.__lock:
+            self.__processes[process] = is_shell
+
+    def discard(self, process: Any):
+        with self.__lock:
+            self.__processes.pop(process, None)
+
+    def forward_sigterm(self):
+        """installs a SIGTERM handler that forwards the signal to the running tasks. must be called from the main thread"""
+        if threading.current_thread() is threading.main_thread():
+            # imported here, once the first command has started, rather than on startup, since psutil is slow to import.
+            # never in the handler, which a second signal can interrupt while the first one is halfway through importing it
+            import psutil  # type: ignore  # pylint: disable=C0415,W0611
+
+            signal.signal(signal.SIGTERM, self.__send_signal_to_task_processes)
+
+    def __send_signal_to_task_processes(self, signum: int, _frame: Optional[FrameType]):
+        # the run ends along with the processes, rather than starting the commands that wait for a job slot
+        self.__interrupted = True
+        import psutil  # type: ignore  # pylint: disable=C0415
+
+        with self.__lock:
+            processes = list(self.__processes.items())
+
+        for process, is_shell in processes:
+            try:
+                if is_shell:
+                    self.__send_signal_to_task_process(process, signum)
+                else:
+                    process.send_signal(signum)
+            except psutil.NoSuchProcess:
+                pass
+
+    def __send_signal_to_task_process(self, process: subprocess.Popen, signum: int):
+        import psutil  # type: ignore  # pylint: disable=C0415
+
+        psutil_process_wrapper = psutil.Process(process.pid)
+        is_direct_subprocess_a_shell_process = sys.platform != 'darwin'  # pylint: disable=C0103
+
+        if is_direct_subprocess_a_shell_process:
+            # A shell is created because of Popen(..., shell=True) on linux only
+            # We want here to kill shell's child
+            sub_processes_of_taskipy_shell = psutil_process_wrapper.children()
+            for child_process in sub_processes_of_taskipy_shell:
+                child_process.send_signal(signum)
+        else:
+            process.send_signal(signum)
+
+
+def wait_for_process(process: Any) -> Optional[int]:
+    """waits for a process to exit, and returns the peak resident set size of it and its children in bytes, if available.
+
+    only the size of direct Popen children can be measured.
+    """
+    if not hasattr(os, 'wait4') or not isinstance(process, subprocess.Popen):
+        process.wait()
+        return None
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+
+    # linux reports kilobytes, while macos reports bytes
+    return rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+
+
+running_processes = RunningProcesses()
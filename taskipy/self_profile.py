@@ -0,0 +1,83 @@
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from taskipy import IMPORT_STARTED_AT
+from taskipy.cache import get_cache_dir
+from taskipy.task_profile import PROFILES_DIR_NAME
+
+# the parts of taskipy's own work the summary breaks down, as (file name suffix, function name) pairs of the
+# functions whose cumulative time they are made of
+OVERHEAD_PARTS: List[Tuple[str, List[Tuple[str, str]]]] = [
+    ('imports during the run', [('<frozen importlib._bootstrap>', '_find_and_load')]),
+    ('toml parsing', [('taskipy/pyproject.py', '__load_toml_file')]),
+    ('task construction', [('taskipy/task.py', '__init__')]),
+    ('variable resolution', [('taskipy/task_runner.py', '__resolve_variables'), ('taskipy/task_runner.py', '__format_task_command')]),
+    ('list formatting', [('taskipy/list.py', 'print')]),
+    ('signal setup', [('signal.py', 'signal')]),
+]
+# the functions taskipy's main thread waits in while the tasks' processes run
+WAITING_FOR_TASKS = [
+    ('taskipy/running_processes.py', 'wait_for_process'),
+    ('taskipy/parallel.py', 'run'),
+    ('taskipy/log_capture.py', 'wait'),
+]
+
+
+class SelfProfile:
+    """profiles taskipy itself while it runs, to tell the time taskipy takes apart from the time its tasks take"""
+
+    def __init__(self, project_dir: Path):
+        self.__project_dir = project_dir
+
+    def run(self, function: Callable[[], int]) -> int:
+        # importing taskipy happened before this point, so it is only timed rather than profiled
+        started_at = time.perf_counter()
+        imports = started_at - IMPORT_STARTED_AT
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(function)
+        finally:
+            total = time.perf_counter() - started_at
+            profiler.create_stats()
+            stats = pstats.Stats(profiler)
+            profile_path = self.__write(stats)
+            self.__print_summary(stats, imports, total, profile_path)
+
+    def __write(self, stats: pstats.Stats) -> Path:
+        profiles_dir = get_cache_dir(self.__project_dir) / PROFILES_DIR_NAME
+        profiles_dir.mkdir(exist_ok=True)
+
+        profile_path = profiles_dir / f'self-{time.strftime("%Y%m%d-%H%M%S")}.pstats'
+        stats.dump_stats(str(profile_path))
+        return profile_path
+
+    def __print_summary(self, stats: pstats.Stats, imports: float, total: float, profile_path: Path):
+        waiting = min(self.__cumulative_time(stats, WAITING_FOR_TASKS), total)
+        rows = [('importing taskipy', imports)]
+        rows += [(part, self.__cumulative_time(stats, functions)) for part, functions in OVERHEAD_PARTS]
+        rows += [
+            ('taskipy in total', imports + total - waiting),
+            ('waiting for tasks', waiting),
+        ]
+
+        width = max(len(part) for part, _ in rows)
+        print('\ntaskipy profile:', file=sys.stderr)
+        for part, seconds in rows:
+            print(f'  {part:<{width}} {seconds * 1000:8.1f} ms', file=sys.stderr)
+        print(f'full profile at {profile_path}, see it with `python -m pstats {profile_path}`', file=sys.stderr)
+
+    def __cumulative_time(self, stats: pstats.Stats, functions: List[Tuple[str, str]]) -> float:
+        """the cumulative time of the functions. a function called from within another one of them is counted twice"""
+        return sum(
+            cumulative_time
+            for (file_name, _, function_name), (_, _, _, cumulative_time, _) in stats.stats.items()  # type: ignore
+            if any(
+                file_name.replace('\\', '/').endswith(suffix) and function_name == name
+                for suffix, name in functions
+            )
+        )
@@ -0,0 +1,68 @@
+import heapq
+import os
+import platform
+from pathlib import Path
+from typing import Dict, List
+
+if platform.system() == 'Windows':
+    import mslex as shlex  # type: ignore # pylint: disable=E0401
+else:
+    import shlex  # type: ignore[no-redef]
+
+SHARD_INDEX_ENV_VAR = 'TASKIPY_SHARD_INDEX'
+SHARD_COUNT_ENV_VAR = 'TASKIPY_SHARD_COUNT'
+SHARD_FILES_PLACEHOLDER = '{shard_files}'
+
+
+class Shard:
+    def __init__(self, index: int, count: int, files: List[str]):
+        self.__index = index
+        self.__count = count
+        self.__files = files
+
+    @property
+    def index(self) -> int:
+        """zero based"""
+        return self.__index
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def files(self) -> List[str]:
+        return self.__files
+
+    @property
+    def environment(self) -> Dict[str, str]:
+        return {
+            SHARD_INDEX_ENV_VAR: str(self.__index),
+            SHARD_COUNT_ENV_VAR: str(self.__count),
+        }
+
+    def format_command(self, command: str) -> str:
+        return command.replace(SHARD_FILES_PLACEHOLDER, ' '.join(shlex.quote(file) for file in self.__files))
+
+
+def split_into_shards(count: int, patterns: List[str], base_dir: Path) -> List[Shard]:
+    """splits the files matching the glob patterns into `count` shards of about the same total size.
+
+    files are handed out largest first, each to the shard that is the smallest so far, which keeps
+    the shards balanced as long as a file's size is a fair proxy of how long it takes to process.
+    """
+    files = sorted({
+        os.path.relpath(file_path, base_dir).replace(os.sep, '/')
+        for pattern in patterns
+        for file_path in base_dir.glob(pattern)
+        if file_path.is_file()
+    })
+    sizes = {file: (base_dir / file).stat().st_size for file in files}
+
+    shard_files: List[List[str]] = [[] for _ in range(count)]
+    smallest_first = [(0, index) for index in range(count)]
+    for file in sorted(files, key=lambda file: (-sizes[file], file)):
+        total_size, index = heapq.heappop(smallest_first)
+        shard_files[index].append(file)
+        heapq.heappush(smallest_first, (total_size + sizes[file], index))
+
+    return [Shard(index, count, sorted(shard_files[index])) for index in range(count)]
@@ -0,0 +1,90 @@
+import time
+from typing import List, Optional
+
+import colorama  # type: ignore
+
+from taskipy.history import RunHistory, percentile
+
+STATS_WINDOW = 100
+TREND_WINDOW = 10
+RECENT_RUNS_TO_SHOW = 10
+
+
+class RunStatsFormatter:
+    def __init__(self, history: RunHistory):
+        self.__history = history
+        colorama.init()
+
+    def print(self, task_name: Optional[str] = None):
+        task_names = [task_name] if task_name is not None else self.__history.task_names()
+        rows: List[List[str]] = []
+        for name in task_names:
+            row = self.__task_row(name)
+            if row is not None:
+                rows.append(row)
+
+        if not rows:
+            if task_name is not None:
+                print(f'no runs of "{task_name}" were recorded yet')
+            else:
+                print('no runs were recorded yet')
+            return
+
+        header = ['task', 'runs', 'p50', 'p95', 'failed', 'trend']
+        widths = [max(len(row[column]) for row in rows + [header]) for column in range(len(header))]
+
+        print(self.__highlight(self.__format_row(header, widths)))
+        for row in rows:
+            print(self.__format_row(row, widths))
+
+        if task_name is not None:
+            self.__print_recent_runs(task_name)
+
+    def __task_row(self, task_name: str) -> Optional[List[str]]:
+        runs = self.__history.runs(task_name, limit=STATS_WINDOW)
+        if not runs:
+            return None
+
+        durations = [duration for _, _, _, duration, exit_code, _, _ in runs if exit_code == 0]
+        failures = sum(1 for run in runs if run[4] != 0)
+
+        return [
+            task_name,
+            str(len(runs)),
+            self.__format_duration(percentile(durations, 50)) if durations else '-',
+            self.__format_duration(percentile(durations, 95)) if durations else '-',
+            f'{failures / len(runs):.1%}',
+            self.__format_trend(durations),
+        ]
+
+    def __print_recent_runs(self, task_name: str):
+        print()
+        print(self.__highlight(f'recent runs of "{task_name}"'))
+
+        for _, _, started_at, duration, exit_code, peak_rss, git_head in self.__history.runs(task_name, limit=RECENT_RUNS_TO_SHOW):
+            line = f'{time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at))}  {self.__format_duration(duration):>8}  exit code {exit_code:<3}'
+            if peak_rss is not None:
+                line += f'  peak rss {peak_rss / 2 ** 20:.1f}MB'
+            if git_head is not None:
+                line += f'  {git_head[:10]}'
+            print(line)
+
+    def __format_trend(self, durations: List[float]) -> str:
+        """how much slower the recent successful runs are than the ones before them, newest durations first"""
+        recent = durations[:TREND_WINDOW]
+        previous = durations[TREND_WINDOW:TREND_WINDOW * 2]
+        if not recent or not previous or percentile(previous, 50) == 0:
+            return '-'
+
+        return f'{percentile(recent, 50) / percentile(previous, 50) - 1:+.1%}'
+
+    def __format_duration(self, seconds: float) -> str:
+        if seconds < 60:
+            return f'{seconds:.2f}s'
+        return f'{int(seconds // 60)}m{seconds % 60:04.1f}s'
+
+    def __format_row(self, row: List[str], widths: List[int]) -> str:
+        return '  '.join(f'{value:<{width}}' for value, width in zip(row, widths)).rstrip()
+
+    def __highlight(self, text: str):
+        return f'{colorama.Fore.CYAN}{text}{colorama.Style.RESET_ALL}'
@@ -1,15 +1,40 @@
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Tuple
 
+from taskipy.env import parse_env_files, parse_env_table
 from taskipy.exceptions import MalformedTaskError
 
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+IONICE_CLASSES = ('idle', 'best-effort', 'realtime')
+CALL_TARGET_PATTERN = r'[A-Za-z_][\w.]*:[A-Za-z_][\w.]*'
+LOCK_NAME_PATTERN = r'[A-Za-z0-9._-]+'
 
-class Task:
+
+class Task:  # pylint: disable=R0902,R0904
     def __init__(self, task_name: str, task_toml_contents: object):
         self.__task_name = task_name
+        self.__task_toml_contents = task_toml_contents
         self.__task_command = self.__extract_task_command(task_toml_contents)
         self.__task_description = self.__extract_task_description(task_toml_contents)
         self.__task_use_vars = self.__extract_task_use_vars(task_toml_contents)
         self.__task_workdir = self.__extract_task_workdir(task_toml_contents)
+        self.__task_retries = self.__extract_task_retries(task_toml_contents)
+        self.__task_retry_backoff = self.__extract_task_retry_backoff(task_toml_contents)
+        self.__task_retry_on = self.__extract_task_retry_on(task_toml_contents)
+        self.__task_env = self.__extract_task_env(task_toml_contents)
+        self.__task_env_files = self.__extract_task_env_files(task_toml_contents)
+        self.__task_nice = self.__extract_task_nice(task_toml_contents)
+        self.__task_ionice = self.__extract_task_ionice(task_toml_contents)
+        self.__task_cpu_affinity = self.__extract_task_cpu_affinity(task_toml_contents)
+        self.__task_weight = self.__extract_task_weight(task_toml_contents)
+        self.__task_shards = self.__extract_task_shards(task_toml_contents)
+        self.__task_shard_files = self.__extract_task_shard_files(task_toml_contents)
+        self.__task_matrix, self.__task_matrix_exclude = self.__extract_task_matrix(task_toml_contents)
+        self.__task_max_parallel = self.__extract_task_max_parallel(task_toml_contents)
+        self.__task_log = self.__extract_task_log(task_toml_contents)
+        self.__task_batch_size, self.__task_batch_parallel = self.__extract_task_batch_args(task_toml_contents)
+        self.__task_locks = self.__extract_task_locks(task_toml_contents)
+        self.__task_concurrency_group, self.__task_concurrency_group_max = self.__extract_task_concurrency_group(task_toml_contents)
 
     @property
     def name(self) -> str:
@@ -19,6 +44,11 @@ class Task:
     def command(self) -> str:
         return self.__task_command
 
+    @property
+    def is_call(self) -> bool:
+        """whether the task's command is a "package.module:function" to call, rather than a shell command"""
+        return isinstance(self.__task_toml_contents, dict) and 'call' in self.__task_toml_contents
+
     @property
     def workdir(self) -> Optional[str]:
         return self.__task_workdir
@@ -31,6 +61,108 @@ class Task:
     def use_vars(self) -> Optional[bool]:
         return self.__task_use_vars
 
+    @property
+    def retries(self) -> int:
+        return self.__task_retries
+
+    @property
+    def retry_backoff(self) -> float:
+        """the delay in seconds before the first retry, doubled on every following retry"""
+        return self.__task_retry_backoff
+
+    @property
+    def retry_on(self) -> Optional[List[int]]:
+        """the exit codes that should be retried, or None to retry on any failure"""
+        return self.__task_retry_on
+
+    @property
+    def env(self) -> Dict[str, str]:
+        return self.__task_env
+
+    @property
+    def env_files(self) -> List[str]:
+        """paths of dotenv files to load, relative to the project's root"""
+        return self.__task_env_files
+
+    @property
+    def nice(self) -> Optional[int]:
+        return self.__task_nice
+
+    @property
+    def ionice(self) -> Optional[str]:
+        """one of the IONICE_CLASSES"""
+        return self.__task_ionice
+
+    @property
+    def cpu_affinity(self) -> Optional[List[int]]:
+        return self.__task_cpu_affinity
+
+    @property
+    def weight(self) -> float:
+        """a hint of how long the task takes to run in seconds, used for scheduling until it has run before"""
+        return self.__task_weight
+
+    @property
+    def shards(self) -> int:
+        """how many copies of the task run at the same time, each with its own part of the work"""
+        return self.__task_shards
+
+    @property
+    def shard_files(self) -> List[str]:
+        """glob patterns of the files to split between the shards, relative to the task's working directory"""
+        return self.__task_shard_files
+
+    @property
+    def matrix(self) -> Dict[str, List[str]]:
+        """the values of every matrix variable, the task runs once for every combination of them"""
+        return self.__task_matrix
+
+    @property
+    def matrix_exclude(self) -> List[Dict[str, str]]:
+        """combinations of matrix values to skip, a combination is skipped if it matches all values of a rule"""
+        return self.__task_matrix_exclude
+
+    @property
+    def max_parallel(self) -> Optional[int]:
+        """how many matrix combinations may run at the same time, or None for no limit"""
+        return self.__task_max_parallel
+
+    @property
+    def log(self) -> Optional[bool]:
+        """whether the task's output is logged to a file, or None to follow the project's settings"""
+        return self.__task_log
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        """how many of the args passed to the task a single run of its command gets, or None to pass them all at once"""
+        return self.__task_batch_size
+
+    @property
+    def batch_parallel(self) -> bool:
+        """whether the batches of args run at the same time, rather than one after the other"""
+        return self.__task_batch_parallel
+
+    @property
+    def locks(self) -> List[str]:
+        """names of the locks the task's command holds while it runs, shared with every other task and taskipy process of the project"""
+        return self.__task_locks
+
+    @property
+    def concurrency_group(self) -> Optional[str]:
+        """the name of a group of tasks, of which at most `concurrency_group_max` run at the same time across the project"""
+        return self.__task_concurrency_group
+
+    @property
+    def concurrency_group_max(self) -> int:
+        return self.__task_concurrency_group_max
+
+    def variant(self, name: str, command: str) -> 'Task':
+        """a copy of the task under another name and with another command, that runs a single combination of its matrix"""
+        task_toml_contents = dict(self.__task_toml_contents) if isinstance(self.__task_toml_contents, dict) else {}
+        task_toml_contents.pop('matrix', None)
+        task_toml_contents['call' if self.is_call else 'cmd'] = command
+        return Task(name, task_toml_contents)
+
     def __extract_task_use_vars(self, task_toml_contents: object) -> Optional[bool]:
         if isinstance(task_toml_contents, str):
             return None
@@ -48,6 +180,8 @@ class Task:
             return task_toml_contents
 
         if isinstance(task_toml_contents, dict):
+            if 'call' in task_toml_contents:
+                return self.__extract_task_call(task_toml_contents)
             try:
                 return task_toml_contents['cmd']
             except KeyError:
@@ -55,6 +189,14 @@ class Task:
 
         raise MalformedTaskError(self.__task_name, 'tasks must be strings, or dicts that contain { cmd, cwd, help, use_vars }')
 
+    def __extract_task_call(self, task_toml_contents: dict) -> str:
+        value = task_toml_contents['call']
+        if 'cmd' in task_toml_contents:
+            raise MalformedTaskError(self.__task_name, 'the task item can only have one of the "cmd" and "call" properties')
+        if not isinstance(value, str) or not re.fullmatch(CALL_TARGET_PATTERN, value.strip()):
+            raise MalformedTaskError(self.__task_name, f'task\'s "call" arg has to be a "package.module:function" string got {value!r}')
+        return value.strip()
+
     def __extract_task_workdir(self, task_toml_contents: object) -> Optional[str]:
         if isinstance(task_toml_contents, str):
             return None
@@ -78,3 +220,203 @@ class Task:
                 return ''
 
         raise MalformedTaskError(self.__task_name, 'tasks must be strings, or dicts that contain { cmd, cwd, help, use_vars }')
+
+    def __extract_task_retries(self, task_toml_contents: object) -> int:
+        if not isinstance(task_toml_contents, dict):
+            return 0
+
+        value = task_toml_contents.get('retries', 0)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise MalformedTaskError(self.__task_name, f'task\'s "retries" arg has to be a non-negative int got {value!r}')
+        return value
+
+    def __extract_task_retry_backoff(self, task_toml_contents: object) -> float:
+        if not isinstance(task_toml_contents, dict):
+            return 0
+
+        value = task_toml_contents.get('retry_backoff', 0)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+            return value
+
+        if isinstance(value, str):
+            match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*', value)
+            if match:
+                amount, unit = match.groups()
+                return float(amount) * DURATION_UNITS[unit or 's']
+
+        raise MalformedTaskError(self.__task_name, f'task\'s "retry_backoff" arg has to be a duration such as "2s" or "500ms" got {value!r}')
+
+    def __extract_task_retry_on(self, task_toml_contents: object) -> Optional[List[int]]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('retry_on')
+        if value is None:
+            return None
+
+        if not isinstance(value, list) or not all(isinstance(code, int) and not isinstance(code, bool) for code in value):
+            raise MalformedTaskError(self.__task_name, f'task\'s "retry_on" arg has to be a list of exit codes got {value!r}')
+        return value
+
+    def __extract_task_env(self, task_toml_contents: object) -> Dict[str, str]:
+        if not isinstance(task_toml_contents, dict):
+            return {}
+
+        value = task_toml_contents.get('env', {})
+        env = parse_env_table(value)
+        if env is None:
+            raise MalformedTaskError(self.__task_name, f'task\'s "env" arg has to be a table of strings got {value!r}')
+        return env
+
+    def __extract_task_env_files(self, task_toml_contents: object) -> List[str]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('env_file') is None:
+            return []
+
+        value = task_toml_contents['env_file']
+        env_files = parse_env_files(value)
+        if env_files is None:
+            raise MalformedTaskError(self.__task_name, f'task\'s "env_file" arg has to be a path or a list of paths got {value!r}')
+        return env_files
+
+    def __extract_task_nice(self, task_toml_contents: object) -> Optional[int]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('nice')
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or not -20 <= value <= 19):
+            raise MalformedTaskError(self.__task_name, f'task\'s "nice" arg has to be an int between -20 and 19 got {value!r}')
+        return value
+
+    def __extract_task_ionice(self, task_toml_contents: object) -> Optional[str]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('ionice')
+        if value is not None and value not in IONICE_CLASSES:
+            raise MalformedTaskError(self.__task_name, f'task\'s "ionice" arg has to be one of {", ".join(IONICE_CLASSES)} got {value!r}')
+        return value
+
+    def __extract_task_cpu_affinity(self, task_toml_contents: object) -> Optional[List[int]]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('cpu_affinity')
+        if value is None:
+            return None
+
+        if not isinstance(value, list) or not value or not all(isinstance(cpu, int) and not isinstance(cpu, bool) and cpu >= 0 for cpu in value):
+            raise MalformedTaskError(self.__task_name, f'task\'s "cpu_affinity" arg has to be a non-empty list of cpu numbers got {value!r}')
+        return value
+
+    def __extract_task_weight(self, task_toml_contents: object) -> float:
+        if not isinstance(task_toml_contents, dict):
+            return 0
+
+        value = task_toml_contents.get('weight', 0)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            raise MalformedTaskError(self.__task_name, f'task\'s "weight" arg has to be a non-negative number got {value!r}')
+        return value
+
+    def __extract_task_shards(self, task_toml_contents: object) -> int:
+        if not isinstance(task_toml_contents, dict):
+            return 1
+
+        value = task_toml_contents.get('shards', 1)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise MalformedTaskError(self.__task_name, f'task\'s "shards" arg has to be a positive int got {value!r}')
+        return value
+
+    def __extract_task_shard_files(self, task_toml_contents: object) -> List[str]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('shard_files') is None:
+            return []
+
+        value = task_toml_contents['shard_files']
+        patterns = [value] if isinstance(value, str) else value
+        if not isinstance(patterns, list) or not all(isinstance(pattern, str) for pattern in patterns):
+            raise MalformedTaskError(self.__task_name, f'task\'s "shard_files" arg has to be a glob or a list of globs got {value!r}')
+        return patterns
+
+    def __extract_task_matrix(self, task_toml_contents: object) -> Tuple[Dict[str, List[str]], List[Dict[str, str]]]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('matrix') is None:
+            return {}, []
+
+        value = task_toml_contents['matrix']
+        if not isinstance(value, dict):
+            raise MalformedTaskError(self.__task_name, f'task\'s "matrix" arg has to be a table of lists got {value!r}')
+
+        matrix = {}
+        for name, values in value.items():
+            if name == 'exclude':
+                continue
+            if not isinstance(values, list) or not values or not all(self.__is_matrix_value(item) for item in values):
+                raise MalformedTaskError(self.__task_name, f'task\'s "matrix.{name}" arg has to be a non-empty list of strings or numbers got {values!r}')
+            matrix[name] = [str(item) for item in values]
+
+        exclude = value.get('exclude', [])
+        if not isinstance(exclude, list) or not all(
+            isinstance(rule, dict) and rule and all(name in matrix and self.__is_matrix_value(item) for name, item in rule.items())
+            for rule in exclude
+        ):
+            raise MalformedTaskError(self.__task_name, f'task\'s "matrix.exclude" arg has to be a list of tables of matrix values got {exclude!r}')
+
+        return matrix, [{name: str(item) for name, item in rule.items()} for rule in exclude]
+
+    def __is_matrix_value(self, value: object) -> bool:
+        return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+    def __extract_task_max_parallel(self, task_toml_contents: object) -> Optional[int]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('max_parallel')
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise MalformedTaskError(self.__task_name, f'task\'s "max_parallel" arg has to be a positive int got {value!r}')
+        return value
+
+    def __extract_task_log(self, task_toml_contents: object) -> Optional[bool]:
+        if not isinstance(task_toml_contents, dict):
+            return None
+
+        value = task_toml_contents.get('log')
+        if value is not None and not isinstance(value, bool):
+            raise MalformedTaskError(self.__task_name, f'task\'s "log" arg has to be bool type got {type(value)}')
+        return value
+
+    def __extract_task_batch_args(self, task_toml_contents: object) -> Tuple[Optional[int], bool]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('batch_args') is None:
+            return None, False
+
+        value = task_toml_contents['batch_args']
+        size = value.get('size') if isinstance(value, dict) else None
+        parallel = value.get('parallel', False) if isinstance(value, dict) else None
+        if (
+            not isinstance(size, int) or isinstance(size, bool) or size < 1
+            or not isinstance(parallel, bool)
+            or set(value) - {'size', 'parallel'}
+        ):
+            raise MalformedTaskError(self.__task_name, f'task\'s "batch_args" arg has to be a table of a positive "size" and a bool "parallel" got {value!r}')
+
+        if self.__task_shards > 1 or self.__task_shard_files:
+            raise MalformedTaskError(self.__task_name, 'the task item can only have one of the "batch_args" and "shards" properties')
+        return size, parallel
+
+    def __extract_task_locks(self, task_toml_contents: object) -> List[str]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('locks') is None:
+            return []
+
+        value = task_toml_contents['locks']
+        if not isinstance(value, list) or not all(isinstance(name, str) and re.fullmatch(LOCK_NAME_PATTERN, name) for name in value):
+            raise MalformedTaskError(self.__task_name, f'task\'s "locks" arg has to be a list of names made of letters, digits, ".", "_" and "-" got {value!r}')
+        return sorted(set(value))
+
+    def __extract_task_concurrency_group(self, task_toml_contents: object) -> Tuple[Optional[str], int]:
+        if not isinstance(task_toml_contents, dict) or task_toml_contents.get('concurrency_group') is None:
+            return None, 1
+
+        value = task_toml_contents['concurrency_group']
+        name = value.get('name') if isinstance(value, dict) else None
+        max_running = value.get('max', 1) if isinstance(value, dict) else None
+        is_valid_max = isinstance(max_running, int) and not isinstance(max_running, bool) and max_running >= 1
+        if not isinstance(name, str) or not re.fullmatch(LOCK_NAME_PATTERN, name) or not is_valid_max or set(value) - {'name', 'max'}:
+            raise MalformedTaskError(self.__task_name, f'task\'s "concurrency_group" arg has to be a table of a "name" and a positive "max" got {value!r}')
+        return name, max_running
@@ -0,0 +1,61 @@
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+from taskipy import profile_hook
+from taskipy.cache import get_cache_dir
+from taskipy.profile_hook import PROFILE_DIR_ENV_VAR
+
+PROFILES_DIR_NAME = 'profiles'
+COMBINED_PROFILE_NAME = 'combined.pstats'
+TOP_FUNCTIONS_TO_SHOW = 15
+
+
+class TaskProfile:
+    """profiles every python process a run of a task starts, and merges their profiles once the run is over"""
+
+    def __init__(self, project_dir: Path, task_name: str):
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        task_dir_name = re.sub(r'[^A-Za-z0-9._-]+', '_', task_name)
+        self.__task_name = task_name
+        self.__run_dir = get_cache_dir(project_dir) / PROFILES_DIR_NAME / f'{task_dir_name}-{timestamp}-{os.getpid()}'
+        self.__hook_dir = self.__run_dir / 'hook'
+        self.__hook_dir.mkdir(parents=True)
+        shutil.copyfile(profile_hook.__file__, str(self.__hook_dir / 'sitecustomize.py'))
+
+    @property
+    def run_dir(self) -> Path:
+        return self.__run_dir
+
+    def environment(self, task_environment: Dict[str, str]) -> Dict[str, str]:
+        """the variables to add to the environment of the task's processes, for python to load the profiling hook"""
+        python_path = task_environment.get('PYTHONPATH')
+        return {
+            'PYTHONPATH': os.pathsep.join([str(self.__hook_dir)] + ([python_path] if python_path else [])),
+            PROFILE_DIR_ENV_VAR: str(self.__run_dir),
+        }
+
+    def report(self):
+        """merges the profiles of the run's processes, and prints the functions that took the longest"""
+        import pstats  # pylint: disable=C0415
+
+        profiles = sorted(str(path) for path in self.__run_dir.glob('*.pstats') if path.name != COMBINED_PROFILE_NAME)
+        if not profiles:
+            print(f'\nno python processes of "{self.__task_name}" were profiled', file=sys.stderr)
+            return
+
+        stats = pstats.Stats(*profiles)
+        combined_path = self.__run_dir / COMBINED_PROFILE_NAME
+        stats.dump_stats(str(combined_path))
+
+        print(f'\nprofiled {len(profiles)} python processes of "{self.__task_name}", the slowest functions were:', file=sys.stderr)
+        print(f'  {"cumulative":>10} {"own":>10} {"calls":>8}  function', file=sys.stderr)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])  # type: ignore
+        for (file_name, line, function_name), (_, calls, own_time, cumulative_time, _) in rows[:TOP_FUNCTIONS_TO_SHOW]:
+            location = f'{file_name}:{line}({function_name})' if line else function_name
+            print(f'  {cumulative_time:9.3f}s {own_time:9.3f}s {calls:>8}  {location}', file=sys.stderr)
+        print(f'combined profile at {combined_path}, see it with `python -m pstats {combined_path}`', file=sys.stderr)
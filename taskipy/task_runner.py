@@ -1,19 +1,39 @@
+import os
 import sys
 import platform
-import signal
+import shutil
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
 from difflib import get_close_matches
 from pathlib import Path
-from types import FrameType
-from typing import Callable, Dict, List, Tuple, Union, Optional
-
-import psutil  # type: ignore
-
-from taskipy.exceptions import CircularVariableError, TaskNotFoundError, MalformedTaskError
-from taskipy.list import TasksListFormatter
-from taskipy.pyproject import PyProject
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple, Union, Optional
+
+from taskipy.env import dotenv_cache
+from taskipy.exceptions import CircularVariableError, TaskNotFoundError, MalformedTaskError, PerformanceRegressionError
+from taskipy.jobserver import MAKEFLAGS_ENV_VAR, get_jobserver
+from taskipy.process_priority import apply_process_priority, get_process_priority, priority_launcher_args
+from taskipy.plan import Plan, Stage, Step
+from taskipy.pyproject import PYPROJECT_PATH_ENV_VAR, PyProject
+from taskipy.running_processes import INTERRUPTED_EXIT_CODE, running_processes, wait_for_process
 from taskipy.task import Task
 from taskipy.variable import Variable
+from taskipy.workers import get_workers
+
+# the modules of features that a run may not use are imported where they are used, rather than here, so that
+# they only add to the startup of the runs that use them
+if TYPE_CHECKING:
+    from taskipy.call import CallProcess
+    from taskipy.history import RunHistory
+    from taskipy.log_capture import FailureTail, LogCapture
+    from taskipy.parallel import Job
+    from taskipy.regression import Regression
+    from taskipy.resource_locks import ResourceLocks
+    from taskipy.shards import Shard
+    from taskipy.task_profile import TaskProfile
+    from taskipy.tracing import Span, Tracer
+    from taskipy.worker_pool import RemoteProcess
 
 if platform.system() == 'Windows':
     import mslex as shlex  # type: ignore # pylint: disable=E0401
@@ -21,42 +41,207 @@ else:
     import shlex  # type: ignore[no-redef]
 
 
-class TaskRunner:
+class TaskRunner:  # pylint: disable=R0902
     def __init__(self, cwd: Union[str, Path]):
         cwd_as_path = cwd if isinstance(cwd, Path) else Path(cwd)
         self.__project = PyProject(cwd_as_path)
         self.__working_dir = self.__get_working_dir() or cwd_as_path
+        self.__environments: Dict[str, Dict[str, str]] = {}
+        self.__regressions: List['Regression'] = []
+        self.__regression_threshold: Optional[float] = None
+        self.__output_lock = threading.Lock()
+        self.__failure_tails: Dict[str, 'FailureTail'] = {}
+        self.__run_history: Optional['RunHistory'] = None
+        self.__resource_locks: Optional['ResourceLocks'] = None
+        self.__tracer: Optional['Tracer'] = None
+        self.__profile: Optional['TaskProfile'] = None
+        self.__runner_environment: Optional[Dict[str, Any]] = None
 
     def list(self):
         """lists tasks to stdout"""
+        from taskipy.list import TasksListFormatter  # pylint: disable=C0415
+
         formatter = TasksListFormatter(self.__project.tasks.values())
         formatter.print()
 
-    def run(self, task_name: str, args: List[str]) -> int:
-        pre_command, command, post_command = self.__get_formatted_commands(task_name)
-        self.__working_dir =  self.__get_working_dir(task_name) or self.__working_dir
+    def stats(self, task_name: Optional[str] = None):
+        """prints statistics of past runs to stdout"""
+        from taskipy.stats import RunStatsFormatter  # pylint: disable=C0415
+
+        formatter = RunStatsFormatter(self.__history)
+        formatter.print(task_name)
+
+    def expected_duration(self, task_name: str) -> float:
+        """how long the task, including its pre and post hooks, is expected to run, in seconds.
+
+        based on the durations of past runs, falling back to the tasks' `weight` hints.
+        """
+        return sum(
+            self.__history.expected_duration(task.name) or task.weight
+            for task in self.__get_tasks(task_name)
+            if task is not None
+        )
+
+    def run(self, task_name: str, args: List[str], fail_on_regression: bool = False, profile: bool = False) -> int:
+        """runs the task with its pre and post hooks, and warns about hooks or tasks that ran much slower than usual.
+
+        with `fail_on_regression`, a run that succeeded but got slower fails with a `PerformanceRegressionError`.
+        with `profile`, every python process the run starts is profiled, and the slowest functions are printed.
+        """
+        self.__regressions = []
+        self.__regression_threshold = self.__project.regression_threshold
+        self.__failure_tails = {}
+        self.__tracer = self.__create_tracer()
+        self.__profile = self.__create_profile(task_name) if profile else None
+        self.__runner_environment = self.__resolve_runner_environment()
+
+        try:
+            exit_code = self.__traced(f'task {task_name}', {'taskipy.task': task_name}, lambda: self.__run_plan(self.__compile_plan(task_name), args))
+        finally:
+            if self.__tracer is not None:
+                self.__tracer.export(self.__project_name, self.__project.trace_file, self.__project.trace_endpoint)
+
+        if self.__profile is not None:
+            self.__profile.report()
+
+        for failure_tail in self.__failure_tails.values():
+            self.__print_failure_tail(failure_tail)
+
+        metrics_file = self.__project.metrics_file
+        if metrics_file is not None:
+            from taskipy.metrics import MetricsFile  # pylint: disable=C0415
+
+            MetricsFile(metrics_file, self.__project_name, self.__history).write()
+
+        for regression in self.__regressions:
+            print(f'warning: {regression}', file=sys.stderr)
+
+        if fail_on_regression and exit_code == 0 and self.__regressions:
+            raise PerformanceRegressionError([regression.task_name for regression in self.__regressions])
+
+        return exit_code
+
+    def plan(self, task_name: str, args: List[str]):
+        """prints what running the task would do to stdout, as json, without running it"""
+        import json  # pylint: disable=C0415
+
+        plan = self.__compile_plan(task_name)
+        working_dir = self.__get_working_dir(plan.cwd) or self.__working_dir
+        self.__runner_environment = self.__resolve_runner_environment()
+
+        stages = []
+        for stage in plan.stages:
+            stage_args = args if stage.takes_args else []
+            steps = []
+            for step in stage.steps:
+                description: Dict[str, object] = {
+                    'task': step.task.name,
+                    'call' if step.task.is_call else 'command': self.__get_command_with_args(step.task, step.command, stage_args),
+                    'cwd': str(working_dir),
+                    'env': self.__get_environment_overrides(step.task),
+                }
+                if step.task.shards > 1 or step.task.shard_files:
+                    description.update(shards=step.task.shards, shard_files=step.task.shard_files)
+                if step.task.batch_size is not None:
+                    description.update(batch_args={'size': step.task.batch_size, 'parallel': step.task.batch_parallel})
+                if step.task.retries:
+                    description.update(retries=step.task.retries)
+                if step.task.locks:
+                    description.update(locks=step.task.locks)
+                if step.task.concurrency_group is not None:
+                    description.update(concurrency_group={'name': step.task.concurrency_group, 'max': step.task.concurrency_group_max})
+                steps.append(description)
+
+            stages.append({'parallel': stage.parallel, 'max_parallel': stage.max_parallel, 'steps': steps})
+
+        print(json.dumps({'task': plan.task_name, 'stages': stages}, indent=2))
+
+    @property
+    def __project_name(self) -> str:
+        return self.__project.package_name or self.__project.dirpath.name
+
+    @property
+    def __history(self) -> 'RunHistory':
+        """the project's run history, which is only opened once a run is recorded or looked up"""
+        if self.__run_history is None:
+            from taskipy.history import RunHistory  # pylint: disable=C0415
+
+            self.__run_history = RunHistory(self.__project.dirpath)
+        return self.__run_history
+
+    def __create_tracer(self) -> Optional['Tracer']:
+        """a tracer for the run, if spans are exported anywhere"""
+        if self.__project.trace_file is None and self.__project.trace_endpoint is None:
+            return None
+
+        from taskipy.tracing import TRACEPARENT_ENV_VAR, Tracer  # pylint: disable=C0415
+
+        return Tracer(traceparent=os.environ.get(TRACEPARENT_ENV_VAR))
+
+    def __create_profile(self, task_name: str) -> 'TaskProfile':
+        from taskipy.task_profile import TaskProfile  # pylint: disable=C0415
+
+        return TaskProfile(self.__project.dirpath, task_name)
+
+    def __traced(self, name: str, attributes: Dict[str, Any], run: Callable[[], int], parent: Optional['Span'] = None) -> int:
+        """runs something that returns an exit code within a span of its own, if the run is traced"""
+        if self.__tracer is None:
+            return run()
+
+        with self.__tracer.span(name, attributes, parent=parent) as span:
+            exit_code = run()
+            span.set_exit_code(exit_code)
+        return exit_code
+
+    @property
+    def __current_span(self) -> Optional['Span']:
+        return self.__tracer.current_span if self.__tracer is not None else None
+
+    def __compile_plan(self, task_name: str) -> Plan:
+        pre_task, task, post_task = self.__get_tasks(task_name)
+        pre_command, command, post_command = self.__get_formatted_commands(pre_task, task, post_task)
+        stages = []
+
+        if pre_task is not None and pre_command is not None:
+            stages.append(Stage([Step(pre_task, pre_command)]))
 
-        if pre_command is not None:
-            exit_code = self.__run_command_and_return_exit_code(pre_command)
-            if exit_code != 0:
-                return exit_code
+        if task.matrix:
+            variants = self.__get_matrix_variants(task)
+            steps = [Step(variant, variant.command) for variant in variants]
+            stages.append(Stage(steps, parallel=True, max_parallel=task.max_parallel, takes_args=True))
+        else:
+            stages.append(Stage([Step(task, command)], takes_args=True))
 
-        exit_code = self.__run_command_and_return_exit_code(command, args)
-        if exit_code != 0:
-            return exit_code
+        if post_task is not None and post_command is not None:
+            stages.append(Stage([Step(post_task, post_command)]))
 
-        if post_command is not None:
-            exit_code = self.__run_command_and_return_exit_code(post_command)
-            if exit_code != 0:
-                return exit_code
+        return Plan(task_name, stages, cwd=task.workdir or self.__project.settings.get('cwd'))
+
+    def __run_plan(self, plan: Plan, args: List[str]) -> int:
+        self.__working_dir = self.__get_working_dir(plan.cwd) or self.__working_dir
+
+        for stage in plan.stages:
+            stage_args = args if stage.takes_args else []
+
+            if stage.parallel:
+                from taskipy.parallel import Job  # pylint: disable=C0415
+
+                jobs = [Job(step.task.name, self.__step_job(step, stage_args), self.__expected_job_duration(step.task)) for step in stage.steps]
+                exit_code = self.__run_jobs(plan.task_name, jobs, 'matrix combinations', stage.max_parallel or len(jobs))
+                if exit_code != 0:
+                    return exit_code
+                continue
+
+            for step in stage.steps:
+                exit_code = self.__run_step(step.task, step.command, stage_args)
+                if exit_code != 0:
+                    return exit_code
 
         return 0
 
     def __get_formatted_commands(
-        self, task_name: str
+        self, pre_task: Optional[Task], task: Task, post_task: Optional[Task]
     ) -> Tuple[Optional[str], str, Optional[str]]:
-        pre_task, task, post_task = self.__get_tasks(task_name)
-
         should_resolve_vars = (
             self.__is_using_vars([pre_task, task, post_task])
             or self.__project.settings.get('use_vars') is True
@@ -67,7 +252,8 @@ class TaskRunner:
         if pre_task is not None:
             pre_command = self.__format_task_command(pre_task, variables)
 
-        command = self.__format_task_command(task, variables)
+        # the commands of a matrix task are formatted for every combination of it separately
+        command = self.__format_task_command(task, variables) if not task.matrix else task.command
 
         post_command = None
         if post_task is not None:
@@ -75,6 +261,23 @@ class TaskRunner:
 
         return pre_command, command, post_command
 
+    def __get_matrix_variants(self, task: Task) -> List[Task]:
+        """a task for every combination of the task's matrix, with the combination's values formatted into its command"""
+        if not task.matrix:
+            return []
+
+        from taskipy.matrix import expand_matrix, format_combination  # pylint: disable=C0415
+
+        uses_vars = task.use_vars or (task.use_vars is None and self.__project.settings.get('use_vars'))
+        variables = self.__resolve_variables() if uses_vars else {}
+        return [
+            task.variant(
+                format_combination(task.name, combination),
+                self.__format_task_command(task, dict(variables, **combination), always=True),
+            )
+            for combination in expand_matrix(task.matrix, task.matrix_exclude)
+        ]
+
     def __get_tasks(self, task_name: str) -> Tuple[Optional[Task], Task, Optional[Task]]:
         pre_task = self.__pre_task(task_name)
         post_task = self.__post_task(task_name)
@@ -141,10 +344,15 @@ class TaskRunner:
 
         return nonrecursive_vars, recursive_vars
 
-    def __format_task_command(self, task: Task, variables: dict) -> str:
-        if task.use_vars or (
+    def __format_task_command(self, task: Task, variables: dict, always: bool = False) -> str:
+        if always or task.use_vars or (
             task.use_vars is None and self.__project.settings.get('use_vars')
         ):
+            if task.shard_files:
+                from taskipy.shards import SHARD_FILES_PLACEHOLDER  # pylint: disable=C0415
+
+                # keeps the placeholder around, to be filled in for every shard
+                variables = dict(variables, shard_files=SHARD_FILES_PLACEHOLDER)
             try:
                 return task.command.format(**variables)
             except KeyError as e:
@@ -155,52 +363,477 @@ class TaskRunner:
 
         return task.command
 
-    def __run_command_and_return_exit_code(
-        self, command: str, args: Optional[List[str]] = None
+    def __run_step(self, task: Task, command: str, args: List[str], group_output: bool = False) -> int:
+        def run_step() -> int:
+            if task.shards > 1 or task.shard_files:
+                return self.__run_shards(task, command, args)
+            if task.batch_size is not None and len(args) > task.batch_size:
+                return self.__run_batches(task, command, args)
+            return self.__run_task_command_with_retries(task, command, args, group_output=group_output)
+
+        return self.__traced(task.name, {'taskipy.task': task.name}, run_step)
+
+    def __step_job(self, step: Step, args: List[str]):
+        def run_step() -> int:
+            return self.__run_step(step.task, step.command, args, group_output=True)
+
+        return run_step
+
+    def __run_shards(self, task: Task, command: str, args: List[str]) -> int:
+        """runs a copy of the task for every shard at the same time, and returns the first non zero exit code"""
+        from taskipy.parallel import Job  # pylint: disable=C0415
+        from taskipy.shards import Shard, split_into_shards  # pylint: disable=C0415
+
+        if task.shard_files:
+            shards = split_into_shards(task.shards, task.shard_files, self.__working_dir)
+            # a shard without files would run the command on no files, which many tools take as "all files"
+            shards = [shard for shard in shards if shard.files]
+        else:
+            shards = [Shard(index, task.shards, []) for index in range(task.shards)]
+
+        if not shards:
+            print(f'no files match the shard_files of task "{task.name}"', file=sys.stderr)
+            return 0
+
+        expected_duration = self.__expected_job_duration(task)
+        jobs = [
+            Job(f'shard {shard.index}', self.__shard_job(task, shard, shard.format_command(command), args), expected_duration)
+            for shard in shards
+        ]
+        return self.__run_jobs(task.name, jobs, 'shards', len(jobs))
+
+    def __run_batches(self, task: Task, command: str, args: List[str]) -> int:
+        """runs the command once for every batch of the args, like xargs, and returns the first non zero exit code"""
+        from taskipy.parallel import Job  # pylint: disable=C0415
+
+        batch_size = task.batch_size or len(args)
+        expected_duration = self.__expected_job_duration(task)
+        jobs = [
+            Job(f'batch {index}', self.__batch_job(task, index, command, args[start:start + batch_size]), expected_duration)
+            for index, start in enumerate(range(0, len(args), batch_size))
+        ]
+
+        if not task.batch_parallel:
+            # batches that run one after the other print their output as it is written, which a progress view would get in the way of
+            return self.__run_jobs(task.name, jobs, 'batches', 1, show_progress=False)
+
+        # as many batches as -j allows run at once, each holding a jobserver token while its command runs
+        jobserver = get_jobserver()
+        return self.__run_jobs(task.name, jobs, 'batches', (jobserver.jobs if jobserver is not None else None) or os.cpu_count() or 1)
+
+    def __batch_job(self, task: Task, index: int, command: str, args: List[str]):
+        # batches run in threads of their own, which don't know about the span of the task they're a part of
+        parent_span = self.__current_span
+
+        def run_batch() -> int:
+            attributes = {'taskipy.task': task.name, 'taskipy.batch': index, 'taskipy.batch_args': len(args)}
+            return self.__traced(
+                f'{task.name} batch {index}',
+                attributes,
+                lambda: self.__run_task_command_with_retries(task, command, args, group_output=task.batch_parallel, batch=index),
+                parent=parent_span,
+            )
+
+        return run_batch
+
+    def __run_jobs(self, task_name: str, jobs: List['Job'], kind: str, max_jobs: int, show_progress: bool = True) -> int:  # pylint: disable=R0913,R0917
+        """runs the jobs that make up a task concurrently, prints a summary of them, and returns the first non zero exit code"""
+        from taskipy.parallel import ParallelExecutor  # pylint: disable=C0415
+
+        if not jobs:
+            print(f'no {kind} of task "{task_name}" to run', file=sys.stderr)
+            return 0
+
+        progress_title = task_name if show_progress and self.__project.progress else None
+        exit_codes = ParallelExecutor(max_jobs).run(jobs, progress_title)
+
+        failed = [(job, exit_code) for job, exit_code in zip(jobs, exit_codes) if exit_code != 0]
+        summary = f'ran "{task_name}" in {len(jobs)} {kind}, {len(failed)} failed'
+        for job, exit_code in failed:
+            summary += f'\n  {job.name} (exit code {exit_code})'
+        print(summary, file=sys.stderr)
+
+        return next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
+
+    def __expected_job_duration(self, task: Task) -> float:
+        """how long a run of the task is expected to take, to start the longest jobs first and to show their progress"""
+        return self.__history.expected_duration(task.name) or task.weight
+
+    def __shard_job(self, task: Task, shard: 'Shard', command: str, args: List[str]):
+        # shards run in threads of their own, which don't know about the span of the task they're a part of
+        parent_span = self.__current_span
+
+        def run_shard() -> int:
+            attributes = {'taskipy.task': task.name, 'taskipy.shard': shard.index}
+            return self.__traced(
+                f'{task.name} shard {shard.index}',
+                attributes,
+                lambda: self.__run_task_command_with_retries(task, command, args, shard, group_output=True),
+                parent=parent_span,
+            )
+
+        return run_shard
+
+    def __run_task_command_with_retries(  # pylint: disable=R0913,R0917
+        self,
+        task: Task,
+        command: str,
+        args: Optional[List[str]] = None,
+        shard: Optional['Shard'] = None,
+        group_output: bool = False,
+        batch: Optional[int] = None,
+    ) -> int:
+        exit_code = self.__run_attempt(task, command, args, shard, group_output, batch, attempt=1)
+
+        for attempt in range(1, task.retries + 1):
+            if exit_code == 0 or running_processes.interrupted:
+                break
+
+            if task.retry_on is not None and exit_code not in task.retry_on:
+                break
+
+            from taskipy.progress import progress_display  # pylint: disable=C0415
+
+            delay = task.retry_backoff * 2 ** (attempt - 1)
+            progress_display.print(
+                f'task "{task.name}" failed with exit code {exit_code}, '
+                f'retrying in {delay:g}s (attempt {attempt + 1} of {task.retries + 1})'
+            )
+            time.sleep(delay)
+            exit_code = self.__run_attempt(task, command, args, shard, group_output, batch, attempt=attempt + 1)
+
+        return exit_code
+
+    def __run_attempt(  # pylint: disable=R0913,R0917
+        self,
+        task: Task,
+        command: str,
+        args: Optional[List[str]],
+        shard: Optional['Shard'],
+        group_output: bool,
+        batch: Optional[int],
+        attempt: int,
+    ) -> int:
+        # the locks are released between attempts, so that others may use the resource while a retry backs off
+        with self.__hold_locks(task) as acquired:
+            if not acquired:
+                return INTERRUPTED_EXIT_CODE
+
+            if not task.retries:
+                return self.__run_command_and_return_exit_code(task, command, args, shard, group_output, batch)
+
+            # every attempt of a task that may be retried gets a span of its own
+            return self.__traced(
+                f'{task.name} attempt {attempt}',
+                {'taskipy.task': task.name, 'taskipy.attempt': attempt},
+                lambda: self.__run_command_and_return_exit_code(task, command, args, shard, group_output, batch),
+            )
+
+    @contextmanager
+    def __hold_locks(self, task: Task) -> Iterator[bool]:
+        """holds the task's locks within the block, if it takes any, and yields whether they were acquired"""
+        resource_locks = self.__get_resource_locks(task)
+        if resource_locks is None:
+            yield True
+            return
+
+        with resource_locks.hold(task) as acquired:
+            yield acquired
+
+    def __get_resource_locks(self, task: Task) -> Optional['ResourceLocks']:
+        """the project's locks, if the task takes any of them"""
+        if not task.locks and task.concurrency_group is None:
+            return None
+
+        if self.__resource_locks is None:
+            from taskipy.resource_locks import ResourceLocks  # pylint: disable=C0415
+
+            self.__resource_locks = ResourceLocks(self.__project.dirpath)
+        return self.__resource_locks
+
+    def __run_command_and_return_exit_code(  # pylint: disable=R0913,R0917
+        self,
+        task: Task,
+        command: str,
+        args: Optional[List[str]] = None,
+        shard: Optional['Shard'] = None,
+        group_output: bool = False,
+        batch: Optional[int] = None,
     ) -> int:
         if args is None:
             args = []
 
-        if self.__project.runner is not None:
-            command = f'{self.__project.runner} {command}'
-
-        command_with_args = ' '.join([command] + [shlex.quote(arg) for arg in args])
-        process = subprocess.Popen(
-            command_with_args, shell=True, cwd=self.__working_dir
-        )
-        signal.signal(signal.SIGTERM, self.__send_signal_to_task_process(process))
+        command_with_args = self.__get_command_with_args(task, command, args)
+        # shards and matrix combinations run side by side, so their output is collected and printed in one piece once each is done
+        output = self.__create_output_file() if group_output else None
+        capture = self.__create_log_capture(task, output)
 
         try:
-            process.wait()
-        except KeyboardInterrupt:
-            pass
+            with self.__job_slot() as pass_fds:
+                if pass_fds is None:
+                    return INTERRUPTED_EXIT_CODE
+
+                started_at_perf_counter = time.perf_counter()
+                process = self.__start_process(
+                    task,
+                    command_with_args,
+                    self.__get_environment(task, shard),
+                    subprocess.PIPE if capture is not None else output,
+                    subprocess.PIPE if capture is not None else (subprocess.STDOUT if output is not None else None),
+                    pass_fds=pass_fds,
+                )
+                if capture is not None:
+                    capture.start(process)
+                running_processes.add(process, is_shell=isinstance(process, subprocess.Popen))
+                running_processes.forward_sigterm()
+
+                peak_rss: Optional[int] = None
+                duration: Optional[float] = None
+                try:
+                    peak_rss = wait_for_process(process)
+                    duration = time.perf_counter() - started_at_perf_counter
+                except KeyboardInterrupt:
+                    running_processes.mark_interrupted()
+                finally:
+                    running_processes.discard(process)
+                    if capture is not None:
+                        capture.wait()
+        finally:
+            if output is not None:
+                self.__print_output(output)
+
+        if capture is not None and process.returncode is not None:
+            self.__keep_failure_tail(task, shard, batch, capture, process.returncode)
+
+        if duration is not None:
+            self.__check_for_regression(task, duration, process.returncode)
+            self.__history.record(
+                task.name,
+                command_with_args,
+                started_at=time.time() - duration,
+                duration=duration,
+                exit_code=process.returncode,
+                peak_rss=peak_rss,
+            )
 
         return process.returncode
 
-    def __send_signal_to_task_process(
-        self, process: subprocess.Popen
-    ) -> Callable[[int, Optional[FrameType]], None]:
-        def signal_handler(signum: int, _frame):
-            # pylint: disable=W0640
-            psutil_process_wrapper = psutil.Process(process.pid)
-            is_direct_subprocess_a_shell_process = sys.platform != 'darwin'  # pylint: disable=C0103
-
-            if is_direct_subprocess_a_shell_process:
-                # A shell is created because of Popen(..., shell=True) on linux only
-                # We want here to kill shell's child
-                sub_processes_of_taskipy_shell = psutil_process_wrapper.children()
-                for child_process in sub_processes_of_taskipy_shell:
-                    child_process.send_signal(signum)
-            else:
-                process.send_signal(signum)
+    @contextmanager
+    def __job_slot(self) -> Iterator[Optional[Tuple[int, ...]]]:
+        """holds a jobserver token while a command runs, and gives the file descriptors the command needs to share the jobserver.
+
+        gives None instead if taskipy was interrupted before the command could start, which it then never does.
+        """
+        if running_processes.interrupted:
+            yield None
+            return
+
+        jobserver = get_jobserver()
+        if jobserver is None:
+            yield ()
+            return
+
+        try:
+            token = jobserver.acquire()
+        except KeyboardInterrupt:
+            running_processes.mark_interrupted()
+            yield None
+            return
 
-        return signal_handler
+        try:
+            yield jobserver.pass_fds
+        finally:
+            jobserver.release(token)
 
-    def __get_working_dir(self, task_name: Optional[str] = None) -> Optional[Path]:
-        cwd: Optional[str] = self.__project.settings.get("cwd", None)
+    def __get_command_with_args(self, task: Task, command: str, args: List[str]) -> str:
+        # calls run in taskipy's own interpreter, so a runner doesn't apply to them
+        if self.__project.runner is not None and not task.is_call and self.__runner_environment is None:
+            command = f'{self.__project.runner} {command}'
 
-        if task_name is not None:
-            cwd = self.__project.tasks[task_name].workdir or cwd
+        return ' '.join([command] + [shlex.quote(arg) for arg in args])
+
+    def __create_output_file(self) -> IO[bytes]:
+        import tempfile  # pylint: disable=C0415
+
+        return tempfile.TemporaryFile()
+
+    def __create_log_capture(self, task: Task, output: Optional[IO[bytes]]) -> Optional['LogCapture']:
+        should_log = task.log if task.log is not None else self.__project.log
+        if not should_log:
+            return None
+
+        from taskipy.log_capture import LogCapture, create_log_path  # pylint: disable=C0415
+
+        log_path = create_log_path(self.__project.dirpath, task.name)
+        return LogCapture(log_path, self.__project.log_tail_bytes, output or sys.stdout.buffer, output or sys.stderr.buffer)
+
+    def __keep_failure_tail(self, task: Task, shard: Optional['Shard'], batch: Optional[int], capture: 'LogCapture', exit_code: int):  # pylint: disable=R0913,R0917
+        """keeps the tail of the output of a failed run, to print it again once the whole run is over"""
+        from taskipy.log_capture import FailureTail  # pylint: disable=C0415
+
+        run_name = task.name
+        if shard is not None:
+            run_name = f'{task.name} shard {shard.index}'
+        elif batch is not None:
+            run_name = f'{task.name} batch {batch}'
+        if exit_code == 0:
+            self.__failure_tails.pop(run_name, None)
+        else:
+            self.__failure_tails[run_name] = FailureTail(run_name, exit_code, capture.tail, capture.log_path)
+
+    def __start_process(  # pylint: disable=R0913,R0917
+        self,
+        task: Task,
+        command: str,
+        environment: Dict[str, str],
+        output: Union[IO[bytes], int, None],
+        errors: Union[IO[bytes], int, None],
+        pass_fds: Tuple[int, ...],
+    ) -> Union[subprocess.Popen, 'CallProcess', 'RemoteProcess']:
+        workers = get_workers()
+        if workers is not None and not task.is_call:
+            # a worker streams the errors of the command as part of its output
+            return workers.start(command, self.__project.dirpath, self.__working_dir, self.__get_remote_environment(environment), output)
+
+        priority = get_process_priority(task)
+
+        if task.is_call:
+            # imported lazily, since most tasks are shell commands
+            from taskipy.call import CallServer, call_server  # pylint: disable=C0415
+
+            if CallServer.is_supported(self.__project.dirpath, self.__project.preload):
+                target, *args = shlex.split(command)
+                return call_server.start(
+                    task.name,
+                    target,
+                    [target] + args,
+                    environment,
+                    str(self.__working_dir),
+                    priority,
+                    output,
+                    errors,
+                    pass_fds,
+                    self.__project.dirpath,
+                    self.__project.preload,
+                )
+            command = f'{shlex.quote(sys.executable)} -m taskipy.call {command}'
+        use_priority_launcher = bool(priority) and os.name == 'posix'
+        process = subprocess.Popen(
+            priority_launcher_args(task, command) if use_priority_launcher else command,
+            shell=not use_priority_launcher,
+            cwd=self.__working_dir,
+            env=environment,
+            stdout=output,
+            stderr=errors,
+            pass_fds=pass_fds,
+        )
+        if priority and not use_priority_launcher:
+            apply_process_priority(task.name, priority, process.pid)
+
+        return process
+
+    def __print_failure_tail(self, failure_tail: 'FailureTail'):
+        print(f'\n{failure_tail}, its output ended with:', file=sys.stderr, flush=True)
+        sys.stderr.buffer.write(failure_tail.tail)
+        sys.stderr.buffer.flush()
+
+    def __print_output(self, output: IO[bytes]):
+        from taskipy.progress import progress_display  # pylint: disable=C0415
+
+        with output, self.__output_lock, progress_display.paused():
+            output.seek(0)
+            sys.stdout.flush()
+            shutil.copyfileobj(output, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+
+    def __check_for_regression(self, task: Task, duration: float, exit_code: int):
+        if exit_code != 0 or self.__regression_threshold is None:
+            return
+
+        from taskipy.regression import detect_regression  # pylint: disable=C0415
+
+        regression = detect_regression(self.__history, task.name, duration, self.__regression_threshold)
+        if regression is not None:
+            self.__regressions.append(regression)
+
+    def __get_environment(self, task: Task, shard: Optional['Shard'] = None) -> Dict[str, str]:
+        environment = self.__get_task_environment(task)
+        additions = dict(shard.environment) if shard is not None else {}
+        resource_locks = self.__get_resource_locks(task)
+        if resource_locks is not None:
+            additions.update(resource_locks.environment(task))
+
+        span = self.__current_span
+        if span is not None:
+            from taskipy.tracing import TRACEPARENT_ENV_VAR  # pylint: disable=C0415
+
+            # lets nested taskipy runs, and anything else that traces, continue the trace within this span
+            additions[TRACEPARENT_ENV_VAR] = span.traceparent
+
+        if self.__profile is not None:
+            additions.update(self.__profile.environment(environment))
+
+        return dict(environment, **additions) if additions else environment
+
+    def __get_task_environment(self, task: Task) -> Dict[str, str]:
+        """computes the environment of a task once, so that retries and parallel runs of it share the same mapping"""
+        if task.name in self.__environments:
+            return self.__environments[task.name]
+
+        environment = dict(os.environ)
+        environment.update(self.__get_environment_overrides(task))
+        if self.__runner_environment is not None and not task.is_call:
+            from taskipy.runner_environment import apply_runner_environment  # pylint: disable=C0415
+
+            environment = apply_runner_environment(environment, self.__runner_environment)
+
+        # lets nested taskipy runs skip looking for the pyproject.toml file
+        environment[PYPROJECT_PATH_ENV_VAR] = str(self.__project.path)
+
+        jobserver = get_jobserver()
+        if jobserver is not None:
+            environment.update(jobserver.environment)
+
+        self.__environments[task.name] = environment
+        return environment
+
+    def __get_remote_environment(self, environment: Dict[str, str]) -> Dict[str, str]:
+        """the variables that taskipy set for a command, which a worker adds to its own environment to run it"""
+        # the pyproject.toml file and the jobserver's pipe of this machine mean nothing on another one
+        return {
+            name: value
+            for name, value in environment.items()
+            if os.environ.get(name) != value and name not in (PYPROJECT_PATH_ENV_VAR, MAKEFLAGS_ENV_VAR)
+        }
+
+    def __resolve_runner_environment(self) -> Optional[Dict[str, Any]]:
+        """what the runner adds to the environment, when it is resolved once instead of prefixed to every command"""
+        runner = self.__project.runner
+        # the environment a runner sets up on this machine doesn't apply to workers, which run the runner themselves
+        if not runner or not self.__project.cache_runner_env or get_workers() is not None:
+            return None
+
+        from taskipy.runner_environment import RunnerEnvironment  # pylint: disable=C0415
+
+        runner_environment = RunnerEnvironment(self.__project.dirpath, runner).resolve()
+        if runner_environment is None:
+            print(f'warning: could not resolve the environment of runner "{runner}", prefixing every command with it', file=sys.stderr)
+        return runner_environment
+
+    def __get_environment_overrides(self, task: Task) -> Dict[str, str]:
+        """the variables that taskipy's and the task's settings add to the environment taskipy was called with"""
+        overrides: Dict[str, str] = {}
+        for env_file in self.__project.env_files:
+            overrides.update(dotenv_cache.load(self.__project.dirpath / env_file))
+        overrides.update(self.__project.env)
+        for env_file in task.env_files:
+            overrides.update(dotenv_cache.load(self.__project.dirpath / env_file))
+        overrides.update(task.env)
+
+        return overrides
+
+    def __get_working_dir(self, cwd: Optional[str] = None) -> Optional[Path]:
+        cwd = cwd or self.__project.settings.get("cwd", None)
 
         if cwd is not None:
             path = self.__project.dirpath / cwd
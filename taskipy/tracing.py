@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACEPARENT_ENV_VAR = 'TRACEPARENT'
+TRACEPARENT_PATTERN = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+EXPORT_TIMEOUT_SECONDS = 5
+
+# https://opentelemetry.io/docs/specs/otlp/ - the enum values of Span.SpanKind and Status.StatusCode
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+class Span:  # pylint: disable=R0902
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        self.__name = name
+        self.__trace_id = trace_id
+        self.__span_id = os.urandom(8).hex()
+        self.__parent_span_id = parent_span_id
+        self.__attributes = attributes
+        self.__started_at = time.time()
+        self.__ended_at: Optional[float] = None
+        self.__exit_code: Optional[int] = None
+
+    @property
+    def traceparent(self) -> str:
+        """the w3c trace context of the span, for the processes started within it"""
+        return f'00-{self.__trace_id}-{self.__span_id}-01'
+
+    @property
+    def span_id(self) -> str:
+        return self.__span_id
+
+    def set_exit_code(self, exit_code: int):
+        self.__exit_code = exit_code
+
+    def end(self):
+        self.__ended_at = time.time()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        attributes = dict(self.__attributes)
+        if self.__exit_code is not None:
+            attributes['taskipy.exit_code'] = self.__exit_code
+
+        span: Dict[str, Any] = {
+            'traceId': self.__trace_id,
+            'spanId': self.__span_id,
+            'name': self.__name,
+            'kind': SPAN_KIND_INTERNAL,
+            # nanoseconds as strings, the way OTLP/JSON encodes 64 bit ints
+            'startTimeUnixNano': str(int(self.__started_at * 1e9)),
+            'endTimeUnixNano': str(int((self.__ended_at or time.time()) * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()],
+            'status': {'code': STATUS_CODE_ERROR if self.__exit_code else STATUS_CODE_OK},
+        }
+        if self.__parent_span_id is not None:
+            span['parentSpanId'] = self.__parent_span_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    return {'stringValue': str(value)}
+
+
+class Tracer:
+    """records spans of a taskipy run, as children of the trace context taskipy was started in, if any.
+
+    a span is the current one of the thread that opened it, and the spans opened in a thread without a current
+    span are children of the run's root span.
+    """
+
+    def __init__(self, traceparent: Optional[str] = None):
+        match = TRACEPARENT_PATTERN.match(traceparent or '')
+        self.__trace_id = match.group(1) if match else os.urandom(16).hex()
+        self.__parent_span_id = match.group(2) if match else None
+        self.__root_span: Optional[Span] = None
+        self.__current = threading.local()
+        self.__spans: List[Span] = []
+        self.__lock = threading.Lock()
+
+    @property
+    def current_span(self) -> Optional[Span]:
+        return getattr(self.__current, 'span', None) or self.__root_span
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None) -> Iterator[Span]:
+        """opens a span, that is the current span of this thread until it ends"""
+        parent = parent or self.current_span
+        parent_span_id = parent.span_id if parent is not None else self.__parent_span_id
+        span = Span(name, self.__trace_id, parent_span_id, attributes or {})
+
+        previous = getattr(self.__current, 'span', None)
+        if self.__root_span is None:
+            self.__root_span = span
+        else:
+            self.__current.span = span
+
+        try:
+            yield span
+        finally:
+            span.end()
+            self.__current.span = previous
+            if span is self.__root_span:
+                self.__root_span = None
+
+            with self.__lock:
+                self.__spans.append(span)
+
+    def export(self, project: str, file: Optional[Path], endpoint: Optional[str]):
+        """writes the spans ended so far as an OTLP/JSON export request, appended to a file as a line, or posted to an OTLP/HTTP endpoint"""
+        with self.__lock:
+            spans, self.__spans = self.__spans, []
+        if not spans:
+            return
+
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': 'taskipy'}},
+                    {'key': 'taskipy.project', 'value': {'stringValue': project}},
+                ]},
+                'scopeSpans': [{'scope': {'name': 'taskipy'}, 'spans': [span.to_otlp() for span in spans]}],
+            }],
+        }
+        payload = json.dumps(request, separators=(',', ':')).encode()
+
+        if file is not None:
+            self.__append_to_file(file, payload)
+        if endpoint is not None:
+            self.__post_to_endpoint(endpoint, payload)
+
+    def __append_to_file(self, file: Path, payload: bytes):
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            # a single write to a file opened for appending, so that the lines of nested taskipy runs don't interleave
+            fd = os.open(str(file), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, payload + b'\n')
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f'warning: could not export spans to {file}: {e}', file=sys.stderr)
+
+    def __post_to_endpoint(self, endpoint: str, payload: bytes):
+        import urllib.request  # pylint: disable=C0415
+
+        request = urllib.request.Request(endpoint, data=payload, headers={'Content-Type': 'application/json'}, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=EXPORT_TIMEOUT_SECONDS):
+                pass
+        except (OSError, ValueError) as e:
+            print(f'warning: could not export spans to {endpoint}: {e}', file=sys.stderr)
@@ -0,0 +1,224 @@
+import base64
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from taskipy.agent import PROTOCOL_VERSION, is_loopback, parse_address, read_token_file
+from taskipy.connection import Connection
+from taskipy.exceptions import WorkersUnavailableError
+from taskipy.running_processes import running_processes
+
+CONNECT_TIMEOUT_SECONDS = 10
+
+
+class Worker:
+    """an agent that a coordinator runs commands on"""
+
+    def __init__(self, address: str, capacity: int):
+        self.__address = address
+        self.__capacity = capacity
+
+    @property
+    def address(self) -> str:
+        return self.__address
+
+    @property
+    def capacity(self) -> int:
+        """how many commands the agent runs at the same time"""
+        return self.__capacity
+
+
+class RemoteProcess:
+    """a command that runs on an agent, with the parts of the Popen interface taskipy uses"""
+
+    def __init__(self, worker: Worker, connection: Connection, output: Union[IO[bytes], int, None], on_exit: Callable[[], None]):
+        self.__worker = worker
+        self.__connection = connection
+        self.__on_exit = on_exit
+        self.__stdout: Optional[IO[bytes]] = None
+        # None until the command exits, and typed loosely like Popen's
+        self.returncode: Any = None
+
+        if output == subprocess.PIPE:
+            read_end, write_end = os.pipe()
+            self.__stdout = os.fdopen(read_end, 'rb')
+            sink: IO[bytes] = os.fdopen(write_end, 'wb')
+        else:
+            sink = output if output is not None and not isinstance(output, int) else sys.stdout.buffer
+
+        self.__thread = threading.Thread(target=self.__receive, args=(sink, output == subprocess.PIPE), daemon=True)
+        self.__thread.start()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return None
+
+    @property
+    def stdout(self) -> Optional[IO[bytes]]:
+        """the read end of the command's output, if it was started with `stdout=subprocess.PIPE`"""
+        return self.__stdout
+
+    def wait(self) -> Optional[int]:
+        # an interrupt only reaches the processes on this machine, so it is passed on to the agent, and the command
+        # is waited for until it stops
+        interrupt_forwarded = False
+        while self.__thread.is_alive():
+            try:
+                self.__thread.join(0.1)
+            except KeyboardInterrupt:
+                running_processes.mark_interrupted()
+
+            if running_processes.interrupted and not interrupt_forwarded:
+                self.send_signal(signal.SIGINT)
+                interrupt_forwarded = True
+
+        return self.returncode
+
+    def send_signal(self, signum: int):
+        try:
+            self.__connection.send({'type': 'signal', 'signal': int(signum)})
+        except OSError:
+            pass
+
+    def __receive(self, sink: IO[bytes], close_sink: bool):
+        try:
+            while True:
+                message = self.__connection.receive()
+                if message is None:
+                    print(f'lost the connection to worker "{self.__worker.address}"', file=sys.stderr, flush=True)
+                    self.returncode = 1
+                    break
+
+                if message.get('type') == 'output':
+                    sink.write(base64.b64decode(message['data']))
+                    sink.flush()
+                elif message.get('type') == 'exit':
+                    if message.get('error'):
+                        print(f'worker "{self.__worker.address}" could not run the command: {message["error"]}', file=sys.stderr, flush=True)
+                    self.returncode = message['code'] if message.get('code') is not None else 1
+                    break
+        finally:
+            if close_sink:
+                sink.close()
+            self.__connection.close()
+            self.__on_exit()
+
+
+class WorkerPool:
+    """the agents that run the commands of tasks in place of this process, `task --workers` being their coordinator.
+
+    a command runs on the agent with the most free capacity, out of those that have the project it belongs to checked
+    out, at the same path relative to the root of their checkout as it is relative to the coordinator's.
+    """
+
+    def __init__(self, addresses: List[str], root: Path, token: Optional[str] = None):
+        self.__root = root.resolve()
+        self.__token = token
+        self.__workers: List[Worker] = []
+        self.__running: Dict[str, int] = {}
+        self.__checked_out: Dict[Tuple[str, str], bool] = {}
+        self.__condition = threading.Condition()
+
+        for address in addresses:
+            try:
+                connection, welcome = self.__connect(address)
+                connection.close()
+            except (OSError, ValueError) as e:
+                print(f'warning: could not use worker "{address}": {e}', file=sys.stderr)
+                continue
+
+            self.__workers.append(Worker(address, welcome['capacity']))
+            self.__running[address] = 0
+
+        if not self.__workers:
+            raise WorkersUnavailableError('none of the workers could be reached')
+
+    @property
+    def workers(self) -> List[Worker]:
+        return self.__workers
+
+    def start(self, command: str, project_dir: Path, cwd: Path, environment: Dict[str, str], output: Union[IO[bytes], int, None]) -> RemoteProcess:  # pylint: disable=R0913,R0917
+        """starts the command on a worker that has the project checked out, waiting for one to have capacity for it"""
+        path = self.__relative_path(project_dir)
+        worker = self.__acquire(path)
+        try:
+            connection, _ = self.__connect(worker.address)
+            connection.send({
+                'type': 'run',
+                'path': path,
+                'cwd': self.__relative_path(cwd),
+                'command': command,
+                'env': environment,
+            })
+        except (OSError, ValueError) as e:
+            self.__release(worker)
+            raise WorkersUnavailableError(f'could not start the command on worker "{worker.address}": {e}')
+
+        return RemoteProcess(worker, connection, output, lambda: self.__release(worker))
+
+    def __acquire(self, path: str) -> Worker:
+        candidates = [worker for worker in self.__workers if self.__has_checked_out(worker, path)]
+        if not candidates:
+            raise WorkersUnavailableError(f'none of the workers has "{path}" checked out')
+
+        with self.__condition:
+            while True:
+                free_capacity = {worker: worker.capacity - self.__running[worker.address] for worker in candidates}
+                worker = max(candidates, key=lambda candidate: free_capacity[candidate])
+                if free_capacity[worker] > 0:
+                    self.__running[worker.address] += 1
+                    return worker
+                self.__condition.wait()
+
+    def __release(self, worker: Worker):
+        with self.__condition:
+            self.__running[worker.address] -= 1
+            self.__condition.notify_all()
+
+    def __has_checked_out(self, worker: Worker, path: str) -> bool:
+        key = (worker.address, path)
+        if key not in self.__checked_out:
+            try:
+                connection, _ = self.__connect(worker.address)
+                try:
+                    connection.send({'type': 'probe', 'path': path})
+                    reply = connection.receive()
+                finally:
+                    connection.close()
+                self.__checked_out[key] = bool(reply and reply.get('checked_out'))
+            except (OSError, ValueError):
+                self.__checked_out[key] = False
+
+        return self.__checked_out[key]
+
+    def __connect(self, address: str) -> Tuple[Connection, Dict[str, Any]]:
+        """connects to an agent and greets it, raising a ValueError if it refuses to run commands for this coordinator"""
+        host, port = parse_address(address)
+        token = self.__token
+        if token is None and is_loopback(host):
+            # only an agent on this machine can have written the token file, so it is never sent anywhere else
+            token = read_token_file(port)
+
+        sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT_SECONDS)
+        sock.settimeout(None)
+        connection = Connection(sock)
+
+        connection.send({'type': 'hello', 'version': PROTOCOL_VERSION, 'token': token})
+        welcome = connection.receive()
+        if welcome is None or welcome.get('type') != 'welcome':
+            connection.close()
+            raise ValueError(welcome.get('message') if welcome is not None else 'the agent closed the connection')
+
+        return connection, welcome
+
+    def __relative_path(self, path: Path) -> str:
+        """the path relative to the root of the checkout, the way agents know it"""
+        try:
+            return path.resolve().relative_to(self.__root).as_posix()
+        except ValueError:
+            raise WorkersUnavailableError(f'"{path}" is outside of the checkout at "{self.__root}" that the workers run commands in')
@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from taskipy.worker_pool import WorkerPool
+
+DEFAULT_AGENT_PORT = 7890
+
+_worker_pool: Optional['WorkerPool'] = None
+
+
+def start_workers(addresses: List[str], root: Path) -> 'WorkerPool':
+    """connects to the agents that the commands of this process run on from now on"""
+    # imported here, since only runs with --workers need sockets, and every run checks whether it has workers
+    from taskipy.agent import AGENT_TOKEN_ENV_VAR  # pylint: disable=C0415
+    from taskipy.worker_pool import WorkerPool  # pylint: disable=C0415
+
+    global _worker_pool  # pylint: disable=W0603
+    _worker_pool = WorkerPool(addresses, root, os.environ.get(AGENT_TOKEN_ENV_VAR))
+    return _worker_pool
+
+
+def get_workers() -> Optional['WorkerPool']:
+    return _worker_pool
@@ -0,0 +1,246 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from taskipy.cache import CACHE_DIR_NAME, get_cache_dir
+from taskipy.exceptions import (
+    ChangedFilesError,
+    MissingTaskipyTasksSectionError,
+    TaskipyError,
+    TaskNotFoundError,
+)
+from taskipy.parallel import Job, ParallelExecutor
+from taskipy.pyproject import PyProject
+from taskipy.task_runner import TaskRunner
+
+IGNORED_DIR_NAMES = frozenset([
+    '.git', '.hg', '.svn', 'node_modules', '.venv', 'venv', '.tox', '.nox',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache', CACHE_DIR_NAME,
+])
+INDEX_FILE_NAME = 'workspace-index.json'
+
+
+class DirectoryIndex:
+    """an index of the packages (directories with a pyproject.toml file) under a root directory.
+
+    the index is cached in the root's taskipy cache dir together with the mtime of every directory
+    that was scanned. a directory's mtime changes whenever an entry is added to or removed from it,
+    so a later run only needs to stat the directories, instead of listing all of them again.
+    """
+
+    def __init__(self, root: Path):
+        self.__root = root
+        self.__packages: Optional[List[Path]] = None
+
+    @property
+    def packages(self) -> List[Path]:
+        if self.__packages is None:
+            relative_packages = self.__load_cached_index()
+
+            if relative_packages is None:
+                relative_packages, dir_mtimes = self.__scan()
+                self.__save_index(relative_packages, dir_mtimes)
+
+            self.__packages = [self.__root / package for package in relative_packages]
+
+        return self.__packages
+
+    def __scan(self) -> Tuple[List[str], Dict[str, int]]:
+        packages: List[str] = []
+        dir_mtimes: Dict[str, int] = {}
+        dirs_to_scan = [self.__root]
+
+        while dirs_to_scan:
+            current_dir = dirs_to_scan.pop()
+            relative_dir = os.path.relpath(current_dir, self.__root)
+
+            try:
+                dir_mtimes[relative_dir] = current_dir.stat().st_mtime_ns
+                with os.scandir(current_dir) as entries:
+                    entry_list = list(entries)
+            except OSError:
+                continue
+
+            entry_names = {entry.name for entry in entry_list}
+            if 'pyvenv.cfg' in entry_names:
+                continue
+
+            if 'pyproject.toml' in entry_names:
+                packages.append(relative_dir)
+
+            for entry in entry_list:
+                if entry.name not in IGNORED_DIR_NAMES and entry.is_dir(follow_symlinks=False):
+                    dirs_to_scan.append(Path(entry.path))
+
+        return sorted(packages), dir_mtimes
+
+    def __load_cached_index(self) -> Optional[List[str]]:
+        try:
+            with open(self.__root / CACHE_DIR_NAME / INDEX_FILE_NAME, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+
+            for relative_dir, mtime in index['dirs'].items():
+                if (self.__root / relative_dir).stat().st_mtime_ns != mtime:
+                    return None
+
+            return index['packages']
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def __save_index(self, packages: List[str], dir_mtimes: Dict[str, int]):
+        try:
+            index_path = get_cache_dir(self.__root) / INDEX_FILE_NAME
+            with open(index_path, 'w', encoding='utf-8') as file:
+                json.dump({'packages': packages, 'dirs': dir_mtimes}, file)
+        except OSError:
+            # the cache is an optimization, a read-only checkout should still work
+            pass
+
+
+class Workspace:
+    def __init__(self, root: Path, max_jobs: Optional[int] = None):
+        self.__root = root
+        self.__index = DirectoryIndex(root)
+        self.__executor = ParallelExecutor(max_jobs)
+        self.__projects: Optional[Dict[Path, PyProject]] = None
+
+    @property
+    def packages(self) -> List[Path]:
+        return self.__index.packages
+
+    def run(self, task_name: str, args: List[str], since: Optional[str] = None, fail_on_regression: bool = False) -> int:
+        """runs the task in every package that defines it, and returns the first non zero exit code.
+
+        if `since` is given, only packages with files changed since that git ref, and the packages
+        that depend on them, run the task.
+        """
+        packages = self.__packages_with_task(task_name)
+        if not packages:
+            raise TaskNotFoundError(task_name)
+
+        if since is not None:
+            affected_packages = self.__affected_packages(since)
+            packages = [package for package in packages if package in affected_packages]
+
+            if not packages:
+                print(f'no package that defines "{task_name}" was affected by changes since "{since}"', file=sys.stderr)
+                return 0
+
+        runners = {package: TaskRunner(package) for package in packages}
+        jobs = [
+            Job(
+                self.__display_name(package),
+                self.__package_job(package, runners[package], task_name, args, fail_on_regression),
+                runners[package].expected_duration(task_name),
+            )
+            for package in packages
+        ]
+        exit_codes = self.__executor.run(jobs)
+        self.__print_summary(task_name, jobs, exit_codes)
+
+        return next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
+
+    def __load_projects(self) -> Dict[Path, PyProject]:
+        if self.__projects is None:
+            self.__projects = {package: PyProject(package) for package in self.packages}
+
+        return self.__projects
+
+    def __packages_with_task(self, task_name: str) -> List[Path]:
+        packages = []
+
+        for package, project in self.__load_projects().items():
+            try:
+                if task_name in project.tasks:
+                    packages.append(package)
+            except MissingTaskipyTasksSectionError:
+                pass
+
+        return packages
+
+    def __affected_packages(self, since: str) -> Set[Path]:
+        changed_files = self.__git_changed_files(since)
+        package_set = set(self.packages)
+        affected: Set[Path] = set()
+
+        for changed_file in changed_files:
+            for candidate in (self.__root / changed_file).parents:
+                if candidate in package_set:
+                    affected.add(candidate)
+                    break
+
+        dependents = self.__dependents_by_package()
+        packages_to_visit = list(affected)
+        while packages_to_visit:
+            for dependent in dependents.get(packages_to_visit.pop(), set()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    packages_to_visit.append(dependent)
+
+        return affected
+
+    def __dependents_by_package(self) -> Dict[Path, Set[Path]]:
+        projects = self.__load_projects()
+        packages_by_name = {
+            project.package_name: package
+            for package, project in projects.items()
+            if project.package_name is not None
+        }
+
+        dependents: Dict[Path, Set[Path]] = {}
+        for package, project in projects.items():
+            for dependency_name in project.dependency_names:
+                dependency = packages_by_name.get(dependency_name)
+                if dependency is not None and dependency != package:
+                    dependents.setdefault(dependency, set()).add(package)
+
+        return dependents
+
+    def __git_changed_files(self, since: str) -> List[str]:
+        return (
+            self.__git(since, ['diff', '--name-only', '--relative', since, '--'])
+            + self.__git(since, ['ls-files', '--others', '--exclude-standard'])
+        )
+
+    def __git(self, since: str, args: List[str]) -> List[str]:
+        try:
+            process = subprocess.run(
+                ['git'] + args,
+                cwd=self.__root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                check=False,
+            )
+        except FileNotFoundError:
+            raise ChangedFilesError(since, 'git is not installed')
+
+        if process.returncode != 0:
+            raise ChangedFilesError(since, process.stderr.strip())
+
+        return [line for line in process.stdout.splitlines() if line]
+
+    def __package_job(self, package: Path, runner: TaskRunner, task_name: str, args: List[str], fail_on_regression: bool):
+        def run_in_package() -> int:
+            try:
+                return runner.run(task_name, args, fail_on_regression)
+            except TaskipyError as e:
+                print(f'{self.__display_name(package)}: {e}', file=sys.stderr)
+                return e.exit_code
+
+        return run_in_package
+
+    def __display_name(self, package: Path) -> str:
+        return os.path.relpath(package, self.__root)
+
+    def __print_summary(self, task_name: str, jobs: List[Job], exit_codes: List[int]):
+        failed = [(job, exit_code) for job, exit_code in zip(jobs, exit_codes) if exit_code != 0]
+        summary = f'ran "{task_name}" in {len(jobs)} packages, {len(failed)} failed'
+
+        for job, exit_code in failed:
+            summary += f'\n  {job.name} (exit code {exit_code})'
+
+        print(summary, file=sys.stderr)
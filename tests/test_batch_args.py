@@ -0,0 +1,66 @@
+import time
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class TaskBatchArgsTestCase(TaskipyTestCase):
+    def test_running_the_command_once_for_every_batch_of_args(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            lint = { cmd = "echo files:", batch_args = { size = 2 } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('lint', ['a.py', 'b.py', 'c.py', 'd.py', 'e.py'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout.splitlines(), ['files: a.py b.py', 'files: c.py d.py', 'files: e.py'])
+        self.assertSubstr('ran "lint" in 3 batches, 0 failed', stderr)
+
+    def test_passing_args_at_once_if_they_fit_in_a_batch(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            lint = { cmd = "echo files:", batch_args = { size = 2 } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('lint', ['a.py', 'b.py'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout.splitlines(), ['files: a.py b.py'])
+        self.assertNotIn('batches', stderr)
+
+    def test_running_batches_concurrently_up_to_the_jobs_limit(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            lint = { cmd = "sleep 1 && echo", batch_args = { size = 1, parallel = true } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        started_at = time.perf_counter()
+        exit_code, stdout, _ = self.run_task('-j', ['3', 'lint', 'a', 'b', 'c'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['a', 'b', 'c'])
+        self.assertLess(time.perf_counter() - started_at, 2.5)
+
+    def test_exiting_with_the_exit_code_of_the_first_failed_batch(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            lint = { cmd = "exit", batch_args = { size = 1, parallel = true } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('lint', ['0', '3', '0', '5'], cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+        self.assertSubstr('ran "lint" in 4 batches, 2 failed', stderr)
+        self.assertSubstr('batch 1 (exit code 3)', stderr)
+        self.assertSubstr('batch 3 (exit code 5)', stderr)
+
+    def test_exiting_with_code_1_if_batch_args_are_malformed(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            lint = { cmd = "echo", batch_args = { size = 0 } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('lint', ['a'], cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('"batch_args" arg has to be a table of a positive "size"', stdout)
@@ -0,0 +1,161 @@
+import os
+import platform
+import unittest
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+TOOL_MODULE = '''
+import os
+import sys
+
+def greet():
+    print('hello', *sys.argv[1:], os.environ.get('GREETING_SUFFIX', ''))
+
+def fail():
+    return 3
+
+def crash():
+    raise RuntimeError('boom')
+
+def cwd():
+    print(os.getcwd())
+
+def preloaded():
+    print('preloaded' if 'heavy' in sys.modules else 'not preloaded')
+
+def preloaded_version():
+    print('version', sys.modules['heavy'].VERSION, 'forked from', os.getppid())
+'''
+
+
+class CallTaskTestCase(TaskipyTestCase):
+    def create_project_with_module(self, py_project_toml: str) -> str:
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        with open(path.join(cwd, 'tool.py'), 'w', encoding='utf-8') as f:
+            f.write(TOOL_MODULE)
+        with open(path.join(cwd, 'heavy.py'), 'w', encoding='utf-8') as f:
+            f.write('')
+        return cwd
+
+    def test_calling_function_with_args_and_env(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { call = "tool:greet", env = { GREETING_SUFFIX = "!" } }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', ['world'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('hello world !', stdout)
+
+    def test_exiting_with_code_returned_by_function(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            fail = { call = "tool:fail" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, _, _ = self.run_task('fail', cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+
+    def test_exiting_with_code_1_if_function_raises(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            crash = { call = "tool:crash" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, _, stderr = self.run_task('crash', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('RuntimeError: boom', stderr)
+
+    def test_calling_function_in_task_working_dir(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            cwd = { call = "tool:cwd", cwd = "sub" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        os.makedirs(path.join(cwd, 'sub'))
+        with open(path.join(cwd, 'sub', 'tool.py'), 'w', encoding='utf-8') as f:
+            f.write(TOOL_MODULE)
+        exit_code, stdout, _ = self.run_task('cwd', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(path.realpath(stdout.strip()), path.realpath(path.join(cwd, 'sub')))
+
+    def test_preloading_modules_in_call_server(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            preload = ["heavy"]
+
+            [tool.taskipy.tasks]
+            preloaded = { call = "tool:preloaded" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, stdout, _ = self.run_task('preloaded', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('preloaded', stdout)
+        self.assertNotIn('not preloaded', stdout)
+
+    @unittest.skipIf(platform.system() == 'Windows', 'there is no call server on windows, where every call runs in a new process')
+    def test_forking_calls_of_later_runs_from_same_call_server_until_preloaded_module_changes(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            preload = ["heavy"]
+
+            [tool.taskipy.tasks]
+            version = { call = "tool:preloaded_version" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        heavy_path = path.join(cwd, 'heavy.py')
+        with open(heavy_path, 'w', encoding='utf-8') as f:
+            f.write('VERSION = 1\n')
+
+        _, first_stdout, _ = self.run_task('version', cwd=cwd)
+        _, second_stdout, _ = self.run_task('version', cwd=cwd)
+        self.assertSubstr('version 1', second_stdout)
+        self.assertEqual(first_stdout, second_stdout)
+
+        with open(heavy_path, 'w', encoding='utf-8') as f:
+            f.write('VERSION = 2\n')
+        # a later modification time than the one the call server saw, however coarse the file system's clock
+        os.utime(heavy_path, (os.path.getmtime(heavy_path) + 10,) * 2)
+        _, third_stdout, _ = self.run_task('version', cwd=cwd)
+        self.assertSubstr('version 2', third_stdout)
+        self.assertNotEqual(third_stdout.split()[-1], first_stdout.split()[-1])
+
+    def test_logging_output_of_call(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { call = "tool:greet", log = true }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('hello', stdout)
+        self.assertEqual(len(os.listdir(path.join(cwd, '.taskipy_cache', 'logs', 'greet'))), 1)
+
+    def test_keeping_errors_of_logged_call_on_stderr(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            crash = { call = "tool:crash", log = true }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        _, stdout, stderr = self.run_task('crash', cwd=cwd)
+
+        self.assertSubstr('RuntimeError: boom', stderr)
+        self.assertNotSubstr('boom', stdout)
+
+    def test_exiting_with_code_1_if_call_is_malformed(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { call = "tool.greet" }
+        '''
+        cwd = self.create_project_with_module(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('"call" arg has to be a "package.module:function" string', stdout)
@@ -0,0 +1,89 @@
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+PRINT_ENV_COMMAND = 'python -c \\"import os; print(os.environ.get(\'GREETING\'), os.environ.get(\'NAME\'))\\"'
+
+
+class TaskEnvTestCase(TaskipyTestCase):
+    def write_file(self, cwd: str, name: str, contents: str):
+        with open(path.join(cwd, name), 'w', encoding='utf-8') as f:
+            f.write(contents)
+
+    def test_task_env_is_passed_to_command(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            greet = {{ cmd = "{PRINT_ENV_COMMAND}", env = {{ GREETING = "hello", NAME = "taskipy" }} }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('hello taskipy', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_task_env_file_is_loaded(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            greet = {{ cmd = "{PRINT_ENV_COMMAND}", env_file = ".env" }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.write_file(cwd, '.env', '# comment\nexport GREETING="hi there"\nNAME=dotenv # trailing comment\n')
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('hi there dotenv', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_settings_env_applies_to_all_tasks_and_tasks_override_it(self):
+        py_project_toml = f'''
+            [tool.taskipy.settings]
+            env_file = ".env"
+            env = {{ NAME = "settings" }}
+
+            [tool.taskipy.tasks]
+            greet = "{PRINT_ENV_COMMAND}"
+            greet_override = {{ cmd = "{PRINT_ENV_COMMAND}", env = {{ NAME = "task" }} }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.write_file(cwd, '.env', 'GREETING=hey\nNAME=dotenv\n')
+
+        _, stdout, _ = self.run_task('greet', cwd=cwd)
+        self.assertSubstr('hey settings', stdout)
+
+        _, stdout, _ = self.run_task('greet_override', cwd=cwd)
+        self.assertSubstr('hey task', stdout)
+
+    def test_exiting_with_code_1_if_env_file_is_missing(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            greet = {{ cmd = "{PRINT_ENV_COMMAND}", env_file = "missing.env" }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('missing.env does not exist', stdout)
+        self.assertEqual(exit_code, 1)
+
+    def test_reject_task_with_malformed_env(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { cmd = "echo hello", env = ["GREETING=hello"] }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('task\'s "env" arg has to be a table of strings', stdout)
+        self.assertEqual(exit_code, 1)
+
+    def test_reject_malformed_env_setting(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            env = "GREETING=hello"
+
+            [tool.taskipy.tasks]
+            greet = "echo hello"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('invalid value: env is not a table of strings. please check [tool.taskipy.settings.env]', stdout)
+        self.assertEqual(exit_code, 1)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+from os import path
+
+from taskipy.history import INSERT_RUN, SCHEMA
+from tests.test_taskipy import TaskipyTestCase
+
+
+class RunHistoryTestCase(TaskipyTestCase):
+    def get_recorded_runs(self, cwd: str):
+        db_path = path.join(cwd, '.taskipy_cache', 'history.sqlite3')
+        with sqlite3.connect(db_path) as connection:
+            return connection.execute('SELECT task, duration, exit_code, peak_rss FROM runs ORDER BY id').fetchall()
+
+    def test_recording_every_run_of_a_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+            fail = "exit 3"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('ok', cwd=cwd)
+        self.run_task('fail', cwd=cwd)
+
+        runs = self.get_recorded_runs(cwd)
+
+        self.assertEqual([(task, exit_code) for task, _, exit_code, _ in runs], [('ok', 0), ('fail', 3)])
+        self.assertTrue(all(duration >= 0 for _, duration, _, _ in runs))
+
+    def test_recording_pre_and_post_tasks_separately(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            pre_build = "echo pre"
+            build = "echo build"
+            post_build = "echo post"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('build', cwd=cwd)
+
+        runs = self.get_recorded_runs(cwd)
+
+        self.assertEqual([task for task, _, _, _ in runs], ['pre_build', 'build', 'post_build'])
+
+    def test_showing_stats_of_all_tasks(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+            flaky = "exit 1"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        for _ in range(3):
+            self.run_task('ok', cwd=cwd)
+        self.run_task('flaky', cwd=cwd)
+
+        exit_code, stdout, _ = self.run_task('--stats', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertRegex(stdout, r'ok\s+3\s+\S+s\s+\S+s\s+0\.0%')
+        self.assertRegex(stdout, r'flaky\s+1\s+-\s+-\s+100\.0%')
+
+    def test_showing_recent_runs_of_a_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('ok', cwd=cwd)
+
+        exit_code, stdout, _ = self.run_task('--stats', ['ok'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('recent runs of "ok"', stdout)
+        self.assertSubstr('exit code 0', stdout)
+
+    def test_showing_message_if_nothing_was_recorded(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+
+        exit_code, stdout, _ = self.run_task('--stats', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('no runs were recorded yet', stdout)
+
+
+class PerformanceRegressionTestCase(TaskipyTestCase):
+    def seed_history(self, cwd: str, task_name: str, durations):
+        os.makedirs(path.join(cwd, '.taskipy_cache'), exist_ok=True)
+        with sqlite3.connect(path.join(cwd, '.taskipy_cache', 'history.sqlite3')) as connection:
+            connection.executescript(SCHEMA)
+            connection.executemany(INSERT_RUN, [(task_name, '', 0, duration, 0, None, None) for duration in durations])
+
+    def test_warning_about_task_much_slower_than_its_recent_runs(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            slow = "sleep 0.8"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.seed_history(cwd, 'slow', [0.05] * 10)
+
+        exit_code, _, stderr = self.run_task('slow', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('warning: task "slow" took', stderr)
+        self.assertSubstr('over the last 10 successful runs', stderr)
+
+    def test_not_warning_without_enough_recorded_runs(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            slow = "sleep 0.8"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.seed_history(cwd, 'slow', [0.05] * 2)
+
+        _, _, stderr = self.run_task('slow', cwd=cwd)
+
+        self.assertNotIn('warning', stderr)
+
+    def test_respecting_regression_threshold_setting(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            regression_threshold = 1000
+
+            [tool.taskipy.tasks]
+            slow = "sleep 0.8"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.seed_history(cwd, 'slow', [0.2] * 10)
+
+        _, _, stderr = self.run_task('slow', cwd=cwd)
+
+        self.assertNotIn('warning', stderr)
+
+    def test_failing_on_regression_when_asked_to(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            slow = "sleep 0.8"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.seed_history(cwd, 'slow', [0.05] * 10)
+
+        exit_code, stdout, _ = self.run_task('--fail-on-regression', ['slow'], cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('failing because of performance regressions in "slow"', stdout)
+
+    def test_exiting_with_code_1_if_regression_threshold_is_invalid(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            regression_threshold = "fast"
+
+            [tool.taskipy.tasks]
+            slow = "sleep 0.8"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.seed_history(cwd, 'slow', [0.05] * 10)
+
+        exit_code, stdout, _ = self.run_task('slow', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('regression_threshold is not a positive number or false', stdout)
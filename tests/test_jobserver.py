@@ -0,0 +1,93 @@
+import os
+import platform
+import subprocess
+import unittest
+from os import path
+from typing import List, Tuple
+
+from tests.test_taskipy import TaskipyTestCase
+
+RECORD_SCRIPT = '''
+import sys
+import time
+
+with open(sys.argv[1], 'a') as f:
+    f.write(f'start {time.time()}\\n')
+time.sleep(0.5)
+with open(sys.argv[1], 'a') as f:
+    f.write(f'end {time.time()}\\n')
+'''
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'jobservers are only supported on posix systems')
+class JobServerTestCase(TaskipyTestCase):
+    def create_workspace(self, package_count: int) -> str:
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            outer = "cd packages && {self.taskipy_executable_path()} --workspace --jobs 8 record"
+            print_makeflags = "python -c \\"import os; print(os.environ.get('MAKEFLAGS'))\\""
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        with open(path.join(cwd, 'record.py'), 'w', encoding='utf-8') as f:
+            f.write(RECORD_SCRIPT)
+
+        for index in range(package_count):
+            package_dir = path.join(cwd, 'packages', f'package_{index}')
+            os.makedirs(package_dir)
+            with open(path.join(package_dir, 'pyproject.toml'), 'w', encoding='utf-8') as f:
+                f.write('[tool.taskipy.tasks]\nrecord = "python ../../record.py ../../events.log"\n')
+
+        return cwd
+
+    def max_concurrency(self, cwd: str) -> int:
+        events: List[Tuple[float, int]] = []
+        with open(path.join(cwd, 'events.log'), 'r', encoding='utf-8') as f:
+            for line in f:
+                kind, timestamp = line.split()
+                events.append((float(timestamp), 1 if kind == 'start' else -1))
+
+        concurrency = max_concurrency = 0
+        for _, change in sorted(events):
+            concurrency += change
+            max_concurrency = max(max_concurrency, concurrency)
+
+        return max_concurrency
+
+    def test_nested_runs_share_the_jobs_limit(self):
+        cwd = self.create_workspace(package_count=4)
+        exit_code, _, _ = self.run_task('-j', ['2', 'outer'], cwd=cwd)
+
+        self.assertEqual(self.max_concurrency(cwd), 2)
+        self.assertEqual(exit_code, 0)
+
+    def test_nested_runs_finish_without_spare_tokens(self):
+        cwd = self.create_workspace(package_count=2)
+        process = self.start_taskipy_process('-j', ['1', 'outer'], cwd=cwd)
+        try:
+            process.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            self.fail('the nested run waited for a jobserver token forever')
+
+        self.assertEqual(self.max_concurrency(cwd), 1)
+        self.assertEqual(process.returncode, 0)
+
+    def test_nested_runs_without_jobserver_use_their_own_limit(self):
+        cwd = self.create_workspace(package_count=4)
+        exit_code, _, _ = self.run_task('outer', cwd=cwd)
+
+        self.assertEqual(self.max_concurrency(cwd), 4)
+        self.assertEqual(exit_code, 0)
+
+    def test_jobserver_is_passed_to_tasks_through_makeflags(self):
+        cwd = self.create_workspace(package_count=0)
+        _, stdout, _ = self.run_task('-j', ['3', 'print_makeflags'], cwd=cwd, env={'MAKEFLAGS': ''})
+
+        self.assertRegex(stdout, r'-j3 --jobserver-auth=\d+,\d+')
+
+    def test_makeflags_are_left_alone_without_jobs_limit(self):
+        cwd = self.create_workspace(package_count=0)
+        _, stdout, _ = self.run_task('print_makeflags', cwd=cwd, env={'MAKEFLAGS': 'k'})
+
+        self.assertEqual(stdout.strip(), 'k')
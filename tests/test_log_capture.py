@@ -0,0 +1,94 @@
+import glob
+import gzip
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+PRINT_LINES_AND_FAIL_COMMAND = 'python -c \\"import sys; print(chr(10).join(f\'line {i}\' for i in range(5000))); sys.exit(3)\\"'
+
+
+class LogCaptureTestCase(TaskipyTestCase):
+    def get_logs(self, cwd: str, task_name: str):
+        return sorted(glob.glob(path.join(cwd, '.taskipy_cache', 'logs', task_name, '*.log.gz')))
+
+    def test_logging_task_output_to_gzipped_file(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { cmd = "echo hello && echo oops 1>&2", log = true }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('hello', stdout)
+
+        log, = self.get_logs(cwd, 'greet')
+        with gzip.open(log, 'rt') as f:
+            self.assertEqual(sorted(f.read().split()), ['hello', 'oops'])
+
+    def test_keeping_errors_on_stderr_while_logging(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { cmd = "echo hello && echo oops 1>&2", log = true }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        _, stdout, stderr = self.run_task('greet', cwd=cwd)
+
+        self.assertSubstr('oops', stderr)
+        self.assertNotSubstr('oops', stdout)
+
+    def test_printing_tail_of_failed_task_at_end_of_run(self):
+        py_project_toml = f'''
+            [tool.taskipy.settings]
+            log = true
+            log_tail_kb = 1
+
+            [tool.taskipy.tasks]
+            test = "{PRINT_LINES_AND_FAIL_COMMAND}"
+            post_test = "echo cleanup"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+        self.assertSubstr('"test" failed with exit code 3, full log at', stderr)
+        self.assertSubstr('line 4999', stderr)
+        self.assertNotIn('line 4000', stderr)
+
+        log, = self.get_logs(cwd, 'test')
+        with gzip.open(log, 'rt') as f:
+            self.assertEqual(len(f.read().splitlines()), 5000)
+
+    def test_printing_tail_of_failed_shard_only(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo shard $TASKIPY_SHARD_INDEX && exit $TASKIPY_SHARD_INDEX", shards = 2, log = true }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(sorted(stdout.splitlines()), ['shard 0', 'shard 1'])
+        self.assertSubstr('its output ended with:\\nshard 1', stderr)
+        self.assertNotIn('ended with:\\nshard 0', stderr)
+
+    def test_keeping_a_bounded_number_of_logs_per_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = { cmd = "echo hello", log = true }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        for _ in range(22):
+            self.run_task('greet', cwd=cwd)
+
+        self.assertEqual(len(self.get_logs(cwd, 'greet')), 20)
+
+    def test_not_logging_by_default(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            greet = "echo hello"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('greet', cwd=cwd)
+
+        self.assertFalse(path.exists(path.join(cwd, '.taskipy_cache', 'logs')))
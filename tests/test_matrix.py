@@ -0,0 +1,96 @@
+import time
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class TaskMatrixTestCase(TaskipyTestCase):
+    def test_running_task_for_every_combination_of_matrix(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo py={py} db={db}", matrix = { py = ["3.9", "3.11"], db = ["sqlite", "pg"] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(stdout.splitlines()),
+            ['py=3.11 db=pg', 'py=3.11 db=sqlite', 'py=3.9 db=pg', 'py=3.9 db=sqlite'],
+        )
+        self.assertSubstr('ran "test" in 4 matrix combinations, 0 failed', stderr)
+
+    def test_skipping_excluded_combinations(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks.test]
+            cmd = "echo py={py} db={db}"
+            matrix = { py = ["3.9", "3.11"], db = ["sqlite", "pg"], exclude = [{ py = "3.9", db = "pg" }, { db = "sqlite", py = "3.11" }] }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['py=3.11 db=pg', 'py=3.9 db=sqlite'])
+
+    def test_matrix_values_are_formatted_along_with_variables(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            use_vars = true
+
+            [tool.taskipy.variables]
+            greeting = "hello"
+
+            [tool.taskipy.tasks]
+            greet = { cmd = "echo {greeting} {name}", matrix = { name = ["alice", "bob"] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('greet', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['hello alice', 'hello bob'])
+
+    def test_running_combinations_concurrently(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep {seconds}", matrix = { seconds = [1, 1, 1] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        started_at = time.perf_counter()
+        exit_code, _, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertLess(time.perf_counter() - started_at, 2.5)
+
+    def test_limiting_combinations_that_run_concurrently(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep {seconds}", matrix = { seconds = [0.5, 0.5] }, max_parallel = 1 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        started_at = time.perf_counter()
+        exit_code, _, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertGreaterEqual(time.perf_counter() - started_at, 1)
+
+    def test_exiting_with_exit_code_of_failed_combination(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "exit {code}", matrix = { code = [0, 4] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 4)
+        self.assertSubstr('ran "test" in 2 matrix combinations, 1 failed', stderr)
+        self.assertSubstr('test[code=4] (exit code 4)', stderr)
+
+    def test_exiting_with_code_1_if_matrix_is_malformed(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo {py}", matrix = { py = "3.9" } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('"matrix.py" arg has to be a non-empty list', stdout)
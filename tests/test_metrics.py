@@ -0,0 +1,62 @@
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class MetricsFileTestCase(TaskipyTestCase):
+    def read_metrics(self, cwd: str):
+        with open(path.join(cwd, 'metrics', 'taskipy.prom'), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_exporting_duration_histogram_and_outcomes_of_every_task(self):
+        py_project_toml = '''
+            [tool.poetry]
+            name = "my-project"
+
+            [tool.taskipy.settings]
+            metrics_file = "metrics/taskipy.prom"
+
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+            fail = "exit 3"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('ok', cwd=cwd)
+        self.run_task('ok', cwd=cwd)
+        self.run_task('fail', cwd=cwd)
+
+        metrics = self.read_metrics(cwd)
+
+        self.assertSubstr('# TYPE taskipy_task_duration_seconds histogram', metrics)
+        self.assertSubstr('taskipy_task_duration_seconds_bucket{project="my-project",task="ok",le="+Inf"} 2\n', metrics)
+        self.assertSubstr('taskipy_task_duration_seconds_bucket{project="my-project",task="ok",le="3600"} 2\n', metrics)
+        self.assertSubstr('taskipy_task_duration_seconds_count{project="my-project",task="fail"} 1\n', metrics)
+        self.assertSubstr('taskipy_task_runs_total{project="my-project",task="ok"} 2\n', metrics)
+        self.assertSubstr('taskipy_task_failures_total{project="my-project",task="fail"} 1\n', metrics)
+        self.assertSubstr('taskipy_task_last_exit_code{project="my-project",task="fail"} 3\n', metrics)
+        self.assertSubstr('taskipy_task_last_run_timestamp_seconds{project="my-project",task="ok"}', metrics)
+
+    def test_warning_without_failing_the_run_if_metrics_cannot_be_written(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            metrics_file = "pyproject.toml/taskipy.prom"
+
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('ok', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'ok\n')
+        self.assertSubstr('warning: could not export metrics to', stderr)
+
+    def test_not_exporting_metrics_unless_configured(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('ok', cwd=cwd)
+
+        self.assertFalse(path.exists(path.join(cwd, 'metrics')))
@@ -0,0 +1,58 @@
+import json
+import os
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class TaskPlanTestCase(TaskipyTestCase):
+    def test_printing_plan_of_task_with_hooks_without_running_it(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            env = { STAGE = "ci" }
+
+            [tool.taskipy.tasks]
+            pre_test = "echo pre"
+            test = { cmd = "touch ran && pytest", retries = 2 }
+            post_test = "echo post"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('--plan', ['test', '-x'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertFalse(path.exists(path.join(cwd, 'ran')))
+
+        plan = json.loads(stdout)
+        self.assertEqual(plan['task'], 'test')
+        self.assertEqual(
+            [[(step['task'], step['command']) for step in stage['steps']] for stage in plan['stages']],
+            [[('pre_test', 'echo pre')], [('test', 'touch ran && pytest -x')], [('post_test', 'echo post')]],
+        )
+        main_step = plan['stages'][1]['steps'][0]
+        self.assertEqual(main_step['cwd'], os.path.realpath(cwd))
+        self.assertEqual(main_step['env'], {'STAGE': 'ci'})
+        self.assertEqual(main_step['retries'], 2)
+
+    def test_printing_matrix_combinations_as_parallel_stage(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo {py}", matrix = { py = ["3.9", "3.11"] }, max_parallel = 1 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('--plan', ['test'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        stage, = json.loads(stdout)['stages']
+        self.assertTrue(stage['parallel'])
+        self.assertEqual(stage['max_parallel'], 1)
+        self.assertEqual([step['command'] for step in stage['steps']], ['echo 3.9', 'echo 3.11'])
+
+    def test_exiting_with_code_127_if_planned_task_does_not_exist(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = "echo test"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, _ = self.run_task('--plan', ['missing'], cwd=cwd)
+
+        self.assertEqual(exit_code, 127)
@@ -0,0 +1,63 @@
+import platform
+import unittest
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class ProcessPriorityTestCase(TaskipyTestCase):
+    def test_running_task_with_nice(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_nice = { cmd = "python -c \\"import psutil; print('nice', psutil.Process().nice())\\"", nice = 19 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('print_nice', cwd=cwd)
+
+        self.assertSubstr('nice 19', stdout)
+        self.assertEqual(exit_code, 0)
+
+    @unittest.skipIf(platform.system() != 'Linux', 'io scheduling classes are only supported on linux')
+    def test_running_task_with_ionice(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_ionice = { cmd = "python -c \\"import psutil; print('ioclass', int(psutil.Process().ionice().ioclass))\\"", ionice = "idle" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('print_ionice', cwd=cwd)
+
+        self.assertSubstr('ioclass 3', stdout)
+        self.assertEqual(exit_code, 0)
+
+    @unittest.skipIf(platform.system() != 'Linux', 'cpu affinity is checked with os.sched_getaffinity, which is linux only')
+    def test_running_task_with_cpu_affinity(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_affinity = { cmd = "python -c \\"import os; print('cpus', sorted(os.sched_getaffinity(0)))\\"", cpu_affinity = [0] }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('print_affinity', cwd=cwd)
+
+        self.assertSubstr('cpus [0]', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_reject_task_with_malformed_nice(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_nice = { cmd = "echo hello", nice = 40 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('print_nice', cwd=cwd)
+
+        self.assertSubstr('task\'s "nice" arg has to be an int between -20 and 19', stdout)
+        self.assertEqual(exit_code, 1)
+
+    def test_reject_task_with_unknown_ionice_class(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_ionice = { cmd = "echo hello", ionice = "lowest" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('print_ionice', cwd=cwd)
+
+        self.assertSubstr('task\'s "ionice" arg has to be one of idle, best-effort, realtime', stdout)
+        self.assertEqual(exit_code, 1)
@@ -0,0 +1,77 @@
+import os
+import platform
+import subprocess
+import unittest
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'pseudo terminals are only supported on posix systems')
+class ProgressDisplayTestCase(TaskipyTestCase):
+    def run_task_in_terminal(self, task: str, cwd: str):
+        """runs the task with stderr connected to a pseudo terminal, and returns its exit code, stdout and what it drew on the terminal"""
+        import pty  # pylint: disable=C0415
+
+        master_fd, slave_fd = pty.openpty()
+        process = subprocess.Popen(
+            [self.taskipy_executable_path(), task],
+            stdout=subprocess.PIPE,
+            stderr=slave_fd,
+            cwd=cwd,
+            env=dict(os.environ, TERM='xterm'),
+        )
+        os.close(slave_fd)
+
+        terminal = b''
+        while True:
+            try:
+                data = os.read(master_fd, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            terminal += data
+        os.close(master_fd)
+
+        stdout, _ = process.communicate(timeout=30)
+        return process.returncode, stdout.decode(), terminal.decode()
+
+    def test_showing_running_jobs_at_the_bottom_of_the_terminal(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep 1 && echo {n}", matrix = { n = [1, 2] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, terminal = self.run_task_in_terminal('test', cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['1', '2'])
+        self.assertSubstr('test[n=1]', terminal)
+        self.assertSubstr('test: 2 running, 0 waiting, 0 done', terminal)
+        # the view is erased once the run is over, before the summary is printed
+        self.assertTrue(terminal.rstrip().endswith('ran "test" in 2 matrix combinations, 0 failed'))
+
+    def test_not_showing_progress_if_disabled_in_settings(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            progress = false
+
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep 1", matrix = { n = [1, 2] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, terminal = self.run_task_in_terminal('test', cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertNotIn('running', terminal)
+
+    def test_not_showing_progress_if_stderr_is_not_a_terminal(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep 1", matrix = { n = [1, 2] } }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertNotIn('running', stderr)
@@ -0,0 +1,62 @@
+import os
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class InheritedPyProjectPathTestCase(TaskipyTestCase):
+    def test_nested_task_uses_pyproject_of_parent_run(self):
+        cwd = self.create_test_dir_with_py_project_toml('')
+        with open(path.join(cwd, 'other.toml'), 'w', encoding='utf-8') as f:
+            f.write('[tool.taskipy.tasks]\nhello = "echo hello from inherited file"\n')
+
+        exit_code, stdout, _ = self.run_task('hello', cwd=cwd, env={'TASKIPY_PYPROJECT': path.join(cwd, 'other.toml')})
+
+        self.assertSubstr('hello from inherited file', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_inherited_pyproject_is_ignored_outside_of_its_dir(self):
+        cwd = self.create_test_dir_from_fixture('project_with_tasks_from_child')
+        inherited_path = path.join(cwd, 'child_with_pyproject', 'pyproject.toml')
+
+        _, stdout, _ = self.run_task('print_current_dir_name', cwd=path.join(cwd, 'child_without_pyproject'), env={'TASKIPY_PYPROJECT': inherited_path})
+
+        self.assertSubstr('child_without_pyproject', stdout)
+
+    def test_closer_pyproject_takes_precedence_over_inherited_one(self):
+        cwd = self.create_test_dir_from_fixture('project_with_tasks_from_child')
+        inherited_path = path.join(cwd, 'pyproject.toml')
+
+        _, stdout, _ = self.run_task('hello', cwd=path.join(cwd, 'child_with_pyproject'), env={'TASKIPY_PYPROJECT': inherited_path})
+
+        self.assertSubstr('hello from child', stdout)
+
+    def test_nested_task_in_child_project_runs_child_task(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            hello = "echo hello from parent"
+            nested = "cd child && {self.taskipy_executable_path()} hello"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.create_child_project(cwd, 'child', '[tool.taskipy.tasks]\nhello = "echo hello from child"\n')
+
+        exit_code, stdout, _ = self.run_task('nested', cwd=cwd)
+
+        self.assertSubstr('hello from child', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_nested_task_sees_pyproject_path(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            print_env = "python -c \\"import os; print(os.environ['TASKIPY_PYPROJECT'])\\""
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        _, stdout, _ = self.run_task('print_env', cwd=cwd)
+
+        self.assertEqual(path.realpath(stdout.strip()), path.realpath(path.join(cwd, 'pyproject.toml')))
+
+    def create_child_project(self, cwd: str, name: str, py_project_toml: str):
+        child_dir = path.join(cwd, name)
+        os.makedirs(child_dir)
+        with open(path.join(child_dir, 'pyproject.toml'), 'w', encoding='utf-8') as f:
+            f.write(py_project_toml)
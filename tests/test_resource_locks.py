@@ -0,0 +1,85 @@
+import platform
+import unittest
+from os import path
+from typing import List
+
+from tests.test_taskipy import TaskipyTestCase
+
+RECORD_COMMAND = "sh -c 'echo start >> events.log && sleep 0.3 && echo end >> events.log'"
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'the recorded commands use sh')
+class ResourceLocksTestCase(TaskipyTestCase):
+    def read_events(self, cwd: str) -> List[str]:
+        with open(path.join(cwd, 'events.log'), 'r', encoding='utf-8') as f:
+            return f.read().split()
+
+    def max_running_at_once(self, events: List[str]) -> int:
+        running = most_running = 0
+        for event in events:
+            running += 1 if event == 'start' else -1
+            most_running = max(most_running, running)
+        return most_running
+
+    def test_running_tasks_that_share_a_lock_one_at_a_time(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            test = {{ cmd = "{RECORD_COMMAND} {{n}}", matrix = {{ n = [1, 2, 3] }}, locks = ["db"] }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.read_events(cwd), ['start', 'end'] * 3)
+
+    def test_sharing_locks_between_taskipy_processes(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            migrate = {{ cmd = "{RECORD_COMMAND}", locks = ["db"] }}
+            seed = {{ cmd = "{RECORD_COMMAND}", locks = ["db", "cache"] }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        processes = [self.start_taskipy_process(task, cwd=cwd) for task in ['migrate', 'seed', 'migrate']]
+        exit_codes = [process.wait(timeout=30) for process in processes]
+        for process in processes:
+            process.stdout.close()
+            process.stderr.close()
+
+        self.assertEqual(exit_codes, [0, 0, 0])
+        self.assertEqual(self.read_events(cwd), ['start', 'end'] * 3)
+
+    def test_limiting_how_many_tasks_of_a_concurrency_group_run_at_once(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            train = {{ cmd = "{RECORD_COMMAND} {{n}}", matrix = {{ n = [1, 2, 3, 4] }}, concurrency_group = {{ name = "gpu", max = 2 }} }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('train', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.max_running_at_once(self.read_events(cwd)), 2)
+        self.assertSubstr('is waiting for a free slot of concurrency group "gpu"', stderr)
+
+    def test_not_waiting_for_locks_that_the_parent_run_holds(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            outer = {{ cmd = "{self.taskipy_executable_path()} inner", locks = ["db"] }}
+            inner = {{ cmd = "echo inner", locks = ["db"] }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        process = self.start_taskipy_process('outer', cwd=cwd)
+        stdout, _ = process.communicate(timeout=30)
+
+        self.assertEqual(process.returncode, 0)
+        self.assertSubstr('inner', stdout.decode())
+
+    def test_exiting_with_code_1_if_locks_are_malformed(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo", locks = "db" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('"locks" arg has to be a list of names', stdout)
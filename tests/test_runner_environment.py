@@ -0,0 +1,114 @@
+import os
+import stat
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+FAKE_RUNNER = '''#!/bin/sh
+echo run >> runner_calls.log
+export FAKE_VENV=active
+export PATH="/opt/fake-venv/bin:$PATH"
+exec "$@"
+'''
+
+
+class RunnerEnvironmentTestCase(TaskipyTestCase):
+    def create_project(self, py_project_toml: str) -> str:
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        runner_path = path.join(cwd, 'fake_runner')
+        with open(runner_path, 'w', encoding='utf-8') as f:
+            f.write(FAKE_RUNNER)
+        os.chmod(runner_path, os.stat(runner_path).st_mode | stat.S_IEXEC)
+        return cwd
+
+    def count_runner_calls(self, cwd: str) -> int:
+        with open(path.join(cwd, 'runner_calls.log'), 'r', encoding='utf-8') as f:
+            return len(f.readlines())
+
+    def test_running_runner_once_and_reusing_its_environment(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            runner = "./fake_runner"
+            cache_runner_env = true
+
+            [tool.taskipy.tasks]
+            pre_show = "echo pre"
+            show = "echo venv=$FAKE_VENV path=$PATH"
+            post_show = "echo post"
+        '''
+        cwd = self.create_project(py_project_toml)
+        _, first_stdout, _ = self.run_task('show', cwd=cwd)
+        _, second_stdout, _ = self.run_task('show', cwd=cwd)
+
+        self.assertEqual(self.count_runner_calls(cwd), 1)
+        for stdout in [first_stdout, second_stdout]:
+            self.assertSubstr('venv=active path=/opt/fake-venv/bin:', stdout)
+            self.assertSubstr('pre', stdout)
+            self.assertSubstr('post', stdout)
+
+    def test_resolving_environment_again_when_lock_file_changes(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            runner = "./fake_runner"
+            cache_runner_env = true
+
+            [tool.taskipy.tasks]
+            show = "echo venv=$FAKE_VENV"
+        '''
+        cwd = self.create_project(py_project_toml)
+        self.run_task('show', cwd=cwd)
+        with open(path.join(cwd, 'poetry.lock'), 'w', encoding='utf-8') as f:
+            f.write('# locked\n')
+        _, stdout, _ = self.run_task('show', cwd=cwd)
+
+        self.assertEqual(self.count_runner_calls(cwd), 2)
+        self.assertSubstr('venv=active', stdout)
+
+    def test_resolving_environment_again_when_run_from_another_virtualenv(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            runner = "./fake_runner"
+            cache_runner_env = true
+
+            [tool.taskipy.tasks]
+            show = "echo venv=$FAKE_VENV"
+        '''
+        cwd = self.create_project(py_project_toml)
+        self.run_task('show', cwd=cwd, env={'FAKE_VENV': 'active', 'VIRTUAL_ENV': path.join(cwd, '.venv')})
+        _, stdout, _ = self.run_task('show', cwd=cwd)
+
+        self.assertEqual(self.count_runner_calls(cwd), 2)
+        self.assertSubstr('venv=active', stdout)
+
+    def test_running_runner_for_every_command_by_default(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            runner = "./fake_runner"
+
+            [tool.taskipy.tasks]
+            pre_show = "echo pre"
+            show = "sh -c 'echo venv=$FAKE_VENV'"
+        '''
+        cwd = self.create_project(py_project_toml)
+        _, stdout, _ = self.run_task('show', cwd=cwd)
+
+        self.assertEqual(self.count_runner_calls(cwd), 2)
+        self.assertSubstr('venv=active', stdout)
+
+    def test_prefixing_commands_when_runner_environment_cannot_be_resolved(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            runner = "./fake_runner"
+            cache_runner_env = true
+
+            [tool.taskipy.tasks]
+            show = "sh -c 'echo venv=$FAKE_VENV'"
+        '''
+        cwd = self.create_project(py_project_toml)
+        with open(path.join(cwd, 'fake_runner'), 'w', encoding='utf-8') as f:
+            f.write(FAKE_RUNNER.replace('exec', '[ "$1" = python ] && exit 1\nexec'))
+        exit_code, stdout, stderr = self.run_task('show', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('could not resolve the environment of runner "./fake_runner"', stderr)
+        self.assertSubstr('venv=active', stdout)
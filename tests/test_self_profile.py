@@ -0,0 +1,59 @@
+import glob
+import pstats
+import subprocess
+import sys
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+# the modules of features that a plain run of a shell command doesn't use, and mustn't spend its startup importing.
+# the history, and the regressions checked against it, are left out, since they are only used once the command is done
+FEATURE_MODULES = [
+    'taskipy.agent', 'taskipy.call', 'taskipy.list', 'taskipy.log_capture', 'taskipy.matrix', 'taskipy.metrics', 'taskipy.parallel',
+    'taskipy.progress', 'taskipy.resource_locks', 'taskipy.runner_environment', 'taskipy.self_profile', 'taskipy.shards',
+    'taskipy.stats', 'taskipy.task_profile', 'taskipy.tracing', 'taskipy.worker_pool', 'taskipy.workspace',
+]
+
+
+class SelfProfileTestCase(TaskipyTestCase):
+    def test_profiling_taskipy_while_it_runs_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            nap = "python -c \\"import time; time.sleep(0.3); print('rested')\\""
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('--profile-self', ['nap'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('rested', stdout)
+        for part in ['importing taskipy', 'toml parsing', 'task construction', 'signal setup', 'taskipy in total', 'waiting for tasks']:
+            self.assertSubstr(part, stderr)
+
+        profile, = glob.glob(path.join(cwd, '.taskipy_cache', 'profiles', 'self-*.pstats'))
+        stats = pstats.Stats(profile)
+        self.assertTrue(any(function_name == 'wait_for_process' for _, _, function_name in stats.stats))  # type: ignore
+
+    def test_keeping_exit_code_of_profiled_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            fail = "exit 4"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('--profile-self', ['fail'], cwd=cwd)
+
+        self.assertEqual(exit_code, 4)
+        self.assertSubstr('taskipy profile:', stderr)
+
+    def test_not_importing_unused_features_when_running_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            ok = "echo ok"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        script = 'import sys; from taskipy.cli import run; run(["ok"]); print(" ".join(sys.modules))'
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=cwd).decode()
+        imported_modules = output.split()
+
+        self.assertIn('taskipy.task_runner', imported_modules)
+        self.assertEqual([module for module in FEATURE_MODULES if module in imported_modules], [])
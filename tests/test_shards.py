@@ -0,0 +1,111 @@
+import os
+import time
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+PRINT_SHARD_COMMAND = 'python -c \\"import os; print(\'shard\', os.environ[\'TASKIPY_SHARD_INDEX\'], \'of\', os.environ[\'TASKIPY_SHARD_COUNT\'])\\"'
+
+
+class TaskShardsTestCase(TaskipyTestCase):
+    def write_files(self, cwd: str, sizes):
+        for name, size in sizes.items():
+            file_path = path.join(cwd, name)
+            os.makedirs(path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('x' * size)
+
+    def test_running_a_copy_of_the_task_for_every_shard(self):
+        py_project_toml = f'''
+            [tool.taskipy.tasks]
+            test = {{ cmd = "{PRINT_SHARD_COMMAND}", shards = 3 }}
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['shard 0 of 3', 'shard 1 of 3', 'shard 2 of 3'])
+        self.assertSubstr('ran "test" in 3 shards, 0 failed', stderr)
+
+    def test_running_shards_concurrently(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep 1", shards = 3 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        started_at = time.perf_counter()
+        exit_code, _, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertLess(time.perf_counter() - started_at, 2.5)
+
+    def test_splitting_files_between_shards_by_size(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo files: {shard_files}", shards = 2, shard_files = "tests/test_*.py" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.write_files(cwd, {
+            'tests/test_big.py': 300,
+            'tests/test_medium.py': 200,
+            'tests/test_small.py': 100,
+            'tests/helpers.py': 1000,
+        })
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(stdout.splitlines()),
+            ['files: tests/test_big.py', 'files: tests/test_medium.py tests/test_small.py'],
+        )
+
+    def test_skipping_shards_without_files(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo files: {shard_files}", shards = 4, shard_files = ["a/*.py", "b/*.py"] }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.write_files(cwd, {'a/one.py': 10, 'b/two.py': 10})
+        exit_code, stdout, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['files: a/one.py', 'files: b/two.py'])
+        self.assertSubstr('ran "test" in 2 shards, 0 failed', stderr)
+
+    def test_shard_files_work_along_with_variables(self):
+        py_project_toml = '''
+            [tool.taskipy.variables]
+            runner = "echo running"
+
+            [tool.taskipy.tasks]
+            test = { cmd = "{runner} {shard_files}", shards = 1, shard_files = "*.py", use_vars = true }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.write_files(cwd, {'one.py': 10})
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('running one.py', stdout)
+
+    def test_exiting_with_exit_code_of_failed_shard(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "exit $((TASKIPY_SHARD_INDEX * 3))", shards = 2 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+        self.assertSubstr('ran "test" in 2 shards, 1 failed', stderr)
+        self.assertSubstr('shard 1 (exit code 3)', stderr)
+
+    def test_exiting_with_code_1_if_shards_is_invalid(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "echo test", shards = 0 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('test', cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('"shards" arg has to be a positive int', stdout)
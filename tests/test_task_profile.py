@@ -0,0 +1,82 @@
+import glob
+import pstats
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+SCRIPT = '''
+import subprocess
+import sys
+
+
+def count_slowly():
+    return sum(range(100000))
+
+
+def main():
+    print(count_slowly())
+    subprocess.run([sys.executable, '-c', 'import helper; helper.greet()'], check=True)
+
+
+if __name__ == '__main__':
+    main()
+'''
+HELPER = '''
+def greet():
+    print('hello from helper')
+'''
+
+
+class TaskProfileTestCase(TaskipyTestCase):
+    def create_project(self, py_project_toml: str) -> str:
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        with open(path.join(cwd, 'script.py'), 'w', encoding='utf-8') as f:
+            f.write(SCRIPT)
+        with open(path.join(cwd, 'helper.py'), 'w', encoding='utf-8') as f:
+            f.write(HELPER)
+        return cwd
+
+    def get_combined_profile(self, cwd: str):
+        combined, = glob.glob(path.join(cwd, '.taskipy_cache', 'profiles', '*', 'combined.pstats'))
+        return pstats.Stats(combined)
+
+    def test_profiling_every_python_process_of_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            work = { cmd = "python script.py", env = { PYTHONPATH = "." } }
+        '''
+        cwd = self.create_project(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('--profile', ['work'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('hello from helper', stdout)
+        self.assertSubstr('profiled 2 python processes of "work"', stderr)
+
+        function_names = {function_name for _, _, function_name in self.get_combined_profile(cwd).stats}  # type: ignore
+        self.assertIn('count_slowly', function_names)
+        self.assertIn('greet', function_names)
+
+    def test_profiling_call_task(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            work = { call = "script:main", env = { PYTHONPATH = "." } }
+        '''
+        cwd = self.create_project(py_project_toml)
+        exit_code, _, stderr = self.run_task('--profile', ['work'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('profiled 2 python processes of "work"', stderr)
+
+        function_names = {function_name for _, _, function_name in self.get_combined_profile(cwd).stats}  # type: ignore
+        self.assertIn('count_slowly', function_names)
+
+    def test_reporting_task_without_python_processes(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            shell = "echo not python"
+        '''
+        cwd = self.create_project(py_project_toml)
+        exit_code, _, stderr = self.run_task('--profile', ['shell'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertSubstr('no python processes of "shell" were profiled', stderr)
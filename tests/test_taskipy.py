@@ -1,3 +1,4 @@
+import asyncio
 import os
 import platform
 import random
@@ -7,11 +8,13 @@ import time
 import unittest
 import warnings
 from os import path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from parameterized import parameterized  # type: ignore
 import psutil  # type: ignore
 
+import taskipy
+
 from tests.utils.project import (
     GenerateProjectFromFixture,
     GenerateProjectWithPyProjectToml,
@@ -32,9 +35,10 @@ class TaskipyTestCase(unittest.TestCase):
         task: str,
         args: Optional[List[str]] = None,
         cwd=os.curdir,
+        env: Optional[Dict[str, str]] = None,
     ) -> Tuple[int, str, str]:
         args = args or []
-        proc = self.start_taskipy_process(task, args=args, cwd=cwd)
+        proc = self.start_taskipy_process(task, args=args, cwd=cwd, env=env)
         stdout, stderr = proc.communicate()
         return proc.returncode, stdout.decode(), str(stderr)
 
@@ -43,10 +47,15 @@ class TaskipyTestCase(unittest.TestCase):
         task: str,
         args: Optional[List[str]] = None,
         cwd=os.curdir,
+        env: Optional[Dict[str, str]] = None,
     ) -> subprocess.Popen:
-        executable_path = path.abspath('task.bat' if platform.system() == 'Windows' else 'task')
+        executable_path = self.taskipy_executable_path()
         args = args or []
-        return subprocess.Popen([executable_path, task] + args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+        process_env = dict(os.environ, **env) if env is not None else None
+        return subprocess.Popen([executable_path, task] + args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, env=process_env)
+
+    def taskipy_executable_path(self) -> str:
+        return path.abspath('task.bat' if platform.system() == 'Windows' else 'task')
 
     def create_test_dir_from_fixture(self, fixture_name: str):
         project_generator = GenerateProjectFromFixture(path.join('tests', 'fixtures', fixture_name))
@@ -848,3 +857,109 @@ class SetCWDTestCase(TaskipyTestCase):
         exit_code, stdout, _ = self.run_task("pwdsub", cwd=path.join(cwd, "global_cwd"))
         self.assertTrue(stdout.strip().endswith("subfolder"))
         self.assertEqual(exit_code, 0)
+
+
+class TaskRetriesTestCase(TaskipyTestCase):
+    def test_retrying_failed_task_until_it_succeeds(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            flaky = { cmd = "echo attempt >> attempts.txt && test $(wc -l < attempts.txt) -ge 3", retries = 3, retry_backoff = "10ms" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('flaky', cwd=cwd)
+
+        with open(path.join(cwd, 'attempts.txt'), 'r', encoding='utf-8') as f:
+            attempts = f.readlines()
+
+        self.assertEqual(len(attempts), 3)
+        self.assertSubstr('task "flaky" failed with exit code 1, retrying in 0.01s (attempt 2 of 4)', stderr)
+        self.assertSubstr('retrying in 0.02s (attempt 3 of 4)', stderr)
+        self.assertEqual(exit_code, 0)
+
+    def test_giving_up_after_retries_are_exhausted(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            always_fails = { cmd = "echo attempt >> attempts.txt && exit 3", retries = 2 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, _ = self.run_task('always_fails', cwd=cwd)
+
+        with open(path.join(cwd, 'attempts.txt'), 'r', encoding='utf-8') as f:
+            attempts = f.readlines()
+
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(exit_code, 3)
+
+    def test_not_retrying_exit_codes_outside_of_retry_on(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            fails = { cmd = "echo attempt >> attempts.txt && exit 3", retries = 2, retry_on = [1, 2] }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('fails', cwd=cwd)
+
+        with open(path.join(cwd, 'attempts.txt'), 'r', encoding='utf-8') as f:
+            attempts = f.readlines()
+
+        self.assertEqual(len(attempts), 1)
+        self.assertNotSubstr('retrying', stderr)
+        self.assertEqual(exit_code, 3)
+
+    def test_reject_task_with_malformed_retry_backoff(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            fails = { cmd = "exit 1", retries = 2, retry_backoff = "soon" }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('fails', cwd=cwd)
+
+        self.assertSubstr('task\'s "retry_backoff" arg has to be a duration', stdout)
+        self.assertEqual(exit_code, 1)
+
+
+class AsyncApiTestCase(TaskipyTestCase):
+    def run_coroutine(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def test_running_task_and_capturing_its_output(self):
+        cwd = self.create_test_dir_from_fixture('project_with_pyproject_and_tasks')
+        result = self.run_coroutine(taskipy.run_task('print_hello_stdout', cwd=cwd, capture_output=True))
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertSubstr('hello stdout', result.stdout)
+        self.assertGreater(result.duration, 0)
+
+    def test_passing_arguments_and_returning_exit_code(self):
+        cwd = self.create_test_dir_from_fixture('project_with_tasks_that_accept_arguments')
+        result = self.run_coroutine(taskipy.run_task('echo_number', ['42'], cwd=cwd, capture_output=True))
+
+        self.assertSubstr('the number is 42', result.stdout)
+        self.assertTrue(result.succeeded)
+
+    def test_output_is_not_captured_unless_requested(self):
+        cwd = self.create_test_dir_from_fixture('project_with_pyproject_and_tasks')
+        result = self.run_coroutine(taskipy.run_task('exit_17', cwd=cwd))
+
+        self.assertEqual(result.exit_code, 17)
+        self.assertIsNone(result.stdout)
+        self.assertIsNone(result.stderr)
+
+    def test_running_tasks_concurrently(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            slow = "python -c \\"import time; time.sleep(1)\\""
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+
+        async def run_many():
+            return await asyncio.gather(*[taskipy.run_task('slow', cwd=cwd) for _ in range(4)])
+
+        started_at = time.perf_counter()
+        results = self.run_coroutine(run_many())
+
+        self.assertEqual([result.exit_code for result in results], [0, 0, 0, 0])
+        self.assertLess(time.perf_counter() - started_at, 3)
@@ -0,0 +1,118 @@
+import json
+from os import path
+
+from tests.test_taskipy import TaskipyTestCase
+
+TRACEPARENT = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+
+class TracingTestCase(TaskipyTestCase):
+    def read_spans(self, cwd: str):
+        with open(path.join(cwd, 'traces.jsonl'), 'r', encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f]
+
+        return [
+            span
+            for request in requests
+            for resource_spans in request['resourceSpans']
+            for scope_spans in resource_spans['scopeSpans']
+            for span in scope_spans['spans']
+        ]
+
+    def get_span(self, spans, name: str):
+        return next(span for span in spans if span['name'] == name)
+
+    def test_exporting_span_for_run_and_each_hook(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            trace_file = "traces.jsonl"
+
+            [tool.taskipy.tasks]
+            pre_build = "echo pre"
+            build = "exit 2"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('build', cwd=cwd)
+
+        spans = self.read_spans(cwd)
+        root = self.get_span(spans, 'task build')
+        pre_build = self.get_span(spans, 'pre_build')
+        build = self.get_span(spans, 'build')
+
+        self.assertNotIn('parentSpanId', root)
+        self.assertEqual(pre_build['parentSpanId'], root['spanId'])
+        self.assertEqual(build['parentSpanId'], root['spanId'])
+        self.assertEqual({span['traceId'] for span in spans}, {root['traceId']})
+        self.assertEqual(build['status'], {'code': 2})
+        self.assertEqual(pre_build['status'], {'code': 1})
+
+    def test_continuing_trace_of_parent_process_and_nested_runs(self):
+        py_project_toml = f'''
+            [tool.taskipy.settings]
+            trace_file = "traces.jsonl"
+
+            [tool.taskipy.tasks]
+            outer = "{self.taskipy_executable_path()} inner"
+            inner = "echo $TRACEPARENT"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        _, stdout, _ = self.run_task('outer', cwd=cwd, env={'TRACEPARENT': TRACEPARENT})
+
+        spans = self.read_spans(cwd)
+        outer_root = self.get_span(spans, 'task outer')
+        outer = self.get_span(spans, 'outer')
+        inner_root = self.get_span(spans, 'task inner')
+        inner = self.get_span(spans, 'inner')
+
+        self.assertEqual(outer_root['traceId'], '0af7651916cd43dd8448eb211c80319c')
+        self.assertEqual(outer_root['parentSpanId'], 'b7ad6b7169203331')
+        self.assertEqual(inner_root['parentSpanId'], outer['spanId'])
+        self.assertEqual(len({span['traceId'] for span in spans}), 1)
+        self.assertSubstr(f'00-0af7651916cd43dd8448eb211c80319c-{inner["spanId"]}-01', stdout)
+
+    def test_exporting_span_for_each_retry_and_shard(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            trace_file = "traces.jsonl"
+
+            [tool.taskipy.tasks]
+            flaky = { cmd = "exit 1", retries = 1, retry_backoff = 0 }
+            test = { cmd = "echo $TASKIPY_SHARD_INDEX", shards = 2 }
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        self.run_task('flaky', cwd=cwd)
+        self.run_task('test', cwd=cwd)
+
+        spans = self.read_spans(cwd)
+        flaky = self.get_span(spans, 'flaky')
+        test = self.get_span(spans, 'test')
+
+        for name in ['flaky attempt 1', 'flaky attempt 2']:
+            self.assertEqual(self.get_span(spans, name)['parentSpanId'], flaky['spanId'])
+        for name in ['test shard 0', 'test shard 1']:
+            self.assertEqual(self.get_span(spans, name)['parentSpanId'], test['spanId'])
+
+    def test_warning_without_changing_the_exit_code_if_spans_cannot_be_written(self):
+        py_project_toml = '''
+            [tool.taskipy.settings]
+            trace_file = "pyproject.toml/traces.jsonl"
+
+            [tool.taskipy.tasks]
+            build = "exit 3"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, _, stderr = self.run_task('build', cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+        self.assertSubstr('warning: could not export spans to', stderr)
+
+    def test_not_passing_trace_context_unless_tracing(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            show = "echo trace=$TRACEPARENT"
+        '''
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        _, stdout, _ = self.run_task('show', cwd=cwd)
+
+        self.assertSubstr('trace=\n', stdout)
+        self.assertFalse(path.exists(path.join(cwd, 'traces.jsonl')))
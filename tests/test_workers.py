@@ -0,0 +1,155 @@
+import os
+import platform
+import subprocess
+import stat
+import unittest
+from os import path
+from typing import Dict, List, Optional
+from unittest import mock
+
+from tests.test_taskipy import TaskipyTestCase
+
+PACKAGE_PY_PROJECT_TOML = '''
+[tool.taskipy.tasks]
+who = "echo $(basename $PWD) ran on $AGENT_NAME"
+'''
+
+
+@unittest.skipIf(platform.system() == 'Windows', 'the commands sent to the agents use sh')
+class WorkersTestCase(TaskipyTestCase):
+    def setUp(self):
+        super().setUp()
+        self._agents: List[subprocess.Popen] = []
+        # a home of its own, where the agents keep the tokens they generate
+        self._home = self.create_test_dir_with_py_project_toml('')
+        self._environ = mock.patch.dict(os.environ, {'HOME': self._home})
+        self._environ.start()
+
+    def tearDown(self):
+        for agent in self._agents:
+            agent.terminate()
+            agent.wait()
+            agent.stdout.close()
+            agent.stderr.close()
+        self._environ.stop()
+        super().tearDown()
+
+    def start_agent(self, cwd: str, name: str, jobs: int = 1, env: Optional[Dict[str, str]] = None, args: Optional[List[str]] = None) -> str:  # pylint: disable=R0913,R0917
+        """starts an agent on a free port of localhost, and returns its address"""
+        agent = self.start_taskipy_process('--agent', ['127.0.0.1:0', '-j', str(jobs)] + (args or []), cwd=cwd, env=dict(env or {}, AGENT_NAME=name))
+        self._agents.append(agent)
+
+        line = agent.stderr.readline().decode()  # type: ignore
+        self.assertSubstr('taskipy agent listening on', line)
+        return line.split(' on ')[1].split(',')[0]
+
+    def create_checkout(self, packages: List[str]) -> str:
+        cwd = self.create_test_dir_with_py_project_toml('[tool.taskipy.tasks]\nroot = "echo root"\n')
+        os.mkdir(path.join(cwd, '.git'))
+        for package in packages:
+            os.makedirs(path.join(cwd, 'packages', package))
+            with open(path.join(cwd, 'packages', package, 'pyproject.toml'), 'w', encoding='utf-8') as f:
+                f.write(PACKAGE_PY_PROJECT_TOML)
+        return cwd
+
+    def test_running_commands_on_agents_and_streaming_back_their_output(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = { cmd = "sleep 0.5 && echo shard $TASKIPY_SHARD_INDEX ran on $AGENT_NAME", shards = 2 }
+        '''
+        agents = [
+            self.start_agent(self.create_test_dir_with_py_project_toml(py_project_toml), name)
+            for name in ['agent_a', 'agent_b']
+        ]
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, stderr = self.run_task('--workers', [','.join(agents), 'test'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(line.split(' ran on ')[1] for line in stdout.splitlines()), ['agent_a', 'agent_b'])
+        self.assertSubstr('ran "test" in 2 shards, 0 failed', stderr)
+
+    def test_exiting_with_the_exit_code_of_the_command_on_the_agent(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = "echo failing on $AGENT_NAME && exit 3"
+        '''
+        agent = self.start_agent(self.create_test_dir_with_py_project_toml(py_project_toml), 'agent_a')
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('--workers', [agent, 'test'], cwd=cwd)
+
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(stdout, 'failing on agent_a\n')
+
+    def test_running_commands_on_agents_that_have_their_package_checked_out(self):
+        agents = [
+            self.start_agent(self.create_checkout(['one']), 'agent_a', jobs=2),
+            self.start_agent(self.create_checkout(['two']), 'agent_b', jobs=2),
+        ]
+        cwd = self.create_checkout(['one', 'two'])
+        exit_code, stdout, _ = self.run_task('--workers', [','.join(agents), '--workspace', 'who'], cwd=cwd)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(stdout.splitlines()), ['one ran on agent_a', 'two ran on agent_b'])
+
+    def test_failing_if_no_agent_has_the_package_checked_out(self):
+        agent = self.start_agent(self.create_checkout(['one']), 'agent_a')
+        cwd = self.create_checkout(['two'])
+        exit_code, _, stderr = self.run_task('--workers', [agent, '--workspace', 'who'], cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('packages/two: no worker can run the task. reason: none of the workers has \"packages/two\" checked out', stderr)
+
+    def test_refusing_coordinators_without_the_agent_token(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = "echo ran on $AGENT_NAME"
+        '''
+        agent = self.start_agent(self.create_test_dir_with_py_project_toml(py_project_toml), 'agent_a', env={'TASKIPY_AGENT_TOKEN': 'secret'})
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+
+        exit_code, stdout, stderr = self.run_task('--workers', [agent, 'test'], cwd=cwd)
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('requires the token', stderr)
+        self.assertSubstr('none of the workers could be reached', stdout)
+
+        exit_code, stdout, _ = self.run_task('--workers', [agent, 'test'], cwd=cwd, env={'TASKIPY_AGENT_TOKEN': 'secret'})
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'ran on agent_a\n')
+
+    def test_generating_a_token_that_only_coordinators_of_the_same_user_can_read(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = "echo ran on $AGENT_NAME"
+        '''
+        agent = self.start_agent(self.create_test_dir_with_py_project_toml(py_project_toml), 'agent_a')
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+
+        token_file = path.join(self._home, '.taskipy', 'agents', f'{agent.split(":")[1]}.token')
+        self.assertEqual(stat.S_IMODE(os.stat(token_file).st_mode), 0o600)
+
+        exit_code, _, stderr = self.run_task('--workers', [agent, 'test'], cwd=cwd, env={'HOME': self.create_test_dir_with_py_project_toml('')})
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('requires the token', stderr)
+
+        exit_code, stdout, _ = self.run_task('--workers', [agent, 'test'], cwd=cwd)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'ran on agent_a\n')
+
+    def test_running_commands_of_every_local_user_if_agent_does_without_token(self):
+        py_project_toml = '''
+            [tool.taskipy.tasks]
+            test = "echo ran on $AGENT_NAME"
+        '''
+        agent = self.start_agent(self.create_test_dir_with_py_project_toml(py_project_toml), 'agent_a', args=['--no-agent-token'])
+        cwd = self.create_test_dir_with_py_project_toml(py_project_toml)
+        exit_code, stdout, _ = self.run_task('--workers', [agent, 'test'], cwd=cwd, env={'HOME': self.create_test_dir_with_py_project_toml('')})
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'ran on agent_a\n')
+
+    def test_refusing_to_do_without_token_beyond_loopback_interface(self):
+        cwd = self.create_test_dir_with_py_project_toml('')
+        exit_code, stdout, _ = self.run_task('--agent', ['0.0.0.0:0', '--no-agent-token'], cwd=cwd)
+
+        self.assertEqual(exit_code, 1)
+        self.assertSubstr('always requires a token', stdout)
@@ -0,0 +1,166 @@
+import os
+import subprocess
+import time
+from os import path
+from typing import Dict
+
+from tests.test_taskipy import TaskipyTestCase
+
+
+class WorkspaceTestCase(TaskipyTestCase):
+    def test_running_task_in_every_package_that_defines_it(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        exit_code, stdout, stderr = self.run_task('--workspace', ['test'], cwd=cwd)
+
+        self.assertSubstr('testing api', stdout)
+        self.assertSubstr('testing core', stdout)
+        self.assertSubstr('testing nested', stdout)
+        self.assertSubstr('ran "test" in 3 packages, 0 failed', stderr)
+        self.assertEqual(exit_code, 0)
+
+    def test_ignoring_dependency_and_virtualenv_dirs(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        _, stdout, _ = self.run_task('--workspace', ['test'], cwd=cwd)
+
+        self.assertNotSubstr('testing node_modules', stdout)
+        self.assertNotSubstr('testing venv', stdout)
+
+    def test_exiting_with_exit_code_of_failed_package(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        exit_code, _, stderr = self.run_task('--workspace', ['fail'], cwd=cwd)
+
+        self.assertSubstr('ran "fail" in 2 packages, 1 failed', stderr)
+        self.assertSubstr('packages/api (exit code 3)', stderr)
+        self.assertEqual(exit_code, 3)
+
+    def test_exiting_with_code_127_if_no_package_defines_task(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        exit_code, stdout, _ = self.run_task('--workspace', ['task_that_does_not_exist'], cwd=cwd)
+
+        self.assertSubstr('could not find task "task_that_does_not_exist"', stdout)
+        self.assertEqual(exit_code, 127)
+
+    def test_running_packages_concurrently(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        for package in ('api', 'core'):
+            with open(path.join(cwd, 'packages', package, 'pyproject.toml'), 'w', encoding='utf-8') as f:
+                f.write('[tool.taskipy.tasks]\nslow = "python -c \\"import time; time.sleep(1)\\""\n')
+
+        started_at = time.perf_counter()
+        exit_code, _, _ = self.run_task('--workspace', ['--jobs', '2', 'slow'], cwd=cwd)
+
+        self.assertLess(time.perf_counter() - started_at, 1.9)
+        self.assertEqual(exit_code, 0)
+
+    def test_picking_up_new_packages_after_index_was_cached(self):
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        self.run_task('--workspace', ['test'], cwd=cwd)
+
+        os.makedirs(path.join(cwd, 'packages', 'cli'))
+        with open(path.join(cwd, 'packages', 'cli', 'pyproject.toml'), 'w', encoding='utf-8') as f:
+            f.write('[tool.taskipy.tasks]\ntest = "echo testing cli"\n')
+
+        _, stdout, _ = self.run_task('--workspace', ['test'], cwd=cwd)
+
+        self.assertSubstr('testing cli', stdout)
+
+
+class AffectedPackagesTestCase(TaskipyTestCase):
+    def create_committed_workspace(self) -> str:
+        cwd = self.create_test_dir_from_fixture('project_with_workspace')
+        for git_args in (['init', '-q'], ['add', '-A'], ['-c', 'user.name=taskipy', '-c', 'user.email=taskipy@example.com', 'commit', '-q', '-m', 'initial']):
+            subprocess.run(['git'] + git_args, cwd=cwd, check=True)
+        return cwd
+
+    def touch(self, file_path: str):
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write('# changed\n')
+
+    def test_running_task_in_changed_package_and_its_dependents(self):
+        cwd = self.create_committed_workspace()
+        self.touch(path.join(cwd, 'packages', 'core', 'pyproject.toml'))
+
+        exit_code, stdout, stderr = self.run_task('--since', ['HEAD', 'build'], cwd=cwd)
+
+        self.assertSubstr('building core', stdout)
+        self.assertSubstr('building api', stdout)
+        self.assertSubstr('building docs', stdout)
+        self.assertSubstr('ran "build" in 3 packages, 0 failed', stderr)
+        self.assertEqual(exit_code, 0)
+
+    def test_skipping_packages_that_were_not_affected(self):
+        cwd = self.create_committed_workspace()
+        with open(path.join(cwd, 'packages', 'api', 'new_module.py'), 'w', encoding='utf-8') as f:
+            f.write('print("new")\n')
+
+        exit_code, stdout, _ = self.run_task('--since', ['HEAD', 'build'], cwd=cwd)
+
+        self.assertSubstr('building api', stdout)
+        self.assertSubstr('building docs', stdout)
+        self.assertNotSubstr('building core', stdout)
+        self.assertEqual(exit_code, 0)
+
+    def test_changes_in_nested_package_do_not_affect_parent_package(self):
+        cwd = self.create_committed_workspace()
+        self.touch(path.join(cwd, 'packages', 'core', 'nested', 'pyproject.toml'))
+
+        _, stdout, _ = self.run_task('--since', ['HEAD', 'test'], cwd=cwd)
+
+        self.assertSubstr('testing nested', stdout)
+        self.assertNotSubstr('testing core', stdout)
+        self.assertNotSubstr('testing api', stdout)
+
+    def test_running_nothing_if_nothing_changed(self):
+        cwd = self.create_committed_workspace()
+        exit_code, stdout, stderr = self.run_task('--since', ['HEAD', 'build'], cwd=cwd)
+
+        self.assertNotSubstr('building', stdout)
+        self.assertSubstr('no package that defines "build" was affected by changes since "HEAD"', stderr)
+        self.assertEqual(exit_code, 0)
+
+    def test_exiting_with_code_1_if_ref_does_not_exist(self):
+        cwd = self.create_committed_workspace()
+        exit_code, stdout, _ = self.run_task('--since', ['no-such-ref', 'build'], cwd=cwd)
+
+        self.assertSubstr('could not find the files changed since "no-such-ref"', stdout)
+        self.assertEqual(exit_code, 1)
+
+
+class CriticalPathSchedulingTestCase(TaskipyTestCase):
+    def create_workspace(self, packages: Dict[str, str]) -> str:
+        cwd = self.create_test_dir_with_py_project_toml('')
+        for name, task in packages.items():
+            os.makedirs(path.join(cwd, name))
+            with open(path.join(cwd, name, 'pyproject.toml'), 'w', encoding='utf-8') as f:
+                f.write(f'[tool.taskipy.tasks]\n{task}\n')
+        return cwd
+
+    def test_starting_tasks_with_higher_weight_first(self):
+        cwd = self.create_workspace({
+            'a_light': 'run = "echo running a_light"',
+            'b_heavy': 'run = { cmd = "echo running b_heavy", weight = 60 }',
+        })
+        _, stdout, _ = self.run_task('--workspace', ['-j', '1', 'run'], cwd=cwd)
+
+        self.assertSubstrsInOrder(['running b_heavy', 'running a_light'], stdout)
+
+    def test_starting_tasks_that_took_longer_in_the_past_first(self):
+        cwd = self.create_workspace({
+            'a_fast': 'run = "echo running a_fast"',
+            'b_slow': 'run = "python -c \\"import time; time.sleep(0.5); print(\'running b_slow\')\\""',
+        })
+        _, stdout, _ = self.run_task('--workspace', ['-j', '1', 'run'], cwd=cwd)
+        self.assertSubstrsInOrder(['running a_fast', 'running b_slow'], stdout)
+
+        _, stdout, _ = self.run_task('--workspace', ['-j', '1', 'run'], cwd=cwd)
+        self.assertSubstrsInOrder(['running b_slow', 'running a_fast'], stdout)
+
+    def test_past_durations_include_pre_and_post_hooks(self):
+        cwd = self.create_workspace({
+            'a_slow_hook': 'pre_run = "python -c \\"import time; time.sleep(0.5)\\""\nrun = "echo running a_slow_hook"',
+            'b_fast': 'run = "echo running b_fast"',
+        })
+        self.run_task('--workspace', ['-j', '1', 'run'], cwd=cwd)
+        _, stdout, _ = self.run_task('--workspace', ['-j', '1', 'run'], cwd=cwd)
+
+        self.assertSubstrsInOrder(['running a_slow_hook', 'running b_fast'], stdout)